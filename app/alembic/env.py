@@ -1,4 +1,5 @@
 import asyncio
+import re
 from logging.config import fileConfig
 
 from alembic import context
@@ -30,6 +31,13 @@ target_metadata = Base.metadata
 # ... etc.
 config.set_main_option("sqlalchemy.url", str(settings.db.url))
 
+# месячные секции spimex_trading_results создает загрузка, в моделях их нет
+PARTITION = re.compile(r"^spimex_trading_results_y\d{4}m\d{2}$")
+
+
+def include_name(name, type_, parent_names) -> bool:
+    return not (type_ == "table" and PARTITION.match(name))
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -47,6 +55,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -56,7 +65,9 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection, target_metadata=target_metadata, include_name=include_name
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,66 @@
+"""add ingested_bulletins manifest and natural key on spimex_trading_results
+
+Revision ID: 7c1e2b9d4f10
+Revises: 425905903a3d
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1e2b9d4f10"
+down_revision: Union[str, None] = "425905903a3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingested_bulletins",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("url", sa.String(length=500), nullable=False),
+        sa.Column("file_hash", sa.String(length=64), nullable=True),
+        sa.Column("trading_date", sa.Date(), nullable=True),
+        sa.Column("row_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("created_on", sa.Date(), nullable=False),
+        sa.Column("updated_on", sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_ingested_bulletins")),
+        sa.UniqueConstraint("url", name=op.f("uq_ingested_bulletins_url")),
+    )
+    op.create_index(
+        op.f("ix_ingested_bulletins_file_hash"),
+        "ingested_bulletins",
+        ["file_hash"],
+        unique=False,
+    )
+
+    # до появления ключа каждый перезапуск дублировал таблицу - оставляем самую раннюю копию
+    op.execute(
+        """
+        DELETE FROM spimex_trading_results AS t
+        USING spimex_trading_results AS d
+        WHERE t.date = d.date
+          AND t.exchange_product_id = d.exchange_product_id
+          AND t.id > d.id
+        """
+    )
+    op.create_unique_constraint(
+        op.f("uq_spimex_trading_results_date_exchange_product_id"),
+        "spimex_trading_results",
+        ["date", "exchange_product_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        op.f("uq_spimex_trading_results_date_exchange_product_id"),
+        "spimex_trading_results",
+        type_="unique",
+    )
+    op.drop_index(op.f("ix_ingested_bulletins_file_hash"), table_name="ingested_bulletins")
+    op.drop_table("ingested_bulletins")
@@ -0,0 +1,54 @@
+"""add indexes for trading queries on spimex_trading_results
+
+Revision ID: b3d8f2a61e57
+Revises: 7c1e2b9d4f10
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d8f2a61e57"
+down_revision: Union[str, None] = "7c1e2b9d4f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_spimex_trading_results_date": ["date"],
+    "ix_spimex_trading_results_oil_id_date": ["oil_id", "date"],
+    "ix_spimex_trading_results_oil_id_type_basis_date": [
+        "oil_id",
+        "delivery_type_id",
+        "delivery_basis_id",
+        "date",
+    ],
+}
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицу, но не работает в транзакции.
+    # Прерванная сборка оставляет невалидный индекс: перед повторным upgrade его убирает downgrade
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name,
+                "spimex_trading_results",
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(
+                name,
+                table_name="spimex_trading_results",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
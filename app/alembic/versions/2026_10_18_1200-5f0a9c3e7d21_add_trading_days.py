@@ -0,0 +1,41 @@
+"""add trading_days table
+
+Revision ID: 5f0a9c3e7d21
+Revises: b3d8f2a61e57
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5f0a9c3e7d21"
+down_revision: Union[str, None] = "b3d8f2a61e57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trading_days",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("row_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("updated_on", sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint("date", name=op.f("pk_trading_days")),
+    )
+    # дальше справочник ведет загрузка, а уже загруженную историю переносим один раз
+    op.execute(
+        """
+        INSERT INTO trading_days (date, row_count, updated_on)
+        SELECT date, count(*), now()
+        FROM spimex_trading_results
+        GROUP BY date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("trading_days")
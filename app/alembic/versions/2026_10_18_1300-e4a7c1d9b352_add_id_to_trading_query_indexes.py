@@ -0,0 +1,71 @@
+"""add id to trading query indexes for keyset pagination
+
+Revision ID: e4a7c1d9b352
+Revises: 5f0a9c3e7d21
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a7c1d9b352"
+down_revision: Union[str, None] = "5f0a9c3e7d21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# старый индекс -> колонки; новый индекс - те же колонки + id под сортировку (date, id)
+INDEXES = {
+    "ix_spimex_trading_results_date": ["date"],
+    "ix_spimex_trading_results_oil_id_date": ["oil_id", "date"],
+    "ix_spimex_trading_results_oil_id_type_basis_date": [
+        "oil_id",
+        "delivery_type_id",
+        "delivery_basis_id",
+        "date",
+    ],
+}
+
+
+def upgrade() -> None:
+    # новые индексы строятся рядом со старыми, старые удаляются после: запросы не остаются
+    # без индекса ни на один момент. Как и в b3d8f2a61e57 - CONCURRENTLY вне транзакции
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                f"{name}_id",
+                "spimex_trading_results",
+                [*columns, "id"],
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name in INDEXES:
+            op.drop_index(
+                name,
+                table_name="spimex_trading_results",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name,
+                "spimex_trading_results",
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name in INDEXES:
+            op.drop_index(
+                f"{name}_id",
+                table_name="spimex_trading_results",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
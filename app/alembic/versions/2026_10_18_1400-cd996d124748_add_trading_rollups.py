@@ -0,0 +1,56 @@
+"""add trading_rollups table
+
+Revision ID: cd996d124748
+Revises: e4a7c1d9b352
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "cd996d124748"
+down_revision: Union[str, None] = "e4a7c1d9b352"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trading_rollups",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("oil_id", sa.String(length=4), nullable=False),
+        sa.Column("delivery_basis_id", sa.String(length=3), nullable=False),
+        sa.Column("volume", sa.BigInteger(), nullable=False),
+        sa.Column("total", sa.BigInteger(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.Column("updated_on", sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "date", "oil_id", "delivery_basis_id", name=op.f("pk_trading_rollups")
+        ),
+    )
+    op.create_index(
+        "ix_trading_rollups_oil_id_basis_date",
+        "trading_rollups",
+        ["oil_id", "delivery_basis_id", "date"],
+        unique=False,
+    )
+    # дальше итоги ведет загрузка, а уже загруженную историю сворачиваем один раз
+    op.execute(
+        """
+        INSERT INTO trading_rollups (
+            date, oil_id, delivery_basis_id, volume, total, count, updated_on
+        )
+        SELECT date, oil_id, delivery_basis_id, sum(volume), sum(total), sum(count), now()
+        FROM spimex_trading_results
+        GROUP BY date, oil_id, delivery_basis_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trading_rollups_oil_id_basis_date", table_name="trading_rollups")
+    op.drop_table("trading_rollups")
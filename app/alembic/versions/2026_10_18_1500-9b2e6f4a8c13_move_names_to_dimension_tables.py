@@ -0,0 +1,85 @@
+"""move product and basis names to dimension tables
+
+Revision ID: 9b2e6f4a8c13
+Revises: cd996d124748
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9b2e6f4a8c13"
+down_revision: Union[str, None] = "cd996d124748"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# справочник -> (колонка названия в таблице фактов, ее длина, колонка id справочника)
+DIMENSIONS = {
+    "products": ("exchange_product_name", 300, "product_id"),
+    "delivery_bases": ("delivery_basis_name", 200, "delivery_base_id"),
+}
+
+
+def upgrade() -> None:
+    for dimension, (name_column, length, id_column) in DIMENSIONS.items():
+        op.create_table(
+            dimension,
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=length), nullable=False),
+            sa.PrimaryKeyConstraint("id", name=op.f(f"pk_{dimension}")),
+            sa.UniqueConstraint("name", name=op.f(f"uq_{dimension}_name")),
+        )
+        op.execute(
+            f"INSERT INTO {dimension} (name) "
+            f"SELECT DISTINCT {name_column} FROM spimex_trading_results ORDER BY 1"
+        )
+        op.add_column("spimex_trading_results", sa.Column(id_column, sa.Integer(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE spimex_trading_results AS r
+        SET product_id = p.id, delivery_base_id = b.id
+        FROM products AS p, delivery_bases AS b
+        WHERE p.name = r.exchange_product_name AND b.name = r.delivery_basis_name
+        """
+    )
+    for dimension, (name_column, _, id_column) in DIMENSIONS.items():
+        op.alter_column("spimex_trading_results", id_column, nullable=False)
+        op.create_foreign_key(
+            op.f(f"fk_spimex_trading_results_{id_column}_{dimension}"),
+            "spimex_trading_results",
+            dimension,
+            [id_column],
+            ["id"],
+        )
+        op.drop_column("spimex_trading_results", name_column)
+
+    # DROP COLUMN и UPDATE место не освобождают: VACUUM FULL переписывает таблицу
+    # и ее индексы без названий и мертвых версий строк. Держит эксклюзивную блокировку
+    # на время перезаписи, поэтому миграцию запускают вне окна загрузки
+    with op.get_context().autocommit_block():
+        op.execute("VACUUM FULL ANALYZE spimex_trading_results")
+
+
+def downgrade() -> None:
+    for dimension, (name_column, length, id_column) in DIMENSIONS.items():
+        op.add_column(
+            "spimex_trading_results",
+            sa.Column(name_column, sa.String(length=length), nullable=True),
+        )
+        op.execute(
+            f"UPDATE spimex_trading_results AS r SET {name_column} = d.name "
+            f"FROM {dimension} AS d WHERE d.id = r.{id_column}"
+        )
+        op.alter_column("spimex_trading_results", name_column, nullable=False)
+        op.drop_constraint(
+            op.f(f"fk_spimex_trading_results_{id_column}_{dimension}"),
+            "spimex_trading_results",
+            type_="foreignkey",
+        )
+        op.drop_column("spimex_trading_results", id_column)
+        op.drop_table(dimension)
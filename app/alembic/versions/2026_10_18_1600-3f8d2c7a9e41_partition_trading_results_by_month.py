@@ -0,0 +1,116 @@
+"""partition spimex_trading_results by month of date
+
+Revision ID: 3f8d2c7a9e41
+Revises: 9b2e6f4a8c13
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f8d2c7a9e41"
+down_revision: Union[str, None] = "9b2e6f4a8c13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "spimex_trading_results"
+
+COLUMNS = """
+    id INTEGER NOT NULL DEFAULT nextval('spimex_trading_results_id_seq'),
+    exchange_product_id VARCHAR(100) NOT NULL,
+    product_id INTEGER NOT NULL,
+    oil_id VARCHAR(4) NOT NULL,
+    delivery_basis_id VARCHAR(3) NOT NULL,
+    delivery_base_id INTEGER NOT NULL,
+    delivery_type_id VARCHAR(1) NOT NULL,
+    volume INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    date DATE NOT NULL,
+    created_on DATE NOT NULL,
+    updated_on DATE NOT NULL
+"""
+
+COLUMN_NAMES = ", ".join(line.split()[0] for line in COLUMNS.strip().splitlines())
+
+INDEXES = {
+    "ix_spimex_trading_results_date_id": "date, id",
+    "ix_spimex_trading_results_oil_id_date_id": "oil_id, date, id",
+    "ix_spimex_trading_results_oil_id_type_basis_date_id": (
+        "oil_id, delivery_type_id, delivery_basis_id, date, id"
+    ),
+}
+
+# месячные секции под уже загруженные даты, дальше их создает загрузка
+# (AlchemyRepository._prepare_rows). Имя секции - spimex_trading_results_yYYYYmMM
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    month date;
+BEGIN
+    FOR month IN
+        SELECT DISTINCT date_trunc('month', date)::date FROM {source}
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF {parent} FOR VALUES FROM (%L) TO (%L)',
+            '{table}_' || to_char(month, '"y"YYYY"m"MM'),
+            month,
+            (month + interval '1 month')::date
+        );
+    END LOOP;
+END
+$$
+"""
+
+
+def create_constraints(table: str, partitioned: bool) -> None:
+    # первичный ключ секционированной таблицы обязан включать ключ секционирования
+    primary_key = "id, date" if partitioned else "id"
+    op.execute(
+        f"""
+        ALTER TABLE {table}
+            ADD CONSTRAINT pk_{TABLE} PRIMARY KEY ({primary_key}),
+            ADD CONSTRAINT uq_{TABLE}_date_exchange_product_id UNIQUE (date, exchange_product_id),
+            ADD CONSTRAINT ck_{TABLE}_check_count_positive CHECK (count >= 0),
+            ADD CONSTRAINT fk_{TABLE}_product_id_products
+                FOREIGN KEY (product_id) REFERENCES products (id),
+            ADD CONSTRAINT fk_{TABLE}_delivery_base_id_delivery_bases
+                FOREIGN KEY (delivery_base_id) REFERENCES delivery_bases (id)
+        """
+    )
+    for name, columns in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+
+def rebuild(partitioned: bool) -> None:
+    """
+    Новая таблица строится рядом под временным именем, старая удаляется вместе со своими
+    индексами и ограничениями, после чего новая получает имя и ограничения старой.
+    Последовательность id переживает удаление старой таблицы.
+    """
+    new_table = f"{TABLE}_new"
+    partition_by = " PARTITION BY RANGE (date)" if partitioned else ""
+    op.execute(f"CREATE TABLE {new_table} ({COLUMNS}){partition_by}")
+    if partitioned:
+        op.execute(CREATE_PARTITIONS.format(source=TABLE, parent=new_table, table=TABLE))
+    op.execute(f"INSERT INTO {new_table} ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM {TABLE}")
+
+    op.execute(f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY NONE")
+    op.execute(f"DROP TABLE {TABLE}")
+    op.execute(f"ALTER TABLE {new_table} RENAME TO {TABLE}")
+    op.execute(f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id")
+    create_constraints(table=TABLE, partitioned=partitioned)
+    op.execute(f"ANALYZE {TABLE}")
+
+
+def upgrade() -> None:
+    # секции по месяцам date: диапазон дат в запросах читает только свои секции,
+    # а VACUUM и обслуживание индексов касаются только секций, куда идет запись
+    rebuild(partitioned=True)
+
+
+def downgrade() -> None:
+    rebuild(partitioned=False)
@@ -0,0 +1,30 @@
+"""add etag and last_modified to ingested_bulletins
+
+Revision ID: a5c3e9f1b274
+Revises: 3f8d2c7a9e41
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a5c3e9f1b274"
+down_revision: Union[str, None] = "3f8d2c7a9e41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("ingested_bulletins", sa.Column("etag", sa.String(length=200), nullable=True))
+    op.add_column(
+        "ingested_bulletins", sa.Column("last_modified", sa.String(length=64), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("ingested_bulletins", "last_modified")
+    op.drop_column("ingested_bulletins", "etag")
@@ -0,0 +1,61 @@
+"""add ingestion_runs journal
+
+Revision ID: d7b41e8c2f05
+Revises: a5c3e9f1b274
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "d7b41e8c2f05"
+down_revision: Union[str, None] = "a5c3e9f1b274"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingestion_runs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("trigger", sa.String(length=20), nullable=False),
+        sa.Column("scheduled_for", sa.DateTime(), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("bulletins", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("rows", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "stages",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default="{}",
+            nullable=False,
+        ),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_ingestion_runs")),
+    )
+    op.create_index(
+        op.f("ix_ingestion_runs_scheduled_for"),
+        "ingestion_runs",
+        ["scheduled_for"],
+        unique=False,
+    )
+    # не больше одного выполняющегося запуска
+    op.create_index(
+        "uq_ingestion_runs_running",
+        "ingestion_runs",
+        ["status"],
+        unique=True,
+        postgresql_where=sa.text("status = 'running'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_ingestion_runs_running", table_name="ingestion_runs")
+    op.drop_index(op.f("ix_ingestion_runs_scheduled_for"), table_name="ingestion_runs")
+    op.drop_table("ingestion_runs")
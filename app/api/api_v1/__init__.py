@@ -2,6 +2,8 @@ from fastapi import APIRouter
 
 from app.core import settings
 
+from .admin import router as admin
+from .cache import router as cache
 from .some_endpoint import router as endpoint
 from .trading import router as trading
 
@@ -9,7 +11,7 @@ router = APIRouter(
     prefix=settings.api.v1.prefix,
 )
 
-for rout in (endpoint, trading):
+for rout in (endpoint, trading, cache, admin):
     router.include_router(
         router=rout,
     )
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from dishka import FromDishka
+from dishka.integrations.fastapi import inject
+from fastapi import APIRouter, Query, status
+
+from app.core import Settings
+from app.core.database.models.ingestion_runs import RunStatus
+from app.core.repositories.run_repository import IRunRepository
+from app.core.schemas import IngestionStatusResponse
+from app.core.services.schedule import next_run
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+)
+
+
+@router.get(
+    path="/ingestion/",
+    response_model=IngestionStatusResponse,
+    status_code=status.HTTP_200_OK,
+)
+@inject
+async def get_ingestion_status(
+    settings: FromDishka[Settings],
+    runs: FromDishka[IRunRepository],
+    limit: int = Query(10, description="Сколько последних запусков вернуть", gt=0, le=100),
+):
+    """Задача загрузки бюллетеней: выполняется ли сейчас, последние запуски и их стадии"""
+    config = settings.ingestion
+    # running от упавшего процесса не должен выглядеть выполняющимся запуском
+    await runs.fail_stale(stale_after=config.run_timeout_seconds)
+    history = await runs.get_runs(limit=limit)
+    last_run = history[0] if history else None
+    return {
+        "status": "running" if last_run and last_run.status == RunStatus.RUNNING else "idle",
+        "schedule": (
+            f"{config.schedule_hour:02d}:{config.schedule_minute:02d} "
+            f"+ до {config.schedule_jitter_seconds:.0f} сек"
+        ),
+        "next_run": next_run(
+            now=datetime.now(), hour=config.schedule_hour, minute=config.schedule_minute
+        ),
+        "last_run": last_run,
+        "last_success": await runs.get_last_success(),
+        "runs": history,
+    }
@@ -0,0 +1,34 @@
+import os
+
+from dishka import FromDishka
+from dishka.integrations.fastapi import inject
+from fastapi import APIRouter, status
+
+from app.core import Settings
+from app.core.repositories.local_cache import CacheNamespace, CacheStats, LocalCache
+from app.core.schemas import CacheStatsResponse
+
+router = APIRouter(
+    prefix="/cache",
+    tags=["cache"],
+)
+
+
+@router.get(
+    path="/stats/",
+    response_model=CacheStatsResponse,
+    status_code=status.HTTP_200_OK,
+)
+@inject
+async def get_cache_stats(
+    settings: FromDishka[Settings],
+    stats: FromDishka[CacheStats],
+    local_cache: FromDishka[LocalCache],
+    namespace: FromDishka[CacheNamespace],
+):
+    return {
+        "pid": os.getpid(),
+        "data_version": namespace.version,
+        **stats.report(),
+        "local_cache": {"enabled": settings.redis.local_cache_enabled, **local_cache.report()},
+    }
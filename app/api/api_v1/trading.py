@@ -2,14 +2,19 @@ from datetime import date
 
 from dishka import FromDishka
 from dishka.integrations.fastapi import inject
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Response, status
+from fastapi.responses import StreamingResponse
 
-from app.api.api_v1.schemas import (
+from app.core.schemas import (
+    AggregateResponse,
+    AggregatesRequest,
     DynamicRequest,
+    DynamicsPage,
     LastDatesRequest,
     TradingResultResponse,
     TradingResultsRequest,
 )
+from app.core.services.serializers import CSV, NDJSON, stream_media_type
 from app.core.services.service import Service
 
 router = APIRouter(
@@ -18,6 +23,15 @@ router = APIRouter(
 )
 
 
+def json_response(body: bytes) -> Response:
+    """
+    Service отдает готовое тело JSON (из кэша - без разбора), поэтому роуты возвращают
+    его как есть: FastAPI не валидирует и не перекодирует Response.
+    response_model у роутов остается для схемы OpenAPI.
+    """
+    return Response(content=body, media_type="application/json")
+
+
 @router.get(
     path="get_last_trading_dates/",
     response_model=list[date],
@@ -27,21 +41,35 @@ router = APIRouter(
 async def get_last_trading_dates(
     service: FromDishka[Service], request: LastDatesRequest = Depends()
 ):
-    return await service.get_last_trading_dates(limit=request.limit)
+    return json_response(await service.get_last_trading_dates(limit=request.limit))
 
 
 @router.get(
     path="get_dynamics/",
-    response_model=list[TradingResultResponse],
+    response_model=list[TradingResultResponse] | DynamicsPage,
     status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "description": (
+                "JSON-массив, с limit/cursor - страница DynamicsPage; "
+                f"с Accept: {NDJSON} или {CSV} - поток строк всего периода"
+            ),
+            "content": {NDJSON: {}, CSV: {}},
+        }
+    },
 )
 @inject
 async def get_dynamics(
     service: FromDishka[Service],
     request: DynamicRequest = Depends(),
+    accept: str | None = Header(None),
 ):
-    results = await service.get_dynamics(request=request)
-    return results
+    if media_type := stream_media_type(accept):
+        return StreamingResponse(
+            service.stream_dynamics(request=request, media_type=media_type),
+            media_type=media_type,
+        )
+    return json_response(await service.get_dynamics(request=request))
 
 
 @router.get(
@@ -54,4 +82,17 @@ async def get_trading_results(
     service: FromDishka[Service],
     request: TradingResultsRequest = Depends(),
 ):
-    return await service.get_trading_results(request=request)
+    return json_response(await service.get_trading_results(request=request))
+
+
+@router.get(
+    path="/get_aggregates/",
+    response_model=list[AggregateResponse],
+    status_code=status.HTTP_200_OK,
+)
+@inject
+async def get_aggregates(
+    service: FromDishka[Service],
+    request: AggregatesRequest = Depends(),
+):
+    return json_response(await service.get_aggregates(request=request))
@@ -1,3 +1,20 @@
-__all__ = ("SpimexTradingResult",)
+__all__ = (
+    "BulletinStatus",
+    "DeliveryBase",
+    "IngestedBulletin",
+    "IngestionRun",
+    "Product",
+    "RunStatus",
+    "RunTrigger",
+    "SpimexTradingResult",
+    "TradingDay",
+    "TradingRollup",
+)
 
+from .delivery_bases import DeliveryBase
+from .ingested_bulletins import BulletinStatus, IngestedBulletin
+from .ingestion_runs import IngestionRun, RunStatus, RunTrigger
+from .products import Product
 from .spimex_trading_results import SpimexTradingResult
+from .trading_days import TradingDay
+from .trading_rollups import TradingRollup
@@ -0,0 +1,11 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database.models.base import Base
+from app.core.database.models.mixins import IntIdPkMixin
+
+
+class DeliveryBase(IntIdPkMixin, Base):
+    """Справочник названий базисов поставки (delivery_basis_name), устроен как Product"""
+
+    name: Mapped[str] = mapped_column(String(200), unique=True)
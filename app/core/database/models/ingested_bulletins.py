@@ -0,0 +1,37 @@
+from datetime import date as _date
+from enum import StrEnum
+
+from sqlalchemy import String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database.models.base import Base
+from app.core.database.models.mixins import IntIdPkMixin
+
+
+class BulletinStatus(StrEnum):
+    LOADED = "loaded"  # строки бюллетеня сохранены в spimex_trading_results
+    DUPLICATE = "duplicate"  # файл с таким же содержимым уже загружен по другой ссылке
+    FAILED = "failed"  # не удалось скачать или распарсить, будет повторено при следующем запуске
+
+
+class IngestedBulletin(IntIdPkMixin, Base):
+    """Манифест загрузки: какие бюллетени уже попали в БД и сколько строк в них было"""
+
+    url: Mapped[str] = mapped_column(String(500), unique=True)
+    file_hash: Mapped[str | None] = mapped_column(String(64), index=True)  # sha256 файла
+    trading_date: Mapped[_date | None]
+    row_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    status: Mapped[str] = mapped_column(String(20))
+    # заголовки ответа последнего скачивания: повторное уходит условным запросом
+    etag: Mapped[str | None] = mapped_column(String(200))
+    last_modified: Mapped[str | None] = mapped_column(String(64))
+
+    created_on: Mapped[_date] = mapped_column(
+        insert_default=func.now(),
+        nullable=False,
+    )
+    updated_on: Mapped[_date] = mapped_column(
+        insert_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,59 @@
+from datetime import datetime
+from enum import StrEnum
+
+from sqlalchemy import DateTime, Index, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database.models.base import Base
+from app.core.database.models.mixins import IntIdPkMixin
+
+
+class RunTrigger(StrEnum):
+    SCHEDULED = "scheduled"  # по расписанию или догрузка пропущенного срока
+    MANUAL = "manual"  # python -m app.ingest --once
+
+
+class RunStatus(StrEnum):
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class IngestionRun(IntIdPkMixin, Base):
+    """
+    Журнал запусков загрузки: когда, по какому сроку расписания, сколько строк
+    и сколько секунд заняла каждая стадия. Запуск в статусе running может быть
+    только один - это защищает от наложения запусков разных процессов.
+    """
+
+    __table_args__ = (
+        Index(
+            "uq_ingestion_runs_running",
+            "status",
+            unique=True,
+            postgresql_where=text("status = 'running'"),
+        ),
+    )
+
+    trigger: Mapped[str] = mapped_column(String(20))
+    # срок расписания (локальное время), за который выполнен запуск; у ручных - None
+    scheduled_for: Mapped[datetime | None] = mapped_column(index=True)
+    status: Mapped[str] = mapped_column(String(20))
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        insert_default=func.now(),
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    bulletins: Mapped[int] = mapped_column(default=0, server_default="0")
+    rows: Mapped[int] = mapped_column(default=0, server_default="0")
+    # длительность стадий, сек: crawl, download, parse, load, cache_refresh
+    stages: Mapped[dict[str, float]] = mapped_column(JSONB, default=dict, server_default="{}")
+    error: Mapped[str | None] = mapped_column(Text)
+
+    @property
+    def duration(self) -> float | None:
+        """Длительность запуска, сек; None - еще выполняется"""
+        if self.finished_at is None:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
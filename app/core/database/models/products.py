@@ -0,0 +1,15 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database.models.base import Base
+from app.core.database.models.mixins import IntIdPkMixin
+
+
+class Product(IntIdPkMixin, Base):
+    """
+    Справочник названий инструментов (exchange_product_name): в таблице фактов вместо
+    строки до 300 символов хранится id. Строки только добавляются, поэтому id, однажды
+    выданный названию, не меняется.
+    """
+
+    name: Mapped[str] = mapped_column(String(300), unique=True)
@@ -1,6 +1,6 @@
 from datetime import date as _date
 
-from sqlalchemy import CheckConstraint, String, func
+from sqlalchemy import CheckConstraint, ForeignKey, Index, String, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database.models.base import Base
@@ -8,21 +8,48 @@ from app.core.database.models.mixins import IntIdPkMixin
 
 
 class SpimexTradingResult(IntIdPkMixin, Base):
+    """
+    Строки бюллетеней. Таблица секционирована по месяцам date (секции
+    spimex_trading_results_yYYYYmMM создает загрузка, см. AlchemyRepository._prepare_rows),
+    поэтому первичный ключ - (id, date): он обязан включать ключ секционирования.
+    """
+
+    __table_args__ = (
+        CheckConstraint("count >= 0", name="check_count_positive"),
+        # естественный ключ: один инструмент встречается в бюллетене за день ровно один раз
+        UniqueConstraint("date", "exchange_product_id"),
+        # индексы под запросы AlchemyRepository: фильтры по инструменту + сортировка
+        # (date DESC, id DESC), id - для keyset-пагинации get_dynamics.
+        # B-tree читается в обратном порядке, поэтому колонок хватает по возрастанию
+        Index("ix_spimex_trading_results_date_id", "date", "id"),
+        Index("ix_spimex_trading_results_oil_id_date_id", "oil_id", "date", "id"),
+        Index(
+            "ix_spimex_trading_results_oil_id_type_basis_date_id",
+            "oil_id",
+            "delivery_type_id",
+            "delivery_basis_id",
+            "date",
+            "id",
+        ),
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
 
-    __table_args__ = (CheckConstraint("count >= 0", name="check_count_positive"),)
+    # в составном ключе id сам по себе не автоинкрементный, поэтому явно
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
     exchange_product_id: Mapped[str] = mapped_column(String(100))
-    exchange_product_name: Mapped[str] = mapped_column(String(300))
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))  # exchange_product_name
     oil_id: Mapped[str] = mapped_column(String(4))  # exchange_product_id[:4]
     delivery_basis_id: Mapped[str] = mapped_column(String(3))  # exchange_product_id[4:7]
-    delivery_basis_name: Mapped[str] = mapped_column(String(200))
+    # delivery_basis_name
+    delivery_base_id: Mapped[int] = mapped_column(ForeignKey("delivery_bases.id"))
     delivery_type_id: Mapped[str] = mapped_column(String(1))  # exchange_product_id[-1]
 
     volume: Mapped[int] = mapped_column(nullable=False)  # Объем Договоров в единицах измерения.
     total: Mapped[int] = mapped_column(nullable=False)  # Объем Договоров, руб.
     count: Mapped[int] = mapped_column(nullable=False)  # Количество Договоров, шт.
 
-    date: Mapped[_date] = mapped_column(nullable=False)
+    date: Mapped[_date] = mapped_column(primary_key=True)
     created_on: Mapped[_date] = mapped_column(
         insert_default=func.now(),
         nullable=False,
@@ -0,0 +1,23 @@
+from datetime import date as _date
+
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database.models.base import Base
+
+
+class TradingDay(Base):
+    """
+    Справочник торговых дней, которые есть в spimex_trading_results. Обновляется
+    в транзакции загрузки, поэтому последние N дней - это чтение N строк по первичному ключу,
+    а не GROUP BY по всей таблице фактов.
+    """
+
+    date: Mapped[_date] = mapped_column(primary_key=True)
+    row_count: Mapped[int] = mapped_column(default=0, server_default="0")
+
+    updated_on: Mapped[_date] = mapped_column(
+        insert_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,34 @@
+from datetime import date as _date
+
+from sqlalchemy import BigInteger, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database.models.base import Base
+
+
+class TradingRollup(Base):
+    """
+    Дневные итоги spimex_trading_results по инструменту и базису поставки.
+    Пересчитываются в транзакции загрузки для затронутых дат, поэтому сводка за период -
+    чтение по индексу нескольких строк на день, а не суммирование таблицы фактов.
+    """
+
+    __table_args__ = (
+        # первичный ключ (date, ...) - периоды без фильтров, этот - с фильтром по инструменту
+        Index("ix_trading_rollups_oil_id_basis_date", "oil_id", "delivery_basis_id", "date"),
+    )
+
+    date: Mapped[_date] = mapped_column(primary_key=True)
+    oil_id: Mapped[str] = mapped_column(String(4), primary_key=True)
+    delivery_basis_id: Mapped[str] = mapped_column(String(3), primary_key=True)
+
+    # суммы за день не помещаются в integer таблицы фактов
+    volume: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    total: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    updated_on: Mapped[_date] = mapped_column(
+        insert_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,58 @@
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+log = logging.getLogger(__name__)
+
+
+class AdvisoryLock:
+    """
+    Сессионная advisory-блокировка Postgres на собственном соединении. Держится, пока
+    соединение открыто: упал процесс-владелец или оборвалась его связь с БД - Postgres
+    снимает блокировку сам, и ее может взять другой процесс.
+    """
+
+    def __init__(self, engine: AsyncEngine, key: int) -> None:
+        self.engine = engine
+        self.key = key
+        self._connection: AsyncConnection | None = None
+
+    @property
+    def held(self) -> bool:
+        return self._connection is not None
+
+    async def acquire(self) -> bool:
+        """Берет блокировку без ожидания: False - ее держит другой процесс"""
+        connection = await self.engine.connect()
+        try:
+            # соединение часами простаивает: без открытой транзакции, а не idle in transaction
+            await connection.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = await connection.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+            )
+        except BaseException:
+            await connection.close()
+            raise
+        if not acquired:
+            await connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    async def check(self) -> None:
+        """Запрос по соединению блокировки; ошибка означает, что блокировка потеряна"""
+        await self._connection.execute(text("SELECT 1"))
+
+    async def release(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            await connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+        except SQLAlchemyError as e:
+            # соединение уже потеряно, а вместе с ним и блокировка
+            log.warning("Не удалось снять advisory-блокировку %d: %r", self.key, e)
+        finally:
+            await connection.close()
@@ -1,71 +1,117 @@
-import asyncio
-import json
 import logging
 from abc import abstractmethod
-from datetime import datetime
 from typing import Protocol
 
 from redis import asyncio as aioredis
 
 from app.core import Settings
+from app.core.repositories.local_cache import CacheNamespace, CacheStats, LocalCache
 
 log = logging.getLogger(__name__)
 
 
 class ICacheRepository(Protocol):
     @abstractmethod
-    async def flush_all(self) -> None:
-        """Очищаем кэш redis"""
+    async def bump_version(self) -> int:
+        """
+        Данные в БД обновились: увеличиваем версию данных и сообщаем о ней воркерам.
+        Ключи прошлой версии больше не читаются и истекают по своему TTL.
+        """
         raise NotImplementedError
 
     @abstractmethod
-    async def schedule_daily_flush(self, hour: int = 14, minute: int = 11) -> None:
+    async def namespaced(self, key: str) -> str:
+        """
+        Ключ в пространстве текущей версии данных. Берется один раз на запрос и передается
+        и в get_cached_data, и в set_cached_data: если загрузка сменит версию между промахом
+        и записью, тело по старым данным ляжет под старую версию, а не под новую.
+        """
         raise NotImplementedError
 
     @abstractmethod
-    async def get_cached_data(self, key: str) -> list[str | dict] | None:
-        """Получаем все кэшированные данные (или None если кэш пуст)"""
+    async def get_cached_data(self, key: str) -> bytes | None:
+        """Получаем закэшированные байты как есть (или None если кэш пуст), key - из namespaced"""
         raise NotImplementedError
 
     @abstractmethod
-    async def set_cached_data(self, data: str, key: str) -> None:
-        """Кэшируем полный список данных"""
+    async def set_cached_data(self, data: bytes, key: str, ttl: int | None) -> None:
+        """Кэшируем данные на ttl секунд (None - без срока), key - из namespaced"""
         raise NotImplementedError
 
 
 class RedisCacheRepository(ICacheRepository):
-    def __init__(self, redis: aioredis.Redis, settings: Settings) -> None:
+    """
+    Ключи кэша лежат в пространстве текущей версии данных: v<версия>:<ключ>.
+    Версию воркер держит в памяти (CacheNamespace) и узнает о новой через pub/sub,
+    поэтому на чтение уходит один запрос в redis.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        settings: Settings,
+        stats: CacheStats,
+        namespace: CacheNamespace,
+    ) -> None:
         self.redis = redis
         self.settings = settings
+        self.stats = stats
+        self.namespace = namespace
+
+    async def bump_version(self) -> int:
+        version = await self.redis.incr(self.settings.redis.version_key)
+        self.namespace.version = version
+        await self.redis.publish(self.settings.redis.invalidation_channel, version)
+        log.info("Версия данных кэша: %d", version)
+        return version
+
+    async def namespaced(self, key: str) -> str:
+        if self.namespace.version is None:
+            self.namespace.version = int(await self.redis.get(self.settings.redis.version_key) or 0)
+        return f"v{self.namespace.version}:{key}"
+
+    async def get_cached_data(self, key: str) -> bytes | None:
+        cached_data = await self.redis.get(key)
+        if not cached_data:
+            self.stats.redis.misses += 1
+            log.info("No cached data for key: %s", key)
+            return None
 
-    async def flush_all(self) -> None:
-        await self.redis.flushdb()
-        logging.info("Cache flushed at %s", datetime.now())
+        self.stats.redis.hits += 1
+        log.info("Retrieved cached data for key: %s", key)
+        return cached_data
 
-    async def schedule_daily_flush(self, hour: int = 14, minute: int = 11) -> None:
-        while True:
-            now = datetime.now()
-            target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    async def set_cached_data(self, data: bytes, key: str, ttl: int | None) -> None:
+        await self.redis.set(name=key, value=data, ex=ttl)
+        log.info("Data cached with key: %s, TTL: %s", key, ttl)
 
-            if now >= target:
-                target = target.replace(day=target.day + 1)
 
-            wait_seconds = (target - now).total_seconds()
-            logging.info(f"Next cache flush scheduled in {wait_seconds:.0f} seconds")
+class TieredCacheRepository(ICacheRepository):
+    """
+    Двухуровневый кэш: LocalCache в памяти воркера (L1), за ним redis (L2).
+    Запись идет только в redis, L1 заполняется при чтении.
+    """
 
-            await asyncio.sleep(wait_seconds)
-            await self.flush_all()
+    def __init__(self, remote: RedisCacheRepository, local: LocalCache) -> None:
+        self.remote = remote
+        self.local = local
 
-    async def get_cached_data(self, key: str) -> list[str | dict] | None:
-        cached_data = await self.redis.get(key)
-        if not cached_data:
-            log.info("No cached data for key: %s", key)
-            return None
+    async def bump_version(self) -> int:
+        self.local.clear()
+        return await self.remote.bump_version()
 
-        dates = json.loads(cached_data)
-        log.info("Retrieved cached data for key: %s", key)
-        return dates
+    async def namespaced(self, key: str) -> str:
+        return await self.remote.namespaced(key)
+
+    async def get_cached_data(self, key: str) -> bytes | None:
+        # в L1 ключ тоже с версией: записи прошлой версии не читаются до самой очистки
+        if (cached_data := self.local.get(key)) is not None:
+            return cached_data
+
+        cached_data = await self.remote.get_cached_data(key=key)
+        if cached_data is not None:
+            self.local.put(key=key, value=cached_data)
+        return cached_data
 
-    async def set_cached_data(self, data: str, key: str) -> None:
-        await self.redis.setex(name=key, time=self.settings.redis.ttl, value=data)
-        log.info("Data cached with key: %s, TTL: %d", key, self.settings.redis.ttl)
+    async def set_cached_data(self, data: bytes, key: str, ttl: int | None) -> None:
+        await self.remote.set_cached_data(data=data, key=key, ttl=ttl)
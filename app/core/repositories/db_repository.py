@@ -1,16 +1,94 @@
 import logging
 from abc import abstractmethod
-from datetime import date
+from datetime import date, timedelta
+from typing import AsyncIterator, Iterable, Sequence
 
-from sqlalchemy import insert, select, Select
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    Row,
+    Select,
+    column,
+    delete,
+    func,
+    select,
+    table,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing_extensions import Protocol
 
-from app.api.api_v1.schemas import DynamicRequest, TradingResultsRequest
+from app.core.database.models.delivery_bases import DeliveryBase
+from app.core.database.models.ingested_bulletins import BulletinStatus, IngestedBulletin
+from app.core.database.models.products import Product
 from app.core.database.models.spimex_trading_results import SpimexTradingResult
+from app.core.database.models.trading_days import TradingDay
+from app.core.database.models.trading_rollups import TradingRollup
+from app.core.repositories.dimensions import DIMENSIONS, DimensionCache
+from app.core.schemas import AggregatesRequest, DynamicRequest, TradingResultsRequest
 
 log = logging.getLogger(__name__)
 
+# колонки таблицы фактов, которые заполняет загрузка (COPY и upsert): строки парсера,
+# в которых названия инструмента и базиса заменены id справочников
+COPY_COLUMNS = (
+    "exchange_product_id",
+    "product_id",
+    "oil_id",
+    "delivery_basis_id",
+    "delivery_base_id",
+    "delivery_type_id",
+    "volume",
+    "total",
+    "count",
+    "date",
+)
+STAGING_TABLE = "spimex_trading_results_staging"
+
+# колонки ответа API в порядке полей TradingResultResponse: запросы на чтение отдают
+# кортежи этих колонок, без сборки ORM-объектов. Названия - из справочников, см. select_results()
+RESULT_COLUMNS = (
+    SpimexTradingResult.id,
+    SpimexTradingResult.exchange_product_id,
+    Product.name.label("exchange_product_name"),
+    SpimexTradingResult.oil_id,
+    SpimexTradingResult.delivery_basis_id,
+    DeliveryBase.name.label("delivery_basis_name"),
+    SpimexTradingResult.delivery_type_id,
+    SpimexTradingResult.volume,
+    SpimexTradingResult.total,
+    SpimexTradingResult.count,
+    SpimexTradingResult.date,
+    SpimexTradingResult.created_on,
+    SpimexTradingResult.updated_on,
+)
+
+
+def select_results() -> Select:
+    """select(*RESULT_COLUMNS) с присоединенными справочниками названий"""
+    return (
+        select(*RESULT_COLUMNS)
+        .join(Product, SpimexTradingResult.product_id == Product.id)
+        .join(DeliveryBase, SpimexTradingResult.delivery_base_id == DeliveryBase.id)
+    )
+
+
+def partition_ddl(dates: Iterable[date]) -> list[str]:
+    """
+    CREATE TABLE IF NOT EXISTS для месячных секций spimex_trading_results под даты строк:
+    секция spimex_trading_results_yYYYYmMM принимает даты [1-е число месяца, 1-е следующего).
+    """
+    table, statements = SpimexTradingResult.__tablename__, list()
+    for start in sorted({day.replace(day=1) for day in dates}):
+        end = (start + timedelta(days=32)).replace(day=1)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {table}_y{start:%Y}m{start:%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    return statements
+
 
 class IDBRepository(Protocol):
     @abstractmethod
@@ -21,73 +99,354 @@ class IDBRepository(Protocol):
     async def create_docs_bulk(self, data_list: list[dict[str, str]]) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_ingested_bulletins(self) -> list[IngestedBulletin]:
+        """Бюллетени, которые уже не нужно скачивать повторно (загруженные и дубликаты)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_download_validators(self) -> dict[str, tuple[str | None, str | None]]:
+        """
+        url -> (ETag, Last-Modified) последнего скачивания бюллетеней, которые будут
+        скачаны повторно (FAILED): неизменившийся файл сайт не отдает второй раз
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_bulletin(
+        self, bulletin: dict[str, str | int | date | None], data_list: list[dict[str, str]]
+    ) -> None:
+        """Сохраняем строки бюллетеня и запись манифеста в одной транзакции"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def copy_bulletins(
+        self,
+        bulletins: list[dict[str, str | int | date | None]],
+        data_list: list[dict[str, str]],
+    ) -> None:
+        """Строки нескольких бюллетеней через COPY и их записи манифеста одной транзакцией"""
+        raise NotImplementedError
+
     @abstractmethod
     async def get_all_trading_dates(self, limit: int) -> list[date]:
         raise NotImplementedError
 
     @abstractmethod
-    async def get_dynamics(self, request: DynamicRequest) -> list[SpimexTradingResult]:
+    async def get_dynamics(self, request: DynamicRequest) -> list[Row]:
+        """
+        Строки - кортежи колонок RESULT_COLUMNS в порядке (date DESC, id DESC).
+        Если запрошена страница, то строки после request.after, на одну больше
+        request.page_size: по лишней строке видно, что есть следующая страница.
+        """
         raise NotImplementedError
 
     @abstractmethod
-    async def get_trading_results(
-        self, request: TradingResultsRequest
-    ) -> list[SpimexTradingResult]:
+    def stream_dynamics(
+        self, request: DynamicRequest, batch_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        """То же, что get_dynamics, но пачками по batch_size строк с серверного курсора"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_trading_results(self, request: TradingResultsRequest) -> list[Row]:
+        """Строки - кортежи колонок RESULT_COLUMNS"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_aggregates(self, request: AggregatesRequest) -> list[Row]:
+        """
+        Итоги по (период, oil_id, delivery_basis_id) из trading_rollups - кортежи
+        в порядке полей AggregateResponse, период по убыванию.
+        """
         raise NotImplementedError
 
 
 class AlchemyRepository(IDBRepository):
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, dimensions: DimensionCache | None = None) -> None:
         self.session = session
+        self.dimensions = dimensions or DimensionCache()
 
     async def create_doc(self, data: dict[str, str | int]) -> None:
+        (data,) = await self._prepare_rows(data_list=[data])
         trade_model = SpimexTradingResult(**data)
         self.session.add(trade_model)
+        await self.session.flush()
+        await self._refresh_daily_tables(dates={trade_model.date})
         await self.session.commit()
         log.info("Файл успешно сохранен в БД!")
 
     async def create_docs_bulk(self, data_list: list[dict[str, str | int]]) -> None:
-        await self.session.execute(insert(SpimexTradingResult), data_list)
+        data_list = await self._prepare_rows(data_list=data_list)
+        await self._upsert_docs(data_list=data_list)
+        await self._refresh_daily_tables(dates={data["date"] for data in data_list})
         await self.session.commit()
 
-    async def get_all_trading_dates(self, limit: int) -> list[date]:
-        query = (
-            select(SpimexTradingResult.date)
-            .group_by(SpimexTradingResult.date)
-            .order_by(SpimexTradingResult.date.desc())
-        )
+    async def get_ingested_bulletins(self) -> list[IngestedBulletin]:
+        query = select(IngestedBulletin).where(IngestedBulletin.status != BulletinStatus.FAILED)
         result = await self.session.scalars(query)
         return list(result)
 
-    async def get_dynamics(self, request: DynamicRequest) -> list[SpimexTradingResult]:
-        query = (
-            select(SpimexTradingResult)
-            .where(SpimexTradingResult.date.between(request.start_date, request.end_date))
-            .order_by(SpimexTradingResult.date.desc())
+    async def get_download_validators(self) -> dict[str, tuple[str | None, str | None]]:
+        query = select(
+            IngestedBulletin.url, IngestedBulletin.etag, IngestedBulletin.last_modified
+        ).where(
+            IngestedBulletin.status == BulletinStatus.FAILED,
+            (IngestedBulletin.etag.is_not(None)) | (IngestedBulletin.last_modified.is_not(None)),
         )
+        result = await self.session.execute(query)
+        return {url: (etag, last_modified) for url, etag, last_modified in result}
+
+    async def save_bulletin(
+        self,
+        bulletin: dict[str, str | int | date | None],
+        data_list: list[dict[str, str | int]],
+    ) -> None:
+        if data_list:
+            data_list = await self._prepare_rows(data_list=data_list)
+            await self._upsert_docs(data_list=data_list)
+            await self._refresh_daily_tables(dates={data["date"] for data in data_list})
+        await self._upsert_bulletin(bulletin=bulletin)
+        await self.session.commit()
+
+    async def copy_bulletins(
+        self,
+        bulletins: list[dict[str, str | int | date | None]],
+        data_list: list[dict[str, str | int]],
+    ) -> None:
+        """
+        Бинарный COPY asyncpg во временную таблицу (живет до конца транзакции),
+        затем одно INSERT ... SELECT ... ON CONFLICT в spimex_trading_results.
+        """
+        if data_list:
+            data_list = await self._prepare_rows(data_list=data_list)
+            await self.session.execute(
+                text(
+                    f"CREATE TEMP TABLE {STAGING_TABLE} ON COMMIT DROP AS "
+                    f"SELECT {', '.join(COPY_COLUMNS)} FROM spimex_trading_results WITH NO DATA"
+                )
+            )
+            connection = await self.session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                STAGING_TABLE,
+                records=[tuple(row[name] for name in COPY_COLUMNS) for row in data_list],
+                columns=COPY_COLUMNS,
+            )
 
-        query = await self._shared_filter_query(request=request, query=query)
+            staging = table(STAGING_TABLE, *(column(name) for name in COPY_COLUMNS))
+            stmt = insert(SpimexTradingResult).from_select(
+                COPY_COLUMNS,
+                select(*staging.c).distinct(staging.c.date, staging.c.exchange_product_id),
+            )
+            await self.session.execute(self._on_conflict_update(stmt))
+            await self._refresh_daily_tables(dates={data["date"] for data in data_list})
+
+        for bulletin in bulletins:
+            await self._upsert_bulletin(bulletin=bulletin)
+        await self.session.commit()
+
+    async def _upsert_docs(self, data_list: list[dict[str, str | int]]) -> None:
+        """
+        Вставка по естественному ключу (date, exchange_product_id): повторная загрузка
+        того же бюллетеня обновляет строки, а не дублирует их.
+        """
+        stmt = self._on_conflict_update(insert(SpimexTradingResult))
+        await self.session.execute(stmt, data_list)
+
+    @staticmethod
+    def _on_conflict_update(stmt: Insert) -> Insert:
+        return stmt.on_conflict_do_update(
+            index_elements=[SpimexTradingResult.date, SpimexTradingResult.exchange_product_id],
+            set_={
+                "product_id": stmt.excluded.product_id,
+                "oil_id": stmt.excluded.oil_id,
+                "delivery_basis_id": stmt.excluded.delivery_basis_id,
+                "delivery_base_id": stmt.excluded.delivery_base_id,
+                "delivery_type_id": stmt.excluded.delivery_type_id,
+                "volume": stmt.excluded.volume,
+                "total": stmt.excluded.total,
+                "count": stmt.excluded.count,
+                "updated_on": func.now(),
+            },
+        )
+
+    async def _prepare_rows(self, data_list: list[dict[str, str | int]]) -> list[dict]:
+        """
+        Строки парсера -> строки таблицы фактов с id справочников вместо названий.
+        Отдельной транзакцией до записи строк создает недостающие месячные секции
+        и добавляет в справочники новые названия: в DimensionCache попадают только
+        закоммиченные id, а секция или название, оставшиеся после сбоя загрузки,
+        ничему не мешают. Вызывается в начале транзакции записи.
+        """
+        # существующая секция - только проверка имени, без блокировки родительской таблицы
+        for statement in partition_ddl(dates={row["date"] for row in data_list}):
+            await self.session.execute(text(statement))
+        resolved = dict()
+        if missing := self.dimensions.missing(data_list=data_list):
+            for name, names in missing.items():
+                model, _ = DIMENSIONS[name]
+                # сортировка - одинаковый порядок блокировок у параллельных загрузок
+                values = [{"name": value} for value in sorted(names)]
+                await self.session.execute(insert(model).on_conflict_do_nothing(), values)
+                result = await self.session.execute(
+                    select(model.name, model.id).where(model.name.in_(names))
+                )
+                resolved[name] = dict(result.tuples().all())
+        await self.session.commit()
+        for name, ids in resolved.items():
+            self.dimensions.ids[name].update(ids)
+
+        return [self.dimensions.fact_row(row) for row in data_list]
+
+    async def _refresh_daily_tables(self, dates: set[date]) -> None:
+        """Дневные таблицы, которые загрузка ведет в своей транзакции вместе с фактами"""
+        await self._refresh_trading_days(dates=dates)
+        await self._refresh_rollups(dates=dates)
+
+    async def _refresh_trading_days(self, dates: set[date]) -> None:
+        """
+        Пересчитывает trading_days для затронутых дат по самой таблице фактов (индекс по date),
+        поэтому повторная загрузка бюллетеня не завышает row_count.
+        """
+        if not dates:
+            return
+        counts = (
+            select(SpimexTradingResult.date, func.count())
+            .where(SpimexTradingResult.date.in_(dates))
+            .group_by(SpimexTradingResult.date)
+        )
+        stmt = insert(TradingDay).from_select(["date", "row_count"], counts)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TradingDay.date],
+            set_={"row_count": stmt.excluded.row_count, "updated_on": func.now()},
+        )
+        await self.session.execute(stmt)
+
+    async def _refresh_rollups(self, dates: set[date]) -> None:
+        """
+        Пересчитывает итоги trading_rollups за затронутые даты. Даты пересобираются целиком:
+        при повторной загрузке строка могла сменить oil_id или базис, и старая группа
+        не должна остаться со старой суммой.
+        """
+        if not dates:
+            return
+        await self.session.execute(delete(TradingRollup).where(TradingRollup.date.in_(dates)))
+        totals = (
+            select(
+                SpimexTradingResult.date,
+                SpimexTradingResult.oil_id,
+                SpimexTradingResult.delivery_basis_id,
+                func.sum(SpimexTradingResult.volume),
+                func.sum(SpimexTradingResult.total),
+                func.sum(SpimexTradingResult.count),
+            )
+            .where(SpimexTradingResult.date.in_(dates))
+            .group_by(
+                SpimexTradingResult.date,
+                SpimexTradingResult.oil_id,
+                SpimexTradingResult.delivery_basis_id,
+            )
+        )
+        await self.session.execute(
+            insert(TradingRollup).from_select(
+                ["date", "oil_id", "delivery_basis_id", "volume", "total", "count"], totals
+            )
+        )
+
+    async def _upsert_bulletin(self, bulletin: dict[str, str | int | date | None]) -> None:
+        stmt = insert(IngestedBulletin).values(**bulletin)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IngestedBulletin.url],
+            set_={
+                **{key: stmt.excluded[key] for key in bulletin if key != "url"},
+                "updated_on": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def get_all_trading_dates(self, limit: int) -> list[date]:
+        query = select(TradingDay.date).order_by(TradingDay.date.desc()).limit(limit)
         result = await self.session.scalars(query)
         return list(result)
 
-    async def get_trading_results(
-        self, request: TradingResultsRequest
-    ) -> list[SpimexTradingResult]:
+    async def get_dynamics(self, request: DynamicRequest) -> list[Row]:
+        query = await self._dynamics_query(request=request)
+        if request.page_size is not None:
+            # keyset: страница начинается сразу за ключом из cursor и читается из индекса
+            # (..., date, id) от этого места, поэтому N-я страница стоит столько же, сколько первая
+            if (after := request.after) is not None:
+                query = query.where(
+                    tuple_(SpimexTradingResult.date, SpimexTradingResult.id) < tuple_(*after)
+                )
+            query = query.limit(request.page_size + 1)
+        result = await self.session.execute(query)
+        return list(result)
+
+    async def stream_dynamics(
+        self, request: DynamicRequest, batch_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        # yield_per - серверный курсор asyncpg: в памяти не больше одной пачки строк
+        query = await self._dynamics_query(request=request)
+        result = await self.session.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield rows
+
+    async def _dynamics_query(self, request: DynamicRequest) -> Select:
         query = (
-            select(SpimexTradingResult)
+            select_results()
+            .where(SpimexTradingResult.date.between(request.start_date, request.end_date))
+            .order_by(SpimexTradingResult.date.desc(), SpimexTradingResult.id.desc())
+        )
+        return await self._shared_filter_query(request=request, query=query)
+
+    async def get_trading_results(self, request: TradingResultsRequest) -> list[Row]:
+        # сначала id последней строки по индексу фильтров, потом одна строка с названиями:
+        # с join справочников в том же запросе планировщик сортирует все строки инструмента
+        # (id, date), а не только id: по date выбирается одна секция, а не pk каждой из них
+        latest = (
+            select(SpimexTradingResult.id, SpimexTradingResult.date)
             .where(SpimexTradingResult.oil_id == request.oil_id)
             .order_by(SpimexTradingResult.date.desc())
             .limit(1)
         )
 
-        query = await self._shared_filter_query(request=request, query=query)
-        result = await self.session.scalars(query)
+        latest = await self._shared_filter_query(request=request, query=latest)
+        query = select_results().where(
+            tuple_(SpimexTradingResult.id, SpimexTradingResult.date) == latest.scalar_subquery()
+        )
+        result = await self.session.execute(query)
+        return list(result)
+
+    async def get_aggregates(self, request: AggregatesRequest) -> list[Row]:
+        period = TradingRollup.date
+        if request.bucket != "day":
+            # date_trunc('week') - понедельник ISO-недели, date_trunc('month') - первое число
+            period = func.date_trunc(request.bucket, TradingRollup.date).cast(Date)
+        period = period.label("period")
+
+        query = select(
+            period,
+            TradingRollup.oil_id,
+            TradingRollup.delivery_basis_id,
+            # sum(bigint) в Postgres - numeric, приводим обратно к целому
+            func.sum(TradingRollup.volume).cast(BigInteger).label("volume"),
+            func.sum(TradingRollup.total).cast(BigInteger).label("total"),
+            func.sum(TradingRollup.count).cast(BigInteger).label("count"),
+        ).where(TradingRollup.date.between(request.start_date, request.end_date))
+        if request.oil_id:
+            query = query.where(TradingRollup.oil_id == request.oil_id)
+        if request.delivery_basis_id:
+            query = query.where(TradingRollup.delivery_basis_id == request.delivery_basis_id)
+
+        query = query.group_by(period, TradingRollup.oil_id, TradingRollup.delivery_basis_id)
+        query = query.order_by(period.desc(), TradingRollup.oil_id, TradingRollup.delivery_basis_id)
+        result = await self.session.execute(query)
         return list(result)
 
     @staticmethod
     async def _shared_filter_query(
-            request: DynamicRequest | TradingResultsRequest,
-            query: Select
+        request: DynamicRequest | TradingResultsRequest, query: Select
     ) -> Select:
 
         if request.oil_id:
@@ -0,0 +1,33 @@
+from app.core.database.models import DeliveryBase, Product
+
+# строковая колонка парсера -> (справочник, колонка с id справочника в таблице фактов)
+DIMENSIONS = {
+    "exchange_product_name": (Product, "product_id"),
+    "delivery_basis_name": (DeliveryBase, "delivery_base_id"),
+}
+
+
+class DimensionCache:
+    """
+    Id справочников products и delivery_bases по названию, свой в каждом воркере.
+    Справочники только растут, поэтому id из кэша не устаревает. В кэш попадают только
+    закоммиченные id, см. AlchemyRepository._prepare_rows().
+    """
+
+    def __init__(self) -> None:
+        self.ids: dict[str, dict[str, int]] = {name: dict() for name in DIMENSIONS}
+
+    def missing(self, data_list: list[dict]) -> dict[str, set[str]]:
+        """Названия из строк загрузки, которых еще нет в кэше, по колонкам парсера"""
+        missing = dict()
+        for name, ids in self.ids.items():
+            if names := {row[name] for row in data_list} - ids.keys():
+                missing[name] = names
+        return missing
+
+    def fact_row(self, row: dict) -> dict:
+        """Строка парсера -> строка таблицы фактов: названия заменены id справочников"""
+        fact = {key: value for key, value in row.items() if key not in DIMENSIONS}
+        for name, (_, id_column) in DIMENSIONS.items():
+            fact[id_column] = self.ids[name][row[name]]
+        return fact
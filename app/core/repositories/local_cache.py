@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class TierStats:
+    hits: int = 0
+    misses: int = 0
+
+
+@dataclass
+class CacheStats:
+    """Счетчики попаданий по уровням кэша, свои в каждом воркере"""
+
+    local: TierStats = field(default_factory=TierStats)
+    redis: TierStats = field(default_factory=TierStats)
+
+    def report(self) -> dict[str, dict[str, int]]:
+        return asdict(self)
+
+
+class CacheNamespace:
+    """
+    Версия данных, известная воркеру: префикс всех ключей кэша. None - неизвестна,
+    будет прочитана из redis при следующем обращении.
+    """
+
+    def __init__(self) -> None:
+        self.version: int | None = None
+
+
+class LocalCache:
+    """
+    Кэш в памяти воркера (L1) перед redis: TTL + LRU с бюджетом памяти.
+
+    Хранит те же байты, что и redis (готовые тела ответов), поэтому попадание
+    не стоит похода в redis, а бюджет памяти считается по их длине.
+    Между воркерами согласуется через канал pub/sub, см. listen_invalidations().
+    TTL ограничивает устаревание, если сообщение потерялось.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, stats: CacheStats) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = stats
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            self._pop(key)
+            entry = None
+        if entry is None:
+            self.stats.local.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.local.hits += 1
+        return entry[1]
+
+    def put(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        self._pop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def report(self) -> dict[str, int]:
+        return {"entries": len(self), "bytes": self.size, "max_bytes": self.max_bytes}
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+
+async def listen_invalidations(
+    redis: aioredis.Redis,
+    channel: str,
+    namespace: CacheNamespace,
+    local_cache: LocalCache,
+    retry_delay: float = 1.0,
+) -> None:
+    """
+    Слушает канал с новыми версиями данных до отмены задачи: запоминает версию
+    и сбрасывает L1. После (пере)подписки версия перечитывается из redis,
+    потому что сообщения за время без подписки могли потеряться.
+    """
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(channel)
+                namespace.version = None
+                local_cache.clear()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        namespace.version = int(message["data"])
+                        local_cache.clear()
+                        log.info("Новая версия данных кэша: %d", namespace.version)
+        except RedisError as e:
+            log.warning("Подписка на %s прервалась: %r", channel, e)
+            namespace.version = None
+            local_cache.clear()
+            await asyncio.sleep(retry_delay)
@@ -0,0 +1,140 @@
+from abc import abstractmethod
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import Protocol
+
+from app.core.database.models.ingestion_runs import IngestionRun, RunStatus, RunTrigger
+
+
+class IRunRepository(Protocol):
+    @abstractmethod
+    async def fail_stale(self, stale_after: float) -> None:
+        """Запуски в статусе running старше stale_after секунд помечаются оборвавшимися"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def start_run(
+        self, trigger: RunTrigger, scheduled_for: datetime | None, stale_after: float
+    ) -> int | None:
+        """
+        Записывает начало запуска и возвращает его id; None - уже выполняется другой запуск.
+        Запуск в статусе running старше stale_after секунд считается оборвавшимся.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def finish_run(
+        self,
+        run_id: int,
+        status: RunStatus,
+        bulletins: int = 0,
+        rows: int = 0,
+        stages: dict[str, float] | None = None,
+        error: str | None = None,
+    ) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_runs(self, limit: int) -> list[IngestionRun]:
+        """Последние limit запусков, новые первыми"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_last_success(self) -> IngestionRun | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_last_finished(self) -> IngestionRun | None:
+        """Последний завершенный (не running) запуск"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_last_scheduled(self) -> datetime | None:
+        """Последний срок расписания, за который загрузка прошла успешно"""
+        raise NotImplementedError
+
+
+class AlchemyRunRepository(IRunRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def fail_stale(self, stale_after: float) -> None:
+        # запуск дольше stale_after не бывает (он прерывается по таймауту), значит
+        # его процесс упал, не успев записать результат
+        await self.session.execute(
+            update(IngestionRun)
+            .where(
+                IngestionRun.status == RunStatus.RUNNING,
+                IngestionRun.started_at < func.now() - timedelta(seconds=stale_after),
+            )
+            .values(status=RunStatus.FAILED, finished_at=func.now(), error="оборвался")
+        )
+        await self.session.commit()
+
+    async def start_run(
+        self, trigger: RunTrigger, scheduled_for: datetime | None, stale_after: float
+    ) -> int | None:
+        await self.fail_stale(stale_after=stale_after)
+        run = IngestionRun(trigger=trigger, scheduled_for=scheduled_for, status=RunStatus.RUNNING)
+        self.session.add(run)
+        try:
+            await self.session.commit()
+        except IntegrityError:
+            # частичный уникальный индекс uq_ingestion_runs_running
+            await self.session.rollback()
+            return None
+        return run.id
+
+    async def finish_run(
+        self,
+        run_id: int,
+        status: RunStatus,
+        bulletins: int = 0,
+        rows: int = 0,
+        stages: dict[str, float] | None = None,
+        error: str | None = None,
+    ) -> None:
+        await self.session.execute(
+            update(IngestionRun)
+            .where(IngestionRun.id == run_id)
+            .values(
+                status=status,
+                finished_at=func.now(),
+                bulletins=bulletins,
+                rows=rows,
+                stages=stages or dict(),
+                error=error,
+            )
+        )
+        await self.session.commit()
+
+    async def get_runs(self, limit: int) -> list[IngestionRun]:
+        query = select(IngestionRun).order_by(IngestionRun.id.desc()).limit(limit)
+        return list(await self.session.scalars(query))
+
+    async def get_last_success(self) -> IngestionRun | None:
+        query = (
+            select(IngestionRun)
+            .where(IngestionRun.status == RunStatus.SUCCEEDED)
+            .order_by(IngestionRun.id.desc())
+            .limit(1)
+        )
+        return await self.session.scalar(query)
+
+    async def get_last_finished(self) -> IngestionRun | None:
+        query = (
+            select(IngestionRun)
+            .where(IngestionRun.status != RunStatus.RUNNING)
+            .order_by(IngestionRun.id.desc())
+            .limit(1)
+        )
+        return await self.session.scalar(query)
+
+    async def get_last_scheduled(self) -> datetime | None:
+        query = select(func.max(IngestionRun.scheduled_for)).where(
+            IngestionRun.status == RunStatus.SUCCEEDED
+        )
+        return await self.session.scalar(query)
@@ -0,0 +1,262 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import namedtuple
+from datetime import date
+from pathlib import Path
+from typing import AsyncIterator, Sequence
+
+import numpy as np
+
+from app.core.repositories.db_repository import RESULT_COLUMNS
+from app.core.schemas import DynamicRequest, TradingResultsRequest
+
+log = logging.getLogger(__name__)
+
+_MAGIC = b"SPXS"
+_MAGIC_SIZE = len(_MAGIC)
+_PREFIX = _MAGIC_SIZE + 4  # MAGIC + длина заголовка (uint32 little-endian)
+_ALIGN = 8
+_POINTER = "CURRENT"
+
+RESULT_FIELDS = tuple(column.key for column in RESULT_COLUMNS)
+# строки снимка ведут себя как Row из БД: кортеж колонок RESULT_COLUMNS с доступом по имени
+SnapshotRow = namedtuple("SnapshotRow", RESULT_FIELDS)
+
+# строковые колонки хранятся кодами словаря, числовые и даты - как есть
+_DICTIONARY_COLUMNS = (
+    "exchange_product_id",
+    "exchange_product_name",
+    "oil_id",
+    "delivery_basis_id",
+    "delivery_basis_name",
+    "delivery_type_id",
+)
+_DTYPES = {
+    "id": np.int64,
+    "volume": np.int64,
+    "total": np.int64,
+    "count": np.int64,
+    "date": "datetime64[D]",
+    "created_on": "datetime64[D]",
+    "updated_on": "datetime64[D]",
+}
+# фильтры запросов -> колонка кодов
+_FILTERS = ("oil_id", "delivery_type_id", "delivery_basis_id")
+
+
+class Snapshot:
+    """
+    Колоночный снимок spimex_trading_results: строки отсортированы по (date, id),
+    строковые колонки закодированы словарем. Числовые буферы - np.memmap одного файла,
+    поэтому все воркеры читают одну копию из page cache.
+
+    Запросы повторяют AlchemyRepository: диапазон дат - два бинарных поиска по date,
+    фильтры - векторное сравнение кодов внутри диапазона.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(raw[:_MAGIC_SIZE]) != _MAGIC:
+            raise ValueError("неизвестный формат снимка")
+        header_end = _PREFIX + int.from_bytes(bytes(raw[_MAGIC_SIZE:_PREFIX]), "little")
+        header = json.loads(bytes(raw[_PREFIX:header_end]))
+        data_start = _aligned(header_end)
+
+        self.version: int = header["version"]
+        self.rows: int = header["rows"]
+        self.dictionaries: dict[str, list[str]] = header["dictionaries"]
+        self._codes = {
+            name: {value: code for code, value in enumerate(values)}
+            for name, values in self.dictionaries.items()
+        }
+        self.columns: dict[str, np.ndarray] = dict()
+        for name, (dtype, offset, nbytes) in header["columns"].items():
+            start = data_start + offset
+            stop = start + nbytes
+            self.columns[name] = raw[start:stop].view(np.dtype(dtype))
+
+    def trading_dates(self, limit: int) -> list[date]:
+        return self.columns["days"][::-1][:limit].tolist()
+
+    def dynamics(self, request: DynamicRequest) -> list[SnapshotRow]:
+        dates = self.columns["date"]
+        start = np.searchsorted(dates, np.datetime64(request.start_date), side="left")
+        stop = np.searchsorted(dates, np.datetime64(request.end_date), side="right")
+        if request.page_size is not None and (after := request.after) is not None:
+            stop = min(stop, self._position(*after))
+
+        positions = self._select(request=request, start=start, stop=stop)[::-1]
+        if request.page_size is not None:
+            positions = positions[: request.page_size + 1]
+        return self._materialize(positions)
+
+    def trading_results(self, request: TradingResultsRequest) -> list[SnapshotRow]:
+        # как в AlchemyRepository: без oil_id запрос ничего не находит
+        if not request.oil_id:
+            return list()
+        # последняя подходящая строка в порядке (date, id) - самые свежие торги
+        return self._materialize(self._select(request=request, start=0, stop=self.rows)[-1:])
+
+    def _position(self, after_date: date, after_id: int) -> int:
+        """Первая строка с (date, id) >= (after_date, after_id): внутри даты id возрастают"""
+        dates = self.columns["date"]
+        day = np.datetime64(after_date)
+        start = np.searchsorted(dates, day, side="left")
+        stop = np.searchsorted(dates, day, side="right")
+        return start + int(np.searchsorted(self.columns["id"][start:stop], after_id))
+
+    def _select(
+        self, request: DynamicRequest | TradingResultsRequest, start: int, stop: int
+    ) -> np.ndarray:
+        mask = None
+        for name in _FILTERS:
+            if not (value := getattr(request, name)):
+                continue
+            if (code := self._codes[name].get(value)) is None:
+                return np.empty(0, dtype=np.int64)
+            matches = self.columns[name][start:stop] == code
+            mask = matches if mask is None else mask & matches
+        if mask is None:
+            return np.arange(start, stop)
+        return start + np.flatnonzero(mask)
+
+    def _materialize(self, positions: np.ndarray) -> list[SnapshotRow]:
+        columns = list()
+        for name in RESULT_FIELDS:
+            values = self.columns[name][positions].tolist()
+            if name in self.dictionaries:
+                dictionary = self.dictionaries[name]
+                values = [dictionary[code] for code in values]
+            columns.append(values)
+        return [SnapshotRow._make(row) for row in zip(*columns)]
+
+
+class SnapshotStore:
+    """
+    Каталог версий снимка и указатель CURRENT на действующую. Выгрузка пишет новую
+    версию во временный файл и переключает указатель через os.replace, поэтому
+    воркер видит либо старый, либо новый снимок целиком. Воркер проверяет указатель
+    (stat) при каждом чтении и подменяет у себя снимок одним присваиванием: запросы,
+    начатые на старой версии, дочитывают ее mmap, даже если файл уже удален.
+    Выключенное хранилище (enabled=False) ничего не читает и не пишет.
+    """
+
+    def __init__(self, directory: Path, keep_versions: int, enabled: bool = True) -> None:
+        self.directory = Path(directory)
+        self.keep_versions = keep_versions
+        self.enabled = enabled
+        self._snapshot: Snapshot | None = None
+        self._pointer_stat: tuple[int, int] | None = None
+        if enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def current(self) -> Snapshot | None:
+        if not self.enabled:
+            return None
+        try:
+            stat = (self.directory / _POINTER).stat()
+        except FileNotFoundError:
+            return None
+
+        if (stat.st_ino, stat.st_mtime_ns) != self._pointer_stat:
+            name = (self.directory / _POINTER).read_text().strip()
+            self._snapshot = Snapshot(self.directory / name)
+            self._pointer_stat = (stat.st_ino, stat.st_mtime_ns)
+            log.info(
+                "Снимок торгов: версия %d, %d строк", self._snapshot.version, self._snapshot.rows
+            )
+        return self._snapshot
+
+    def is_missing(self) -> bool:
+        return self.enabled and not (self.directory / _POINTER).exists()
+
+    async def export(self, batches: AsyncIterator[Sequence[tuple]]) -> Path | None:
+        """
+        Выгружает строки в новую версию снимка и делает ее действующей.
+        batches - пачки кортежей колонок RESULT_COLUMNS в порядке (date DESC, id DESC),
+        как их отдает IDBRepository.stream_dynamics.
+        """
+        if not self.enabled:
+            return None
+        start = time.time()
+        values: dict[str, list] = {name: list() for name in RESULT_FIELDS}
+        dictionaries: dict[str, dict[str, int]] = {name: dict() for name in _DICTIONARY_COLUMNS}
+        async for rows in batches:
+            for name, column in zip(RESULT_FIELDS, zip(*rows)):
+                if (codes := dictionaries.get(name)) is not None:
+                    column = [codes.setdefault(value, len(codes)) for value in column]
+                values[name].extend(column)
+
+        # снимок хранится по возрастанию (date, id): так работает searchsorted
+        buffers = {
+            name: np.array(column[::-1], dtype=_DTYPES.get(name, np.int32))
+            for name, column in values.items()
+        }
+        buffers["days"] = np.unique(buffers["date"])
+
+        version = time.time_ns()
+        path = self.directory / f"snapshot-{version}.bin"
+        self._write(
+            path=path,
+            header={
+                "version": version,
+                "rows": len(buffers["id"]),
+                "dictionaries": {name: list(codes) for name, codes in dictionaries.items()},
+            },
+            buffers=buffers,
+        )
+        self._switch(path)
+        self._cleanup()
+        log.info(
+            "Снимок торгов %s: %d строк за %.2f сек",
+            path.name,
+            len(buffers["id"]),
+            time.time() - start,
+        )
+        return path
+
+    def _switch(self, path: Path) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(path.name)
+            os.replace(tmp, self.directory / _POINTER)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _cleanup(self) -> None:
+        """Оставляет keep_versions последних версий: воркеры могут еще дочитывать прошлую"""
+        versions = sorted(self.directory.glob("snapshot-*.bin"), key=lambda p: p.stat().st_mtime)
+        for path in versions[: -self.keep_versions]:
+            path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _write(path: Path, header: dict, buffers: dict[str, np.ndarray]) -> None:
+        layout, offset = dict(), 0
+        for name, buffer in buffers.items():
+            layout[name] = (buffer.dtype.str, offset, buffer.nbytes)
+            offset += _aligned(buffer.nbytes)
+
+        encoded = json.dumps({**header, "columns": layout}).encode()
+        data_start = _aligned(_PREFIX + len(encoded))
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_MAGIC + len(encoded).to_bytes(4, "little") + encoded)
+                for name, buffer in buffers.items():
+                    f.seek(data_start + layout[name][1])
+                    f.write(buffer.tobytes())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
@@ -0,0 +1,68 @@
+from datetime import date
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Row
+
+from app.core.database.models.ingested_bulletins import IngestedBulletin
+from app.core.repositories.db_repository import AlchemyRepository, IDBRepository
+from app.core.repositories.snapshot import SnapshotStore
+from app.core.schemas import AggregatesRequest, DynamicRequest, TradingResultsRequest
+
+
+class SnapshotRepository(IDBRepository):
+    """
+    Чтение get_last_trading_dates, get_dynamics и get_trading_results из колоночного
+    снимка (SnapshotStore) вместо Postgres. Пока снимка нет, эти запросы, как и все
+    остальные (запись, поток, сводки), идут в БД.
+    """
+
+    def __init__(self, db: AlchemyRepository, store: SnapshotStore) -> None:
+        self.db = db
+        self.store = store
+
+    async def get_all_trading_dates(self, limit: int) -> list[date]:
+        if (snapshot := self.store.current()) is None:
+            return await self.db.get_all_trading_dates(limit=limit)
+        return snapshot.trading_dates(limit=limit)
+
+    async def get_dynamics(self, request: DynamicRequest) -> list[Row]:
+        if (snapshot := self.store.current()) is None:
+            return await self.db.get_dynamics(request=request)
+        return snapshot.dynamics(request=request)
+
+    async def get_trading_results(self, request: TradingResultsRequest) -> list[Row]:
+        if (snapshot := self.store.current()) is None:
+            return await self.db.get_trading_results(request=request)
+        return snapshot.trading_results(request=request)
+
+    def stream_dynamics(
+        self, request: DynamicRequest, batch_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        return self.db.stream_dynamics(request=request, batch_size=batch_size)
+
+    async def get_aggregates(self, request: AggregatesRequest) -> list[Row]:
+        return await self.db.get_aggregates(request=request)
+
+    async def create_doc(self, data: dict[str, str]) -> None:
+        await self.db.create_doc(data=data)
+
+    async def create_docs_bulk(self, data_list: list[dict[str, str]]) -> None:
+        await self.db.create_docs_bulk(data_list=data_list)
+
+    async def get_ingested_bulletins(self) -> list[IngestedBulletin]:
+        return await self.db.get_ingested_bulletins()
+
+    async def get_download_validators(self) -> dict[str, tuple[str | None, str | None]]:
+        return await self.db.get_download_validators()
+
+    async def save_bulletin(
+        self, bulletin: dict[str, str | int | date | None], data_list: list[dict[str, str]]
+    ) -> None:
+        await self.db.save_bulletin(bulletin=bulletin, data_list=data_list)
+
+    async def copy_bulletins(
+        self,
+        bulletins: list[dict[str, str | int | date | None]],
+        data_list: list[dict[str, str]],
+    ) -> None:
+        await self.db.copy_bulletins(bulletins=bulletins, data_list=data_list)
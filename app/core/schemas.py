@@ -0,0 +1,169 @@
+import base64
+import binascii
+from datetime import date, datetime
+from typing import Annotated, Literal
+
+import orjson
+from pydantic import AfterValidator, BaseModel, Field, field_serializer
+
+# страница get_dynamics: по умолчанию, если передан только cursor, и максимум для limit
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(last_date: date, last_id: int) -> str:
+    """Токен продолжения: ключ (date, id) последней строки страницы, непрозрачный для клиента"""
+    payload = orjson.dumps([last_date, last_id])
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_date, last_id = orjson.loads(payload)
+        return date.fromisoformat(last_date), int(last_id)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+        raise ValueError("Некорректный cursor")
+
+
+def _check_cursor(cursor: str | None) -> str | None:
+    # проверка на уровне параметра запроса: битый токен - 422, а не 500 в репозитории
+    if cursor is not None:
+        decode_cursor(cursor)
+    return cursor
+
+
+class TradingResultResponse(BaseModel):
+    id: int
+    exchange_product_id: str
+    exchange_product_name: str
+    oil_id: str
+    delivery_basis_id: str
+    delivery_basis_name: str
+    delivery_type_id: str
+    volume: int
+    total: int
+    count: int
+    date: date
+    created_on: date
+    updated_on: date
+
+    @field_serializer("date", "created_on", "updated_on")
+    def serialize_dates(self, v: date | datetime) -> str:
+        return v.isoformat()
+
+    class Config:
+        from_attributes = True
+
+
+class LastDatesRequest(BaseModel):
+    limit: int = Field(default=10, description="Количество последних торговых дней", gt=0)
+
+
+class DynamicRequest(BaseModel):
+    oil_id: str | None = Field(None, description="Код нефтепродукта")
+    delivery_type_id: str | None = Field(None, description="Тип поставки")
+    delivery_basis_id: str | None = Field(None, description="Базис поставки")
+    start_date: date = Field(..., description="Начальная дата периода")
+    end_date: date = Field(..., description="Конечная дата периода")
+    limit: int | None = Field(
+        None,
+        description=f"Размер страницы (до {MAX_PAGE_SIZE}); без limit и cursor - весь период",
+        gt=0,
+        le=MAX_PAGE_SIZE,
+    )
+    cursor: Annotated[str | None, AfterValidator(_check_cursor)] = Field(
+        None, description="next_cursor из предыдущей страницы"
+    )
+
+    @property
+    def page_size(self) -> int | None:
+        """None - постраничная выдача не запрошена"""
+        if self.limit is None and self.cursor is None:
+            return None
+        return self.limit or DEFAULT_PAGE_SIZE
+
+    @property
+    def after(self) -> tuple[date, int] | None:
+        """Ключ (date, id), после которого начинается страница"""
+        return decode_cursor(self.cursor) if self.cursor is not None else None
+
+
+class DynamicsPage(BaseModel):
+    items: list[TradingResultResponse]
+    next_cursor: str | None = Field(None, description="None - это последняя страница")
+
+
+class TradingResultsRequest(BaseModel):
+    oil_id: str | None = Field(None, description="Код нефтепродукта")
+    delivery_type_id: str | None = Field(None, description="Тип поставки")
+    delivery_basis_id: str | None = Field(None, description="Базис поставки")
+
+
+class AggregatesRequest(BaseModel):
+    oil_id: str | None = Field(None, description="Код нефтепродукта")
+    delivery_basis_id: str | None = Field(None, description="Базис поставки")
+    start_date: date = Field(..., description="Начальная дата периода")
+    end_date: date = Field(..., description="Конечная дата периода")
+    bucket: Literal["day", "week", "month"] = Field(
+        "day",
+        description="Шаг сводки: день, ISO-неделя или месяц; крайние недели и месяцы "
+        "суммируются только по дням внутри периода",
+    )
+
+
+class AggregateResponse(BaseModel):
+    period: date = Field(..., description="Первый день периода сводки")
+    oil_id: str
+    delivery_basis_id: str
+    volume: int
+    total: int
+    count: int
+
+
+class CacheTierStats(BaseModel):
+    hits: int
+    misses: int
+
+
+class LocalCacheStats(BaseModel):
+    enabled: bool
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+class CacheStatsResponse(BaseModel):
+    pid: int = Field(..., description="Воркер, который ответил: счетчики у каждого свои")
+    data_version: int | None = Field(None, description="Версия данных в ключах кэша")
+    local: CacheTierStats
+    redis: CacheTierStats
+    local_cache: LocalCacheStats
+
+
+class IngestionRunResponse(BaseModel):
+    id: int
+    trigger: str = Field(..., description="scheduled - по расписанию, manual - --once")
+    status: str = Field(..., description="running, succeeded или failed")
+    scheduled_for: datetime | None = Field(None, description="Срок расписания запуска")
+    started_at: datetime
+    finished_at: datetime | None
+    duration: float | None = Field(None, description="Длительность запуска, сек")
+    bulletins: int = Field(..., description="Загружено бюллетеней")
+    rows: int = Field(..., description="Загружено строк торгов")
+    stages: dict[str, float] = Field(
+        ..., description="Длительность стадий, сек: crawl, download, parse, load, cache_refresh"
+    )
+    error: str | None
+
+    class Config:
+        from_attributes = True
+
+
+class IngestionStatusResponse(BaseModel):
+    status: Literal["running", "idle"]
+    schedule: str = Field(..., description="Время ежедневной загрузки (локальное) и разброс")
+    next_run: datetime = Field(..., description="Следующий срок расписания без разброса")
+    last_run: IngestionRunResponse | None
+    last_success: IngestionRunResponse | None
+    runs: list[IngestionRunResponse] = Field(..., description="Последние запуски, новые первыми")
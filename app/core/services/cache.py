@@ -0,0 +1,67 @@
+import hashlib
+import inspect
+import json
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+from pydantic import BaseModel
+
+TTLResolver = Callable[..., Awaitable[int | None]]
+
+
+def request_cache_key(prefix: str, arguments: dict[str, Any]) -> str:
+    """
+    Ключ кэша метода: префикс и sha256 нормализованных аргументов. Модели запросов
+    сериализуются без None-полей и с отсортированными ключами, поэтому незаданный фильтр
+    и явно переданный None, а также разный порядок параметров дают один и тот же ключ.
+    """
+    normalized = {
+        name: (
+            value.model_dump(mode="json", exclude_none=True)
+            if isinstance(value, BaseModel)
+            else value
+        )
+        for name, value in arguments.items()
+    }
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{prefix}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+def cached(prefix: str, ttl: str | TTLResolver):
+    """
+    Кэширует в redis тело ответа метода Service (готовые байты JSON) по ключу
+    из его аргументов. Попадание возвращает эти байты как есть, без разбора.
+
+    prefix - имя поля settings.redis с префиксом ключа. ttl - имя поля settings.redis
+    со сроком жизни или корутина (self, **аргументы метода) -> срок, если он зависит
+    от запроса.
+    """
+
+    def decorator(method: Callable[..., Awaitable[bytes]]) -> Callable[..., Awaitable[bytes]]:
+        signature = inspect.signature(method)
+
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs) -> bytes:
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop("self")
+
+            # версия данных в ключе фиксируется до чтения: см. ICacheRepository.namespaced
+            key = await self.cache_repository.namespaced(
+                request_cache_key(getattr(self.settings.redis, prefix), arguments)
+            )
+            if (body := await self.cache_repository.get_cached_data(key=key)) is not None:
+                return body
+
+            body = await method(self, *args, **kwargs)
+            if isinstance(ttl, str):
+                seconds = getattr(self.settings.redis, ttl)
+            else:
+                seconds = await ttl(self, **arguments)
+            await self.cache_repository.set_cached_data(data=body, key=key, ttl=seconds)
+            return body
+
+        return wrapper
+
+    return decorator
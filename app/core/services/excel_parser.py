@@ -1,79 +1,205 @@
 import asyncio
 import logging
 from concurrent.futures import ProcessPoolExecutor
+from datetime import date as _date
 from datetime import datetime
-from pathlib import Path
+from itertools import chain
+from typing import Literal, NamedTuple
 
+import numpy as np
 import pandas as pd
+import xlrd
 from pandas import DataFrame
 
 log = logging.getLogger(__name__)
 
+ExcelReader = Literal["pandas", "xlrd"]
+
+# меняется при любом изменении результата разбора - старые записи ParseCache перестают читаться
+PARSER_VERSION = 1
+
+SECTION_HEADER = "Единица измерения: Метрическая тонна"
+SECTION_FOOTER = "Итого:"
+
+# колонки бюллетеня, которые нам нужны: код инструмента, наименование, базис поставки,
+# объем в единицах измерения, объем в рублях, количество договоров
+ID_COL, NAME_COL, BASIS_COL, VOLUME_COL, TOTAL_COL, COUNT_COL = 1, 2, 3, 4, 5, 14
+
+
+class ParsedBulletin(NamedTuple):
+    """
+    Колоночный результат разбора одного бюллетеня. Между процессами передается он,
+    а не список словарей: дата одна на файл, ключи не повторяются в каждой строке,
+    числа лежат в numpy-массивах.
+    """
+
+    date: _date
+    exchange_product_id: list[str]
+    exchange_product_name: list[str]
+    delivery_basis_name: list[str]
+    volume: np.ndarray
+    total: np.ndarray
+    count: np.ndarray
+
+    @property
+    def size(self) -> int:
+        return len(self.exchange_product_id)
+
+    def to_records(self) -> list[dict[str, str | int]]:
+        product_ids = pd.Series(self.exchange_product_id, dtype=object).astype(str).str
+        data = {
+            "exchange_product_id": self.exchange_product_id,
+            "exchange_product_name": self.exchange_product_name,
+            "oil_id": product_ids[:4].tolist(),
+            "delivery_basis_id": product_ids[4:7].tolist(),
+            "delivery_basis_name": self.delivery_basis_name,
+            "delivery_type_id": product_ids[-1].tolist(),
+            "volume": self.volume.tolist(),
+            "total": self.total.tolist(),
+            "count": self.count.tolist(),
+            "date": [self.date] * self.size,
+        }
+        keys = tuple(data)
+        return [dict(zip(keys, values)) for values in zip(*data.values())]
+
+
+def parse_files_chunk(
+    reader: ExcelReader, paths: list[str]
+) -> list[ParsedBulletin | BaseException]:
+    """
+    Выполняется в процессе пула. Функция модульная, поэтому в задачу пиклится только
+    режим чтения и пути, а не экземпляр парсера. Ошибка файла возвращается на его месте.
+    """
+    parser = ExcelParser(reader=reader)
+    results = list()
+    for path in paths:
+        try:
+            results.append(parser.parse_excel_columns(path))
+        except Exception as e:
+            results.append(e)
+    return results
+
 
 class ExcelParser:
-    async def parse_all_excel_files(self) -> list[list[dict[str, str | int]]]:
-        paths = self._get_all_excel_files_name()
+    """
+    Разбор бюллетеня SPIMEX. Два способа чтения файла:
+    - pandas: pd.read_excel всего листа в DataFrame;
+    - xlrd: из книги читаются только нужные колонки секции, без DataFrame.
+
+    Для пакетного разбора держит долгоживущий пул процессов на workers воркеров,
+    файлы отправляются в него группами по chunk_size. Пул закрывается в close().
+    """
+
+    def __init__(
+        self,
+        reader: ExcelReader = "pandas",
+        workers: int | None = None,
+        chunk_size: int = 1,
+    ) -> None:
+        self.reader = reader
+        self.workers = workers
+        self.chunk_size = max(chunk_size, 1)
+        self._pool: ProcessPoolExecutor | None = None
+
+    def __getstate__(self) -> dict:
+        # пул не пиклится и в дочерних процессах не нужен
+        return {**self.__dict__, "_pool": None}
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def parse_files(self, paths: list[str]) -> list[ParsedBulletin | BaseException]:
+        """Разбирает файлы в пуле группами по chunk_size, результаты - в порядке paths"""
         loop = asyncio.get_running_loop()
-
-        with ProcessPoolExecutor() as pool:
-            tasks = [loop.run_in_executor(pool, self.parse_excel_file, path) for path in paths]
-            return await asyncio.gather(*tasks)
+        chunks = list()
+        for start in range(0, len(paths), self.chunk_size):
+            stop = start + self.chunk_size
+            chunks.append(paths[start:stop])
+        tasks = [
+            loop.run_in_executor(self.pool, parse_files_chunk, self.reader, chunk)
+            for chunk in chunks
+        ]
+        return list(chain.from_iterable(await asyncio.gather(*tasks)))
 
     def parse_excel_file(self, file_path) -> list[dict[str, str | int]]:
+        return self.parse_excel_columns(file_path=file_path).to_records()
+
+    def parse_excel_columns(self, file_path) -> ParsedBulletin:
+        if self.reader == "xlrd":
+            return self.parse_xlrd_file(file_path=file_path)
         df = pd.read_excel(file_path)
-        date = df.iloc[2, 1][-10:]
-        start_row = self._get_start_row(df=df)
-        all_data = self._get_all_data(start_row=start_row, df=df, date=date)
-        return all_data
+        return self.parse_dataframe(df=df)
+
+    def parse_dataframe(self, df: DataFrame) -> ParsedBulletin:
+        date = self._parse_date(df.iloc[2, 1])
+        start_row, end_row = self._get_section(first_column=df.iloc[:, ID_COL].to_numpy(), start=4)
+        section = df.iloc[start_row:end_row]
+        return self._get_all_data(
+            columns=[section.iloc[:, col].to_numpy() for col in self._columns()],
+            date=date,
+        )
+
+    def parse_xlrd_file(self, file_path) -> ParsedBulletin:
+        # pandas берет первую строку листа в заголовок, поэтому строка листа = строка df + 1
+        book = xlrd.open_workbook(file_path, on_demand=True)
+        try:
+            sheet = book.sheet_by_index(0)
+            first_column = np.array(sheet.col_values(ID_COL), dtype=object)
+            date = self._parse_date(first_column[3])
+            start_row, end_row = self._get_section(first_column=first_column, start=5)
+            columns = [
+                np.array(sheet.col_values(col, start_row, end_row), dtype=object)
+                for col in self._columns()
+            ]
+        finally:
+            book.release_resources()
+        return self._get_all_data(columns=columns, date=date)
+
+    @staticmethod
+    def _columns() -> tuple[int, ...]:
+        return ID_COL, NAME_COL, BASIS_COL, VOLUME_COL, TOTAL_COL, COUNT_COL
 
     @staticmethod
-    def _get_start_row(df: DataFrame) -> int:
-        start_row = 4
-        while "Единица измерения: Метрическая тонна" != df.iloc[start_row, 1]:
-            start_row += 1
-        else:
-            start_row += 3
-        return start_row
+    def _parse_date(cell: str) -> _date:
+        return datetime.strptime(cell[-10:], "%d.%m.%Y").date()
 
     @staticmethod
-    def _get_all_data(start_row: int, df: DataFrame, date: str) -> list[dict[str, str]]:
-        all_data = list()
-
-        while "Итого:" not in df.iloc[start_row, 1]:
-            row = df.iloc[start_row]
-            start_row += 1
-
-            try:
-                count = int(row.iloc[14])
-            except ValueError:
-                continue
-
-            if count < 1:
-                continue
-
-            exchange_product_id = row.iloc[1]
-            exchange_product_name = row.iloc[2]
-            delivery_basis_name = row.iloc[3]
-
-            data = {
-                "exchange_product_id": exchange_product_id,
-                "exchange_product_name": exchange_product_name,
-                "oil_id": exchange_product_id[:4],
-                "delivery_basis_id": exchange_product_id[4:7],
-                "delivery_basis_name": delivery_basis_name,
-                "delivery_type_id": exchange_product_id[-1],
-                "volume": int(row.iloc[4]),
-                "total": int(row.iloc[5]),
-                "count": int(count),
-                "date": datetime.strptime(date, "%d.%m.%Y").date(),
-            }
-
-            all_data.append(data)
-
-        return all_data
+    def _get_section(first_column: np.ndarray, start: int) -> tuple[int, int]:
+        """
+        Границы секции в метрических тоннах: первая строка данных идет через три строки
+        после заголовка секции, последняя - перед строкой 'Итого:'.
+        """
+        is_header = first_column[start:] == SECTION_HEADER
+        if not is_header.any():
+            raise ValueError(f"В бюллетене нет секции '{SECTION_HEADER}'")
+        start_row = start + int(is_header.argmax()) + 3
+
+        is_footer = np.char.find(first_column[start_row:].astype(str), SECTION_FOOTER) >= 0
+        if not is_footer.any():
+            raise ValueError(f"В бюллетене нет строки '{SECTION_FOOTER}' после секции")
+        return start_row, start_row + int(is_footer.argmax())
 
     @staticmethod
-    def _get_all_excel_files_name() -> list[str]:
-        downloads_dir = Path(__file__).parent.parent.parent.parent / "downloads"
-        excel_files = list(downloads_dir.glob("*.xls"))
-        return excel_files
+    def _get_all_data(columns: list[np.ndarray], date: _date) -> ParsedBulletin:
+        ids, names, bases, volumes, totals, counts = columns
+        # "-" и пустые ячейки становятся NaN и отсекаются вместе с count < 1
+        counts = pd.to_numeric(counts, errors="coerce")
+        mask = counts >= 1
+
+        return ParsedBulletin(
+            date=date,
+            exchange_product_id=ids[mask].tolist(),
+            exchange_product_name=names[mask].tolist(),
+            delivery_basis_name=bases[mask].tolist(),
+            volume=pd.to_numeric(volumes[mask]).astype(np.int64),
+            total=pd.to_numeric(totals[mask]).astype(np.int64),
+            count=counts[mask].astype(np.int32),
+        )
@@ -1,44 +1,163 @@
 import asyncio
+import hashlib
 import logging
 import os
-from itertools import chain
+import random
+import tempfile
+from collections import deque
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from itertools import islice
+from typing import Awaitable, Callable, TypeVar
 from urllib.parse import urljoin
 
 import aiofiles
-from aiohttp import ClientError, ClientSession
-from bs4 import BeautifulSoup
+from aiohttp import (
+    ClientError,
+    ClientResponse,
+    ClientResponseError,
+    ClientSession,
+    ClientTimeout,
+)
+from lxml import html as lxml_html
 
 from app.core.settings import Settings
+from app.utils import file_sha256
 
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# ответы, после которых запрос имеет смысл повторить; остальные 4xx - нет
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# блоки бюллетеней на странице результатов: класс может идти вместе с другими
+_BULLETIN_BLOCKS = (
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' accordeon-inner__wrap-item ')]"
+)
+_PAGE_SIZE = 10
+_FIRST_YEAR = 2023  # более ранние бюллетени не загружаются
+
+
+def extract_docs_links(page: str, domain: str) -> list[str]:
+    """
+    Ссылки на бюллетени страницы результатов: дерево строит lxml (C, без объектов
+    BeautifulSoup на каждый узел), XPath выбирает только блоки бюллетеней.
+    Синхронная и без состояния - вызывается в потоке, lxml отпускает GIL на разборе.
+    """
+    links = list()
+    for block in lxml_html.fromstring(page).xpath(_BULLETIN_BLOCKS)[:_PAGE_SIZE]:
+        date = block.xpath("normalize-space((.//span)[1])")
+        if int(date[-4:]) >= _FIRST_YEAR:
+            links.append(urljoin(domain, block.xpath("string((.//a)[1]/@href)")))
+    return links
+
+
+@dataclass
+class Download:
+    """
+    Результат Parser.download_file. path is None - содержимое уже известно, файл
+    не сохранен. not_modified - сайт ответил 304, path - локальная копия прошлого скачивания.
+    """
+
+    url: str
+    path: str | None = None
+    file_hash: str | None = None  # sha256 содержимого
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
+
+
+@dataclass
+class Crawl:
+    """
+    Результат Parser.get_docs_urls. skipped_pages - страницы, не загрузившиеся и после
+    повторов: бюллетени с них не найдены, такой обход не считается полным.
+    """
+
+    urls: list[str] = field(default_factory=list)  # новые бюллетени, от свежих к старым
+    skipped_pages: list[int] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.skipped_pages
+
 
 class Parser:
+    """
+    Обход страниц результатов spimex и скачивание бюллетеней. Все запросы идут через
+    общий семафор (crawler.concurrency) по keep-alive соединениям сессии, неудачные
+    повторяются с экспоненциальной паузой, см. _request().
+    """
+
     def __init__(self, settings: Settings, session: ClientSession) -> None:
         self.session = session
         self.settings = settings
+        self._semaphore = asyncio.Semaphore(settings.crawler.concurrency)
+
+    async def get_docs_urls(
+        self, skip_urls: set[str] | None = None, stop_at_known: bool = False
+    ) -> Crawl:
+        """
+        Обходит страницы результатов по порядку, от свежих бюллетеней к старым, и собирает
+        ссылки на бюллетени, кроме skip_urls. Одновременно в работе page_window страниц.
+        Обход заканчивается на странице без бюллетеней с _FIRST_YEAR или на max_pages.
+        stop_at_known - прошлый полный обход завершился: тогда все, что старше уже
+        загруженного, тоже загружено, и обход заканчивается раньше - на странице, где
+        все бюллетени уже в skip_urls. Без этого прерванный первый обход оставил бы
+        старые страницы незагруженными навсегда. По той же причине обход со страницей,
+        не загрузившейся и после повторов, не полный - см. Crawl.skipped_pages.
+        """
+        skip_urls = skip_urls or set()
+        config = self.settings.crawler
+        pages = iter(range(1, config.max_pages + 1))
+        window = deque(
+            (page, self._fetch_page(page=page)) for page in islice(pages, config.page_window)
+        )
+        doc_urls, crawl, visited = list(), Crawl(), 0
 
-    async def downland_excel_files(self) -> None:
-        urls = [f"{self.settings.links.url}{str(page)}" for page in range(1, 70)]
-        tasks = [asyncio.create_task(self.parse_page(url=url)) for url in urls]
-        responses = await asyncio.gather(*tasks)
-        soups = [self.get_soup(response=response) for response in responses]
-        doc_urls = list(chain.from_iterable(self.get_docs_links(soup=soup) for soup in soups))
-        tasks = [asyncio.create_task(self.download_file(url=url)) for url in doc_urls]
-        await asyncio.gather(*tasks)
-
-    # def get_next_page(self, soup: BeautifulSoup) -> str:
-    #     next_page = soup.find("li", class_="bx-pag-next").find("a")["href"]
-    #     next_page = urljoin(self.settings.links.domain, next_page)
-    #     return next_page
-
-    async def parse_page(self, url: str) -> str:
         try:
+            while window:
+                page, task = window.popleft()
+                response = await task
+                visited += 1
+                # страница, не загрузившаяся и после повторов, остановкой не считается
+                if response is None:
+                    crawl.skipped_pages.append(page)
+                else:
+                    # разбор страницы - в потоке: event loop воркера продолжает отвечать на запросы
+                    links = await asyncio.to_thread(
+                        extract_docs_links, response, self.settings.links.domain
+                    )
+                    fresh = [url for url in links if url not in skip_urls]
+                    doc_urls.extend(links)
+                    crawl.urls.extend(fresh)
+                    if not (fresh if stop_at_known else links):
+                        break
+                if (page := next(pages, None)) is not None:
+                    window.append((page, self._fetch_page(page=page)))
+        finally:
+            tasks = [task for _, task in window]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-            async with self.session.get(url=url, timeout=15) as response:
-                response.raise_for_status()
-                return await response.text()
+        log.info(
+            "Просмотрено страниц: %d. Найдено %d бюллетеней, из них новых: %d",
+            visited,
+            len(doc_urls),
+            len(crawl.urls),
+        )
+        if not crawl.complete:
+            log.warning("Не загрузились страницы результатов: %s", crawl.skipped_pages)
+        return crawl
 
+    def _fetch_page(self, page: int) -> asyncio.Task[str | None]:
+        return asyncio.create_task(self.parse_page(url=f"{self.settings.links.url}{page}"))
+
+    async def parse_page(self, url: str) -> str | None:
+        try:
+            return await self._request(url=url, read=ClientResponse.text)
         except asyncio.TimeoutError:
             log.error("Время вышло по запросу %s", url)
         except ClientError as e:
@@ -46,30 +165,108 @@ class Parser:
         except Exception as e:
             log.error("Неизвестная ошибка: %s", e.__class__.__name__)
 
-    def get_soup(self, response: str) -> BeautifulSoup:
-        return BeautifulSoup(response, self.settings.links.parse_method)
-
-    def get_docs_links(self, soup: BeautifulSoup) -> list[str]:
-        divs = soup.find_all("div", class_="accordeon-inner__wrap-item")[:10]
-        links = list()
-
-        for div in divs:
-            date = div.find("span").text
-            if int(date[-4:]) > 2022:
-                url = urljoin(self.settings.links.domain, div.find("a")["href"])
-                links.append(url)
-
-        return links
-
-    async def download_file(self, url: str, folder: str = "downloads") -> str:
+    async def download_file(
+        self,
+        url: str,
+        folder: str = "downloads",
+        validators: tuple[str | None, str | None] | None = None,
+        known_hashes: set[str] | None = None,
+    ) -> Download:
+        """
+        Скачивает бюллетень кусками по download_chunk_kb во временный файл рядом с итоговым
+        и переименовывает его (os.replace), только когда тело получено целиком: оборванная
+        загрузка не оставляет полуфайла под именем бюллетеня. sha256 считается по ходу
+        скачивания; если он уже есть в known_hashes, файл не сохраняется, иначе хэш
+        добавляется туда же (без await между проверкой и добавлением).
+        validators - (ETag, Last-Modified) прошлого скачивания: запрос становится
+        условным, и на неизменившийся файл сайт отвечает 304 без тела. Тогда
+        возвращается локальная копия, а если ее нет - файл скачивается заново.
+        """
         os.makedirs(folder, exist_ok=True)
         filename = os.path.join(folder, url.split("/")[-1].split("?")[0])
+        etag, last_modified = validators or (None, None)
+        headers = dict()
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        async def save(response: ClientResponse) -> Download:
+            if response.status == HTTPStatus.NOT_MODIFIED:
+                return Download(url=url, etag=etag, last_modified=last_modified, not_modified=True)
+            download = Download(
+                url=url,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+            digest = hashlib.sha256()
+            fd, tmp = tempfile.mkstemp(dir=folder, suffix=".part")
+            os.close(fd)
+            try:
+                async with aiofiles.open(tmp, "wb") as f:
+                    chunk_size = self.settings.crawler.download_chunk_kb * 1024
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        digest.update(chunk)
+                        await f.write(chunk)
+                download.file_hash = digest.hexdigest()
+                if known_hashes is None or download.file_hash not in known_hashes:
+                    os.replace(tmp, filename)
+                    download.path = filename
+                    if known_hashes is not None:
+                        known_hashes.add(download.file_hash)
+            finally:
+                if download.path is None:
+                    os.unlink(tmp)
+            return download
 
-        async with self.session.get(url) as response:
-            response.raise_for_status()
+        download = await self._request(url=url, read=save, headers=headers)
+        if download.not_modified:
+            if not os.path.exists(filename):
+                log.info("Файл %s не изменился, но локальной копии нет: скачиваем заново", url)
+                return await self.download_file(url=url, folder=folder, known_hashes=known_hashes)
+            log.info("Файл не изменился с прошлого скачивания: %s", url)
+            download.path = filename
+            download.file_hash = await asyncio.to_thread(file_sha256, filename)
+        elif download.path is None:
+            log.info("Содержимое %s уже известно, файл не сохранен", url)
+        else:
+            log.info(f"Файл сохранен: {filename}")
+        return download
 
-            async with aiofiles.open(filename, "wb") as f:
-                await f.write(await response.read())
+    async def _request(
+        self,
+        url: str,
+        read: Callable[[ClientResponse], Awaitable[T]],
+        headers: dict[str, str] | None = None,
+    ) -> T:
+        """
+        GET под семафором обхода, read читает тело ответа. Таймаут, обрыв соединения,
+        429 и 5xx повторяются до crawler.retries раз; пауза перед повтором - случайная
+        из [0, min(backoff_max, backoff_base * 2 ** попытка)], чтобы повторы параллельных
+        запросов не приходили на сайт одной волной. Семафор на время паузы свободен.
+        Остальные ошибки и последняя неудача пробрасываются.
+        """
+        config = self.settings.crawler
+        timeout = ClientTimeout(total=config.request_timeout)
+        for attempt in range(config.retries + 1):
+            try:
+                async with self._semaphore:
+                    async with self.session.get(
+                        url=url, headers=headers, timeout=timeout
+                    ) as response:
+                        response.raise_for_status()
+                        return await read(response)
+            except ClientResponseError as e:
+                if e.status not in RETRY_STATUSES or attempt == config.retries:
+                    raise
+                error = e
+            except (asyncio.TimeoutError, ClientError) as e:
+                if attempt == config.retries:
+                    raise
+                error = e
 
-        log.info(f"Файл сохранен: {filename}")
-        return filename
+            delay = random.uniform(0, min(config.backoff_max, config.backoff_base * 2**attempt))
+            log.warning(
+                "Запрос %s не удался (%r), повтор %d через %.2f сек", url, error, attempt + 1, delay
+            )
+            await asyncio.sleep(delay)
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.repositories.advisory_lock import AdvisoryLock
+
+log = logging.getLogger(__name__)
+
+
+async def run_as_leader(
+    lock: AdvisoryLock,
+    job: Callable[[], Awaitable[None]],
+    retry_interval: float,
+    heartbeat_interval: float,
+) -> None:
+    """
+    Выполняет job только в процессе, который держит lock (лидер). Остальные процессы
+    пробуют взять блокировку раз в retry_interval и подменяют лидера, когда он
+    завершился или упал. Лидер раз в heartbeat_interval проверяет соединение блокировки:
+    если оно потеряно, блокировку уже может держать другой процесс, поэтому job
+    отменяется и процесс снова ждет retry_interval. Возвращается, когда job завершилась.
+    """
+    while True:
+        try:
+            acquired = await lock.acquire()
+        except (SQLAlchemyError, OSError) as e:
+            log.warning("Не удалось взять блокировку лидера: %r", e)
+            acquired = False
+        if not acquired:
+            log.info("Лидер уже есть, следующая попытка через %.0f сек", retry_interval)
+            await asyncio.sleep(retry_interval)
+            continue
+
+        log.info("Процесс стал лидером (advisory-блокировка %d)", lock.key)
+        heartbeat = asyncio.create_task(_heartbeat(lock=lock, interval=heartbeat_interval))
+        work = asyncio.create_task(job())
+        try:
+            await asyncio.wait((heartbeat, work), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (heartbeat, work):
+                task.cancel()
+            await asyncio.gather(heartbeat, work, return_exceptions=True)
+            await lock.release()
+
+        if not work.cancelled():
+            return work.result()
+        log.error("Лидерство потеряно: %r", heartbeat.exception())
+        # блокировку уже мог взять другой процесс: не перехватываем ее сразу обратно
+        await asyncio.sleep(retry_interval)
+
+
+async def _heartbeat(lock: AdvisoryLock, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await lock.check()
@@ -0,0 +1,179 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from app.core.services.excel_parser import PARSER_VERSION, ParsedBulletin
+
+log = logging.getLogger(__name__)
+
+_MAGIC = b"SPXC"
+_MAGIC_SIZE = len(_MAGIC)
+_PREFIX = _MAGIC_SIZE + 4  # MAGIC + длина заголовка (uint32 little-endian)
+_ALIGN = 8
+_SEPARATOR = "\x00"
+
+_NUMERIC_COLUMNS = ("volume", "total", "count")
+_STRING_COLUMNS = ("exchange_product_id", "exchange_product_name", "delivery_basis_name")
+
+
+@dataclass
+class ParseCacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evicted: int = 0
+
+
+class ParseCache:
+    """
+    Кэш результатов разбора бюллетеней на диске, ключ - sha256 файла и PARSER_VERSION.
+
+    Каждая запись - один бинарный файл: MAGIC, длина заголовка, JSON-заголовок
+    с описанием колонок и выровненные сырые буферы колонок. Числовые колонки читаются
+    через np.memmap без копирования, строковые хранятся как UTF-8, разделенный "\\0".
+    Запись атомарная (временный файл + os.replace), поэтому кэш можно делить
+    между процессами. Вытеснение - по возрасту последнего использования и по размеру.
+    Выключенный кэш (enabled=False) ничего не читает и не пишет.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int,
+        max_age: float,
+        enabled: bool = True,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age  # сек с последнего использования записи
+        self.enabled = enabled
+        self.stats = ParseCacheStats()
+        if enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, file_hash: str) -> ParsedBulletin | None:
+        if not self.enabled:
+            return None
+        path = self._path(file_hash)
+        try:
+            bulletin = self._read(path)
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        except (ValueError, KeyError) as e:
+            log.warning("Поврежденная запись кэша %s: %r", path.name, e)
+            path.unlink(missing_ok=True)
+            self.stats.misses += 1
+            return None
+
+        os.utime(path)  # время последнего использования для вытеснения
+        self.stats.hits += 1
+        return bulletin
+
+    def put(self, file_hash: str, bulletin: ParsedBulletin) -> None:
+        if not self.enabled:
+            return
+        columns = [getattr(bulletin, name) for name in _STRING_COLUMNS]
+        if not all(isinstance(value, str) for column in columns for value in column):
+            # пустые ячейки pandas отдает как NaN - такое не кэшируем, разберем заново
+            return
+
+        buffers = {
+            name: _SEPARATOR.join(getattr(bulletin, name)).encode() for name in _STRING_COLUMNS
+        }
+        buffers.update(
+            {name: np.ascontiguousarray(getattr(bulletin, name)) for name in _NUMERIC_COLUMNS}
+        )
+        self._write(self._path(file_hash), bulletin.date, bulletin.size, buffers)
+        self.stats.writes += 1
+
+    def evict(self) -> None:
+        """Удаляет записи старше max_age, затем самые давно использованные сверх max_bytes"""
+        if not self.enabled:
+            return
+        now = time.time()
+        entries = list()
+        for path in self.directory.glob("*.bin"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                self._remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def report(self) -> dict[str, int]:
+        return asdict(self.stats)
+
+    def _path(self, file_hash: str) -> Path:
+        return self.directory / f"{file_hash}-v{PARSER_VERSION}.bin"
+
+    def _remove(self, path: Path) -> None:
+        path.unlink(missing_ok=True)
+        self.stats.evicted += 1
+
+    @staticmethod
+    def _write(path: Path, trading_date: date, rows: int, buffers: dict) -> None:
+        layout, offset = dict(), 0
+        for name, buffer in buffers.items():
+            if isinstance(buffer, bytes):
+                layout[name] = ("str", offset, len(buffer))
+            else:
+                layout[name] = (buffer.dtype.str, offset, buffer.nbytes)
+            offset += _aligned(layout[name][2])
+
+        header = json.dumps(
+            {"date": trading_date.isoformat(), "rows": rows, "columns": layout}
+        ).encode()
+        data_start = _aligned(_PREFIX + len(header))
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_MAGIC + len(header).to_bytes(4, "little") + header)
+                for name, buffer in buffers.items():
+                    f.seek(data_start + layout[name][1])
+                    f.write(buffer if isinstance(buffer, bytes) else buffer.tobytes())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @staticmethod
+    def _read(path: Path) -> ParsedBulletin:
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(raw[:_MAGIC_SIZE]) != _MAGIC:
+            raise ValueError("неизвестный формат записи")
+        header_end = _PREFIX + int.from_bytes(bytes(raw[_MAGIC_SIZE:_PREFIX]), "little")
+        header = json.loads(bytes(raw[_PREFIX:header_end]))
+        data_start = _aligned(header_end)
+
+        columns = dict()
+        for name, (dtype, offset, nbytes) in header["columns"].items():
+            start = data_start + offset
+            stop = start + nbytes
+            chunk = raw[start:stop]
+            if dtype == "str":
+                columns[name] = bytes(chunk).decode().split(_SEPARATOR) if header["rows"] else []
+            else:
+                columns[name] = chunk.view(np.dtype(dtype))
+        return ParsedBulletin(date=date.fromisoformat(header["date"]), **columns)
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
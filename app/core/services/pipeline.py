@@ -0,0 +1,348 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import chain
+
+from app.core.database.models.ingested_bulletins import BulletinStatus
+from app.core.repositories.db_repository import IDBRepository
+from app.core.services.excel_parser import ExcelParser, ParsedBulletin
+from app.core.services.http_parser import Download, Parser
+from app.core.services.parse_cache import ParseCache
+from app.core.settings import Settings
+
+log = logging.getLogger(__name__)
+
+Bulletin = dict[str, str | int | date | None]
+
+# сигнал воркерам следующей стадии, что данных больше не будет
+_DONE = None
+
+
+@dataclass
+class StageStats:
+    name: str
+    items: int = 0
+    rows: int = 0
+    errors: int = 0
+    busy: float = 0.0  # суммарное время работы воркеров стадии, сек
+    started: float | None = None
+    finished: float | None = None
+    max_queue: int = 0  # максимальная глубина входной очереди стадии
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Файлов в секунду по настенному времени стадии"""
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+    def track(self) -> "_StageTimer":
+        return _StageTimer(self)
+
+
+@dataclass
+class _StageTimer:
+    stats: StageStats
+    _start: float = field(default=0.0, init=False)
+
+    def __enter__(self) -> "_StageTimer":
+        self._start = time.perf_counter()
+        if self.stats.started is None:
+            self.stats.started = self._start
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        now = time.perf_counter()
+        self.stats.busy += now - self._start
+        self.stats.finished = now
+
+
+@dataclass
+class IngestionReport:
+    """Итог запуска загрузки для журнала ingestion_runs"""
+
+    bulletins: int = 0  # загруженных бюллетеней
+    rows: int = 0
+    stages: dict[str, float] = field(default_factory=dict)  # длительность стадий, сек
+    skipped_pages: int = 0  # страниц результатов, не загрузившихся при обходе
+
+
+def _estimate_copy_bytes(rows: list[dict]) -> int:
+    """Примерный объем строк в бинарном COPY: средняя ширина по выборке * число строк"""
+    if not rows:
+        return 0
+    sample = rows[:100]
+    # 2 байта на число полей в строке и по 4 байта длины на каждое поле
+    width = sum(len(str(value)) + 4 for row in sample for value in row.values()) + 2 * len(sample)
+    return width * len(rows) // len(sample)
+
+
+class IngestionPipeline:
+    """
+    Потоковая загрузка бюллетеней: download -> parse -> write.
+
+    Каждый скачанный файл сразу уходит в парсинг, каждый распарсенный - сразу в БД.
+    Очереди между стадиями ограничены, поэтому быстрая стадия ждет медленную,
+    а в памяти одновременно лежит не больше write_queue_size распарсенных файлов.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        parser: Parser,
+        excel_parser: ExcelParser,
+        parse_cache: ParseCache,
+        db_repository: IDBRepository,
+    ) -> None:
+        self.settings = settings
+        self.parser = parser
+        self.excel_parser = excel_parser
+        self.parse_cache = parse_cache
+        self.db_repository = db_repository
+        self.stats = {
+            name: StageStats(name=name) for name in ("crawl", "download", "parse", "write")
+        }
+
+    async def run(self, stop_at_known: bool = False) -> dict[str, StageStats]:
+        """stop_at_known - обход страниц до уже загруженных, см. Parser.get_docs_urls"""
+        config = self.settings.ingestion
+        ingested = await self.db_repository.get_ingested_bulletins()
+        known_hashes = {bulletin.file_hash for bulletin in ingested if bulletin.file_hash}
+        validators = await self.db_repository.get_download_validators()
+        with self.stats["crawl"].track():
+            crawl = await self.parser.get_docs_urls(
+                skip_urls={bulletin.url for bulletin in ingested}, stop_at_known=stop_at_known
+            )
+        urls = crawl.urls
+        self.stats["crawl"].items = len(urls)
+        # ошибки обхода - незагрузившиеся страницы результатов
+        self.stats["crawl"].errors = len(crawl.skipped_pages)
+
+        url_queue: asyncio.Queue[str | None] = asyncio.Queue()
+        parse_queue: asyncio.Queue[tuple[Bulletin, str] | None] = asyncio.Queue(
+            maxsize=config.parse_queue_size
+        )
+        write_queue: asyncio.Queue[tuple[Bulletin, list[dict]] | None] = asyncio.Queue(
+            maxsize=config.write_queue_size
+        )
+        for url in urls:
+            url_queue.put_nowait(url)
+        for _ in range(config.download_workers):
+            url_queue.put_nowait(_DONE)
+
+        async with asyncio.TaskGroup() as group:
+            downloaders = [
+                group.create_task(
+                    self._download_worker(
+                        url_queue, parse_queue, write_queue, known_hashes, validators
+                    )
+                )
+                for _ in range(config.download_workers)
+            ]
+            parsers = [
+                group.create_task(self._parse_worker(parse_queue, write_queue, known_hashes))
+                for _ in range(config.parse_workers)
+            ]
+            group.create_task(self._write_worker(write_queue))
+
+            await asyncio.gather(*downloaders)
+            for _ in parsers:
+                await parse_queue.put(_DONE)
+            await asyncio.gather(*parsers)
+            await write_queue.put(_DONE)
+
+        await asyncio.to_thread(self.parse_cache.evict)
+        self._log_stats()
+        return self.stats
+
+    async def _download_worker(
+        self,
+        url_queue: asyncio.Queue,
+        parse_queue: asyncio.Queue,
+        write_queue: asyncio.Queue,
+        known_hashes: set[str],
+        validators: dict[str, tuple[str | None, str | None]],
+    ) -> None:
+        """
+        Скачивает бюллетени (условным запросом, если они уже скачивались) и отсеивает
+        дубликаты по sha256, посчитанному при скачивании: в разбор уходят только новые файлы.
+        Условный запрос бывает только у FAILED бюллетеней: на 304 в разбор уходит
+        локальная копия, которую, возможно, разберет исправленный парсер.
+        """
+        stats = self.stats["download"]
+        while (url := await url_queue.get()) is not _DONE:
+            with stats.track():
+                try:
+                    download = await self.parser.download_file(
+                        url=url, validators=validators.get(url), known_hashes=known_hashes
+                    )
+                except Exception as e:
+                    log.error("Не удалось скачать %s: %r", url, e)
+                    stats.errors += 1
+                    download = None
+                else:
+                    stats.items += 1
+
+            if download is None:
+                await write_queue.put(({"url": url, "status": BulletinStatus.FAILED}, []))
+                continue
+            bulletin = self._bulletin(download)
+            if download.path is None:
+                log.info("Бюллетень %s уже загружен под другой ссылкой", url)
+                bulletin["status"] = BulletinStatus.DUPLICATE
+                await write_queue.put((bulletin, []))
+            else:
+                await parse_queue.put((bulletin, download.path))
+                self._track_queue("parse", parse_queue)
+
+    @staticmethod
+    def _bulletin(download: Download) -> Bulletin:
+        return {
+            "url": download.url,
+            "file_hash": download.file_hash,
+            "etag": download.etag,
+            "last_modified": download.last_modified,
+            "status": None,
+        }
+
+    async def _parse_worker(
+        self,
+        parse_queue: asyncio.Queue,
+        write_queue: asyncio.Queue,
+        known_hashes: set[str],
+    ) -> None:
+        stats = self.stats["parse"]
+        done = False
+
+        while not done:
+            batch, done = await self._next_batch(parse_queue)
+            if not batch:
+                continue
+
+            bulletins = [bulletin for bulletin, _ in batch]
+            with stats.track():
+                results = await self._parse(bulletins=bulletins, paths=[path for _, path in batch])
+
+            for bulletin, result in zip(bulletins, results):
+                rows = []
+                if isinstance(result, BaseException):
+                    log.error("Не удалось распарсить %s: %r", bulletin["url"], result)
+                    known_hashes.discard(bulletin["file_hash"])
+                    bulletin["status"] = BulletinStatus.FAILED
+                    stats.errors += 1
+                else:
+                    rows = result.to_records()
+                    bulletin.update(
+                        status=BulletinStatus.LOADED,
+                        trading_date=result.date,
+                        row_count=result.size,
+                    )
+                    stats.items += 1
+                    stats.rows += result.size
+
+                await write_queue.put((bulletin, rows))
+                self._track_queue("write", write_queue)
+
+    async def _parse(
+        self, bulletins: list[Bulletin], paths: list[str]
+    ) -> list[ParsedBulletin | BaseException]:
+        """Разбор файлов пачки: сначала из ParseCache, промахи - в пул парсера"""
+        hashes = [bulletin["file_hash"] for bulletin in bulletins]
+        results = [self.parse_cache.get(file_hash) for file_hash in hashes]
+        missing = [index for index, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+
+        parsed = await self.excel_parser.parse_files(paths=[paths[index] for index in missing])
+        for index, result in zip(missing, parsed):
+            results[index] = result
+            if not isinstance(result, BaseException):
+                await asyncio.to_thread(self.parse_cache.put, hashes[index], result)
+        return results
+
+    async def _next_batch(
+        self, parse_queue: asyncio.Queue
+    ) -> tuple[list[tuple[Bulletin, str]], bool]:
+        """
+        Ждет первый файл и добирает уже лежащие в очереди до parse_chunk_size:
+        полной пачки не ждем, чтобы не задерживать поток.
+        """
+        batch = list()
+        item = await parse_queue.get()
+        while item is not _DONE:
+            batch.append(item)
+            if len(batch) >= self.settings.ingestion.parse_chunk_size or parse_queue.empty():
+                return batch, False
+            item = parse_queue.get_nowait()
+        return batch, True
+
+    async def _write_worker(self, write_queue: asyncio.Queue) -> None:
+        # у AsyncSession нет конкурентного доступа, поэтому писатель один
+        if self.settings.ingestion.loader == "copy":
+            return await self._copy_write_worker(write_queue)
+
+        stats = self.stats["write"]
+        while (item := await write_queue.get()) is not _DONE:
+            bulletin, rows = item
+            with stats.track():
+                await self.db_repository.save_bulletin(bulletin=bulletin, data_list=rows)
+            if bulletin["status"] == BulletinStatus.LOADED:
+                stats.items += 1
+                stats.rows += len(rows)
+                log.info("Сохранено %d записей из %s", len(rows), bulletin["url"])
+
+    async def _copy_write_worker(self, write_queue: asyncio.Queue) -> None:
+        """
+        Копит бюллетени, пока оценка их объема не превысит copy_batch_mb, и пишет пачку
+        одной транзакцией через COPY. Чем шире строки, тем меньше их в пачке.
+        """
+        limit = self.settings.ingestion.copy_batch_mb * 1024 * 1024
+        batch, batch_bytes, done = list(), 0, False
+
+        while not done:
+            item = await write_queue.get()
+            done = item is _DONE
+            if not done:
+                batch.append(item)
+                batch_bytes += _estimate_copy_bytes(rows=item[1])
+            if batch and (done or batch_bytes >= limit):
+                await self._flush_copy_batch(batch=batch)
+                batch, batch_bytes = list(), 0
+
+    async def _flush_copy_batch(self, batch: list[tuple[Bulletin, list[dict]]]) -> None:
+        stats = self.stats["write"]
+        bulletins = [bulletin for bulletin, _ in batch]
+        rows = list(chain.from_iterable(rows for _, rows in batch))
+        with stats.track():
+            await self.db_repository.copy_bulletins(bulletins=bulletins, data_list=rows)
+
+        loaded = sum(bulletin["status"] == BulletinStatus.LOADED for bulletin in bulletins)
+        stats.items += loaded
+        stats.rows += len(rows)
+        log.info("Сохранено %d записей из %d бюллетеней", len(rows), loaded)
+
+    def _track_queue(self, stage: str, queue: asyncio.Queue) -> None:
+        stats = self.stats[stage]
+        stats.max_queue = max(stats.max_queue, queue.qsize())
+
+    def _log_stats(self) -> None:
+        for stage in self.stats.values():
+            log.info(
+                "Стадия %s: %d файлов, %d строк, %d ошибок, %.2f сек (занято %.2f сек), "
+                "%.2f файлов/сек, макс. входная очередь %d",
+                stage.name,
+                stage.items,
+                stage.rows,
+                stage.errors,
+                stage.elapsed,
+                stage.busy,
+                stage.throughput,
+                stage.max_queue,
+            )
+        log.info("Кэш разбора: %s", self.parse_cache.report())
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+log = logging.getLogger(__name__)
+
+
+def next_run(now: datetime, hour: int, minute: int) -> datetime:
+    """Ближайшее hour:minute строго после now"""
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return target
+
+
+def last_slot(now: datetime, hour: int, minute: int) -> datetime:
+    """Последнее hour:minute не позже now"""
+    return next_run(now=now, hour=hour, minute=minute) - timedelta(days=1)
+
+
+async def run_daily(
+    job: Callable[[datetime], Awaitable[bool]],
+    hour: int,
+    minute: int,
+    last_run: datetime | None,
+    jitter: float = 0.0,
+    retry_base: float = 60.0,
+    retry_max: float = 30 * 60.0,
+) -> None:
+    """
+    Запускает job(срок) каждый день в hour:minute плюс случайную задержку до jitter сек.
+    last_run - последний выполненный срок: если с тех пор срок уже прошел (процесса
+    не было или прошлый запуск затянулся), job запускается сразу, один раз за все
+    пропущенные дни. Запуски идут друг за другом и не перекрываются. Срок считается
+    выполненным, только если job вернул True; после ошибки или False (запуск не
+    состоялся, например, уже выполняется другой) job повторяется через
+    retry_base * 2 ** (ошибок - 1), но не больше retry_max сек - с наступлением
+    следующего срока повтор идет уже за него.
+    """
+    failures = 0
+    while True:
+        if failures:
+            delay = min(retry_max, retry_base * 2 ** (failures - 1))
+            log.info("Повтор загрузки через %.0f сек (ошибок подряд: %d)", delay, failures)
+            await asyncio.sleep(delay)
+
+        now = datetime.now()
+        target = last_slot(now=now, hour=hour, minute=minute)
+        if last_run is None or target > last_run:
+            log.info("Срок %s не выполнен, загрузка запускается сейчас", target)
+        else:
+            # от last_run, а не только от now: проснувшись чуть раньше срока, не повторяем запуск
+            target = next_run(now=max(now, last_run), hour=hour, minute=minute)
+            delay = random.uniform(0, jitter)
+            log.info("Следующая ежедневная загрузка в %s (+%.0f сек)", target, delay)
+            await asyncio.sleep(max((target - datetime.now()).total_seconds(), 0) + delay)
+
+        try:
+            done = await job(target)
+        except Exception:
+            log.exception("Ежедневная загрузка за %s завершилась ошибкой", target)
+            done = False
+        if done:
+            failures = 0
+            last_run = target
+        else:
+            failures += 1
@@ -0,0 +1,63 @@
+import csv
+import io
+from typing import Iterable
+
+import orjson
+
+from app.core.repositories.db_repository import RESULT_COLUMNS
+from app.core.schemas import AggregateResponse
+
+RESULT_FIELDS = tuple(column.key for column in RESULT_COLUMNS)
+# get_aggregates отдает колонки в порядке полей AggregateResponse
+AGGREGATE_FIELDS = tuple(AggregateResponse.model_fields)
+
+# форматы потоковой выдачи get_dynamics, выбираются заголовком Accept
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+
+
+def dump_rows(rows: Iterable[tuple], fields: tuple[str, ...] = RESULT_FIELDS) -> bytes:
+    """
+    Кортежи колонок сразу в тело JSON-ответа, без pydantic-моделей: orjson сам пишет
+    даты в ISO-формате, как field_serializer в TradingResultResponse. Порядок и имена
+    полей совпадают с TradingResultResponse, поэтому схема OpenAPI остается верной.
+    """
+    return orjson.dumps([dict(zip(fields, row)) for row in rows])
+
+
+def dump_page(
+    rows: Iterable[tuple], next_cursor: str | None, fields: tuple[str, ...] = RESULT_FIELDS
+) -> bytes:
+    """Страница get_dynamics в тело ответа по схеме DynamicsPage"""
+    return orjson.dumps(
+        {"items": [dict(zip(fields, row)) for row in rows], "next_cursor": next_cursor}
+    )
+
+
+def stream_media_type(accept: str | None) -> str | None:
+    """Потоковый формат из заголовка Accept; None - обычный JSON-массив"""
+    for media_type in (accept or "").split(","):
+        media_type = media_type.split(";")[0].strip().lower()
+        if media_type in (NDJSON, "application/ndjson"):
+            return NDJSON
+        if media_type == CSV:
+            return CSV
+    return None
+
+
+def dump_ndjson(rows: Iterable[tuple], fields: tuple[str, ...] = RESULT_FIELDS) -> bytes:
+    """Пачка строк в NDJSON: по объекту TradingResultResponse на строку"""
+    return b"".join(
+        [orjson.dumps(dict(zip(fields, row)), option=orjson.OPT_APPEND_NEWLINE) for row in rows]
+    )
+
+
+def dump_csv(rows: Iterable[tuple]) -> bytes:
+    """Пачка строк в CSV без заголовка (заголовок - csv_header), даты в ISO-формате"""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def csv_header(fields: tuple[str, ...] = RESULT_FIELDS) -> bytes:
+    return dump_csv([fields])
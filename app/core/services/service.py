@@ -1,13 +1,33 @@
-import json
 import logging
 import time
 from datetime import date
+from typing import AsyncIterator
+
+import orjson
 
-from app.api.api_v1.schemas import DynamicRequest, TradingResultsRequest, TradingResultResponse
 from app.core.repositories.cache_repository import ICacheRepository
 from app.core.repositories.db_repository import IDBRepository
+from app.core.repositories.snapshot import SnapshotStore
+from app.core.schemas import (
+    AggregatesRequest,
+    DynamicRequest,
+    TradingResultsRequest,
+    encode_cursor,
+)
+from app.core.services.cache import cached
 from app.core.services.excel_parser import ExcelParser
 from app.core.services.http_parser import Parser
+from app.core.services.parse_cache import ParseCache
+from app.core.services.pipeline import IngestionPipeline, IngestionReport
+from app.core.services.serializers import (
+    AGGREGATE_FIELDS,
+    CSV,
+    csv_header,
+    dump_csv,
+    dump_ndjson,
+    dump_page,
+    dump_rows,
+)
 from app.core.settings import Settings
 
 log = logging.getLogger(__name__)
@@ -19,75 +39,133 @@ class Service:
         settings: Settings,
         parser: Parser,
         excel_parser: ExcelParser,
+        parse_cache: ParseCache,
         db_repository: IDBRepository,
         cache_repository: ICacheRepository,
+        snapshot_store: SnapshotStore,
     ) -> None:
         self.parser = parser
         self.settings = settings
         self.excel_parser = excel_parser
+        self.parse_cache = parse_cache
         self.db_repository = db_repository
         self.cache_repository = cache_repository
+        self.snapshot_store = snapshot_store
 
-    async def load_docs_in_db(self) -> None:
+    async def load_docs_in_db(self, stop_at_known: bool = False) -> IngestionReport:
+        """
+        Инкрементальная загрузка: скачиваем, парсим и сохраняем только те бюллетени,
+        которых еще нет в манифесте ingested_bulletins. Стадии работают потоково,
+        см. IngestionPipeline. Возвращает число строк и длительность стадий.
+        stop_at_known - прошлый полный обход завершился, см. Parser.get_docs_urls.
+        """
         start = time.time()
-        await self.parser.downland_excel_files()
-        all_data = await self.excel_parser.parse_all_excel_files()
-        log.info("Данные успешно собранны из файлов")
-        total_result = 0
-
-        for data in all_data:
-            await self.db_repository.create_docs_bulk(data_list=data)
-            total_result += (amount_rows := len(data))
-            log.info("Сохранено %d записей", amount_rows)
+        pipeline = IngestionPipeline(
+            settings=self.settings,
+            parser=self.parser,
+            excel_parser=self.excel_parser,
+            parse_cache=self.parse_cache,
+            db_repository=self.db_repository,
+        )
+        stats = await pipeline.run(stop_at_known=stop_at_known)
+        refresh_start = time.perf_counter()
+        if stats["write"].items or self.snapshot_store.is_missing():
+            # снимок переключается до новой версии кэша: кэш заполнят уже новые данные
+            await self.snapshot_store.export(
+                batches=self.db_repository.stream_dynamics(
+                    request=DynamicRequest(start_date=date.min, end_date=date.max),
+                    batch_size=self.settings.snapshot.export_batch_size,
+                )
+            )
+        if stats["write"].items:
+            # новые строки закоммичены: ключи кэша переезжают в пространство новой версии
+            await self.cache_repository.bump_version()
 
         log.info(
             "Все данные успешно загрузились в БД за %.2f сек. Всего %d записей",
             time.time() - start,
-            total_result,
+            stats["write"].rows,
+        )
+        # в журнале запусков стадия write называется load
+        return IngestionReport(
+            bulletins=stats["write"].items,
+            rows=stats["write"].rows,
+            stages={
+                "crawl": stats["crawl"].elapsed,
+                "download": stats["download"].elapsed,
+                "parse": stats["parse"].elapsed,
+                "load": stats["write"].elapsed,
+                "cache_refresh": time.perf_counter() - refresh_start,
+            },
+            skipped_pages=stats["crawl"].errors,
         )
 
-    async def get_last_trading_dates(self, limit: int) -> list[date]:
+    @cached(prefix="dates_key", ttl="dates_ttl")
+    async def get_last_trading_dates(self, limit: int) -> bytes:
         """
         Список дат последних торговых дней (фильтрация по кол-ву последних торговых дней).
+        Возвращает готовое тело JSON-ответа.
         """
-        if cached := await self.cache_repository.get_cached_data(key=self.settings.redis.dates_key):
-            dates = [date.fromisoformat(d) for d in cached]
-            return dates[:limit]
+        return orjson.dumps(await self.db_repository.get_all_trading_dates(limit=limit))
 
-        dates = await self.db_repository.get_all_trading_dates(limit=limit)
-        serialized = json.dumps([d.isoformat() for d in dates])
-        await self.cache_repository.set_cached_data(
-            data=serialized, key=self.settings.redis.dates_key
-        )
-        return dates[:limit]
+    async def _period_ttl(self, request: DynamicRequest | AggregatesRequest) -> int | None:
+        """
+        Период, закончившийся раньше последнего загруженного торгового дня, уже не изменится,
+        поэтому для него свой срок жизни.
+        """
+        last_dates = await self.db_repository.get_all_trading_dates(limit=1)
+        if last_dates and request.end_date < last_dates[0]:
+            return self.settings.redis.closed_dynamics_ttl
+        return self.settings.redis.dynamics_ttl
 
-    async def get_dynamics(self, request: DynamicRequest):
+    @cached(prefix="dynamics_key", ttl=_period_ttl)
+    async def get_dynamics(self, request: DynamicRequest) -> bytes:
         """
         список торгов за заданный период
         (фильтрация по oil_id, delivery_type_id, delivery_basis_id, start_date, end_date).
+        Возвращает готовое тело JSON-ответа: весь период списком или, если заданы
+        limit/cursor, страницу DynamicsPage с токеном следующей.
         """
-        result = await self.db_repository.get_dynamics(request=request)
-        return result
+        rows = await self.db_repository.get_dynamics(request=request)
+        if (page_size := request.page_size) is None:
+            return dump_rows(rows)
 
-    async def get_trading_results(self, request: TradingResultsRequest) -> list[dict]:
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_cursor(last_date=rows[-1].date, last_id=rows[-1].id)
+        return dump_page(rows, next_cursor=next_cursor)
+
+    async def stream_dynamics(
+        self, request: DynamicRequest, media_type: str
+    ) -> AsyncIterator[bytes]:
         """
-        Список последних торгов (фильтрация по oil_id, delivery_type_id, delivery_basis_id)
-        Возвращает список словарей с данными торгов
+        get_dynamics для больших периодов: строки читаются с серверного курсора пачками
+        и отдаются клиенту по мере кодирования (NDJSON или CSV), память не зависит
+        от длины периода. Поток не кэшируется.
         """
-        if cached := await self.cache_repository.get_cached_data(key=self.settings.redis.last_trading):
-            log.debug(f"Returning cached trading results {cached}")
-            return cached
+        encode = dump_csv if media_type == CSV else dump_ndjson
+        if media_type == CSV:
+            yield csv_header()
+        async for rows in self.db_repository.stream_dynamics(
+            request=request, batch_size=self.settings.db.stream_batch_size
+        ):
+            yield encode(rows)
 
-        results = await self.db_repository.get_trading_results(request=request)
+    @cached(prefix="last_trading", ttl="last_trading_ttl")
+    async def get_trading_results(self, request: TradingResultsRequest) -> bytes:
+        """
+        Список последних торгов (фильтрация по oil_id, delivery_type_id, delivery_basis_id)
+        Возвращает готовое тело JSON-ответа со списком торгов
+        """
+        return dump_rows(await self.db_repository.get_trading_results(request=request))
 
-        serialized_results = [
-            TradingResultResponse.model_validate(result, from_attributes=True).model_dump()
-            for result in results
-        ]
-        serialized = json.dumps(serialized_results)
-        await self.cache_repository.set_cached_data(
-            data=serialized,
-            key=self.settings.redis.last_trading,
-        )
-        
-        return serialized_results
+    @cached(prefix="aggregates_key", ttl=_period_ttl)
+    async def get_aggregates(self, request: AggregatesRequest) -> bytes:
+        """
+        Итоги volume, total, count по oil_id и delivery_basis_id за период по дням,
+        неделям или месяцам - из дневных итогов trading_rollups, без чтения строк торгов.
+        Возвращает готовое тело JSON-ответа.
+        """
+        rows = await self.db_repository.get_aggregates(request=request)
+        return dump_rows(rows, fields=AGGREGATE_FIELDS)
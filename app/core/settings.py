@@ -34,6 +34,8 @@ class DataBase(BaseModel):
     echo_pool: bool
     pool_size: int
     max_overflow: int
+    # строк в одной пачке серверного курсора при потоковой выдаче
+    stream_batch_size: int = 1000
 
 
 class GunicornConfig(BaseModel):
@@ -46,14 +48,97 @@ class GunicornConfig(BaseModel):
 class Links(BaseModel):
     url: str = "https://spimex.com/markets/oil_products/trades/results/?page=page-"
     domain: str = "https://spimex.com/"
-    parse_method: str = "lxml"
+
+
+class Crawler(BaseModel):
+    # одновременных запросов к сайту (страницы и файлы) на весь обход
+    concurrency: int = 8
+    # пул keep-alive соединений aiohttp: всего и на один хост
+    pool_limit: int = 16
+    pool_limit_per_host: int = 8
+    keepalive_timeout: float = 30.0
+    request_timeout: float = 15.0
+    # повторы при таймауте, обрыве соединения, 429 и 5xx: пауза - случайная
+    # из [0, min(backoff_max, backoff_base * 2 ** попытка)]
+    retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 10.0
+    # страниц результатов в работе одновременно; обход идет по порядку и останавливается
+    # на странице, где все бюллетени уже загружены, на пустой странице или на max_pages
+    page_window: int = 2
+    max_pages: int = 69
+    # бюллетень пишется на диск кусками этого размера, целиком в памяти не собирается
+    download_chunk_kb: int = 64
+
+
+class Ingestion(BaseModel):
+    # загрузку выполняет отдельный процесс python -m app.ingest, а не воркеры API.
+    # Таких процессов может быть несколько: работает лидер - владелец advisory-блокировки
+    # Postgres с ключом leader_lock_key, остальные раз в leader_retry_seconds пробуют
+    # ее взять. Лидер раз в leader_heartbeat_seconds проверяет соединение блокировки
+    leader_lock_key: int = 0x53504D58  # "SPMX"
+    leader_retry_seconds: float = 30.0
+    leader_heartbeat_seconds: float = 10.0
+    # ежедневная догрузка бюллетеней у лидера, время локальное, плюс случайная задержка
+    # до schedule_jitter_seconds. Пропущенный срок догружается сразу при старте лидера
+    schedule_hour: int = 14
+    schedule_minute: int = 11
+    schedule_jitter_seconds: float = 300.0
+    # неудачный запуск повторяется с паузой retry_base_seconds * 2 ** (ошибок - 1),
+    # но не больше retry_max_seconds; срок засчитывается только после успешного запуска
+    retry_base_seconds: float = 60.0
+    retry_max_seconds: float = 30 * 60.0
+    # запуск дольше прерывается; запись running старше этого считается оборвавшейся
+    run_timeout_seconds: float = 3 * 60 * 60
+    # download -> parse -> write: ограниченные очереди между стадиями дают backpressure
+    download_workers: int = 10
+    parse_workers: int = 4  # размер долгоживущего пула процессов парсера
+    parse_chunk_size: int = 4  # сколько файлов уходит в процесс пула одной задачей
+    parse_queue_size: int = 20
+    write_queue_size: int = 10
+    # pandas - pd.read_excel всего листа, xlrd - чтение только нужных ячеек секции
+    excel_reader: Literal["pandas", "xlrd"] = "xlrd"
+    # кэш разбора по sha256 файла: неизмененные бюллетени не парсятся повторно
+    parse_cache_enabled: bool = True
+    parse_cache_dir: Path = BASE_PATH / "parse_cache"
+    parse_cache_max_mb: int = 512
+    parse_cache_max_age_days: int = 90
+    # orm - insert() на каждый файл, copy - бинарный COPY пачками по ~copy_batch_mb
+    loader: Literal["orm", "copy"] = "copy"
+    copy_batch_mb: int = 16
 
 
 class Redis(BaseModel):
     url: str = "redis://cache:6379/5"
-    ttl: int = 86400
+    # префиксы ключей кэша методов Service, к ним добавляется хэш аргументов
     dates_key: str = "last_dates"
     last_trading: str = "last_trading"
+    dynamics_key: str = "dynamics"
+    aggregates_key: str = "aggregates"
+    # срок жизни ключей по методам, сек. Ключи прошлых версий данных никто не удаляет,
+    # они истекают сами, поэтому None (без срока) оставляет их в redis навсегда
+    dates_ttl: int | None = 86400
+    last_trading_ttl: int | None = 86400
+    # get_dynamics и get_aggregates
+    dynamics_ttl: int | None = 86400
+    # их период, закончившийся до последнего загруженного торгового дня
+    closed_dynamics_ttl: int | None = 7 * 86400
+    # L1: кэш в памяти каждого воркера перед redis
+    local_cache_enabled: bool = False
+    local_cache_max_mb: int = 64
+    local_cache_ttl: int = 60
+    # счетчик версии данных (пространство ключей) и канал, в который публикуется новая версия
+    version_key: str = "data_version"
+    invalidation_channel: str = "cache_invalidation"
+
+
+class SnapshotConfig(BaseModel):
+    # колоночный снимок spimex_trading_results на диске: чтение последних дат, динамики
+    # и последних торгов без Postgres. Один файл на версию, общий для всех воркеров
+    enabled: bool = False
+    directory: Path = BASE_PATH / "snapshot"
+    keep_versions: int = 2
+    export_batch_size: int = 50_000
 
 
 class Settings(BaseSettings):
@@ -71,7 +156,10 @@ class Settings(BaseSettings):
     logging: LoggingConfig
     api: ApiPrefix = ApiPrefix()
     links: Links = Links()
+    crawler: Crawler = Crawler()
+    ingestion: Ingestion = Ingestion()
     redis: Redis = Redis()
+    snapshot: SnapshotConfig = SnapshotConfig()
 
 
 settings = Settings()
@@ -0,0 +1,162 @@
+"""
+Загрузка бюллетеней отдельно от API.
+
+    python -m app.ingest         # фоновая задача: догрузка по расписанию и пропущенных сроков
+    python -m app.ingest --once  # одна догрузка (cron, ручной запуск)
+
+Фоновых процессов может быть сколько угодно: расписание ведет только лидер - владелец
+advisory-блокировки Postgres (ingestion.leader_lock_key), остальные ждут и подменяют
+лидера, если он остановился. Лидер держит блокировку все время работы, поэтому --once
+ее не берет: от наложения запусков защищает журнал ingestion_runs (один запуск
+в статусе running), и --once, пока идет другая загрузка, завершается с кодом 1.
+Остановка по SIGTERM - код 143, как у процесса, убитого сигналом: прерванная --once
+загрузка не выглядит успешной.
+
+Каждый запуск записывается в журнал ingestion_runs (статус, строки, длительность
+стадий), его отдает GET /api/v1/admin/ingestion/.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from datetime import datetime
+from functools import partial
+
+from dishka import AsyncContainer
+
+from app.core import Settings
+from app.core.database.db_helper import DataBaseHelper
+from app.core.database.models.ingestion_runs import RunStatus, RunTrigger
+from app.core.repositories.advisory_lock import AdvisoryLock
+from app.core.repositories.run_repository import IRunRepository
+from app.core.services.leader import run_as_leader
+from app.core.services.pipeline import IngestionReport
+from app.core.services.schedule import run_daily
+from app.core.services.service import Service
+from app.ioc.init_container import init_async_container
+
+log = logging.getLogger(__name__)
+
+
+async def load_docs(container: AsyncContainer, stop_at_known: bool = False) -> IngestionReport:
+    async with container() as requested_container:
+        service = await requested_container.get(Service)
+        return await service.load_docs_in_db(stop_at_known=stop_at_known)
+
+
+async def run_ingestion(
+    container: AsyncContainer,
+    settings: Settings,
+    trigger: RunTrigger,
+    scheduled_for: datetime | None = None,
+) -> bool:
+    """
+    Загрузка с записью в журнал ingestion_runs. False - запуск не начат, потому что
+    выполняется другой. Ошибка загрузки записывается в журнал и пробрасывается дальше.
+    """
+    config = settings.ingestion
+    async with container() as requested_container:
+        runs = await requested_container.get(IRunRepository)
+        # успешный запуск прошел обход страниц до конца и загрузил найденное: все старше
+        # уже загруженного тоже загружено, и обход можно заканчивать на первой странице
+        # без новых бюллетеней. После неудачного запуска обход снова идет до конца
+        last_run = await runs.get_last_finished()
+        stop_at_known = last_run is not None and last_run.status == RunStatus.SUCCEEDED
+        run_id = await runs.start_run(
+            trigger=trigger, scheduled_for=scheduled_for, stale_after=config.run_timeout_seconds
+        )
+    if run_id is None:
+        log.warning("Загрузка уже выполняется, запуск за %s пропущен", scheduled_for)
+        return False
+
+    status, report, error = RunStatus.FAILED, IngestionReport(), None
+    try:
+        async with asyncio.timeout(config.run_timeout_seconds):
+            report = await load_docs(container=container, stop_at_known=stop_at_known)
+        if report.skipped_pages:
+            # найденное загружено, но обход с пропусками не полный: запуск неудачный
+            raise RuntimeError(f"не загрузились страницы результатов: {report.skipped_pages}")
+        status = RunStatus.SUCCEEDED
+        return True
+    except BaseException as e:
+        error = repr(e)
+        raise
+    finally:
+        try:
+            async with container() as requested_container:
+                runs = await requested_container.get(IRunRepository)
+                await runs.finish_run(
+                    run_id=run_id,
+                    status=status,
+                    bulletins=report.bulletins,
+                    rows=report.rows,
+                    stages=report.stages,
+                    error=error,
+                )
+        except Exception:
+            log.exception("Не удалось записать результат запуска %d", run_id)
+
+
+async def ingest_forever(container: AsyncContainer, settings: Settings) -> None:
+    """Работа лидера: догрузка срока, пропущенного без лидера, и дальше по расписанию"""
+    async with container() as requested_container:
+        runs = await requested_container.get(IRunRepository)
+        last_run = await runs.get_last_scheduled()
+
+    await run_daily(
+        # job(срок) -> run_ingestion(..., scheduled_for=срок)
+        job=partial(run_ingestion, container, settings, RunTrigger.SCHEDULED),
+        hour=settings.ingestion.schedule_hour,
+        minute=settings.ingestion.schedule_minute,
+        last_run=last_run,
+        jitter=settings.ingestion.schedule_jitter_seconds,
+        retry_base=settings.ingestion.retry_base_seconds,
+        retry_max=settings.ingestion.retry_max_seconds,
+    )
+
+
+async def main(once: bool) -> int:
+    settings = Settings()
+    logging.basicConfig(
+        level=settings.logging.log_level,
+        format=settings.logging.log_format,
+    )
+    # SIGTERM (остановка контейнера) - как Ctrl+C: job отменяется, блокировка снимается
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+    container = init_async_container(settings=settings)
+    try:
+        if not once:
+            db_helper = await container.get(DataBaseHelper)
+            await run_as_leader(
+                lock=AdvisoryLock(engine=db_helper.engine, key=settings.ingestion.leader_lock_key),
+                job=partial(ingest_forever, container, settings),
+                retry_interval=settings.ingestion.leader_retry_seconds,
+                heartbeat_interval=settings.ingestion.leader_heartbeat_seconds,
+            )
+            return 0
+
+        try:
+            started = await run_ingestion(
+                container=container, settings=settings, trigger=RunTrigger.MANUAL
+            )
+        except Exception:
+            log.exception("Загрузка завершилась ошибкой")
+            return 1
+        return 0 if started else 1
+    finally:
+        await container.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Загрузка бюллетеней SPIMEX")
+    parser.add_argument("--once", action="store_true", help="одна загрузка вместо расписания")
+    try:
+        sys.exit(asyncio.run(main(once=parser.parse_args().once)))
+    except asyncio.CancelledError:
+        log.info("Загрузка остановлена по SIGTERM")
+        sys.exit(128 + signal.SIGTERM)
+    except KeyboardInterrupt:
+        sys.exit(130)
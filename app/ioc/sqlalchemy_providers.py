@@ -1,4 +1,5 @@
-from typing import AsyncGenerator, AsyncIterator
+import asyncio
+from typing import AsyncGenerator, AsyncIterator, Iterator
 
 import aiohttp
 from dishka import Provider, Scope, from_context, provide
@@ -6,10 +7,25 @@ from redis import asyncio as aioredis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database.db_helper import DataBaseHelper
-from app.core.repositories.cache_repository import ICacheRepository, RedisCacheRepository
+from app.core.repositories.cache_repository import (
+    ICacheRepository,
+    RedisCacheRepository,
+    TieredCacheRepository,
+)
 from app.core.repositories.db_repository import AlchemyRepository, IDBRepository
+from app.core.repositories.dimensions import DimensionCache
+from app.core.repositories.local_cache import (
+    CacheNamespace,
+    CacheStats,
+    LocalCache,
+    listen_invalidations,
+)
+from app.core.repositories.run_repository import AlchemyRunRepository, IRunRepository
+from app.core.repositories.snapshot import SnapshotStore
+from app.core.repositories.snapshot_repository import SnapshotRepository
 from app.core.services.excel_parser import ExcelParser
 from app.core.services.http_parser import Parser
+from app.core.services.parse_cache import ParseCache
 from app.core.services.service import Service
 from app.core.settings import Settings
 
@@ -19,14 +35,83 @@ class ServiceProvider(Provider):
     settings = from_context(Settings, scope=Scope.APP)
 
     service = provide(Service)
-    db = provide(AlchemyRepository, provides=IDBRepository)
-    cache = provide(RedisCacheRepository, provides=ICacheRepository)
     parser = provide(Parser)
-    excel_parser = provide(ExcelParser)
+    run_repository = provide(AlchemyRunRepository, provides=IRunRepository)
 
     @provide
-    async def get_http_session(self) -> AsyncIterator[aiohttp.ClientSession]:
-        async with aiohttp.ClientSession() as session:
+    def get_db_repository(
+        self,
+        session: AsyncSession,
+        settings: Settings,
+        dimensions: DimensionCache,
+        snapshot_store: SnapshotStore,
+    ) -> IDBRepository:
+        repository = AlchemyRepository(session=session, dimensions=dimensions)
+        if not settings.snapshot.enabled:
+            return repository
+        return SnapshotRepository(db=repository, store=snapshot_store)
+
+    @provide
+    def get_cache_repository(
+        self,
+        redis: aioredis.Redis,
+        settings: Settings,
+        stats: CacheStats,
+        namespace: CacheNamespace,
+        local_cache: LocalCache,
+    ) -> ICacheRepository:
+        repository = RedisCacheRepository(
+            redis=redis, settings=settings, stats=stats, namespace=namespace
+        )
+        if not settings.redis.local_cache_enabled:
+            return repository
+        return TieredCacheRepository(remote=repository, local=local_cache)
+
+    @provide(scope=Scope.APP)
+    def get_excel_parser(self, settings: Settings) -> Iterator[ExcelParser]:
+        # пул процессов парсера живет все время приложения, а не один запрос
+        excel_parser = ExcelParser(
+            reader=settings.ingestion.excel_reader,
+            workers=settings.ingestion.parse_workers,
+            chunk_size=settings.ingestion.parse_chunk_size,
+        )
+        try:
+            yield excel_parser
+        finally:
+            excel_parser.close()
+
+    @provide(scope=Scope.APP)
+    def get_parse_cache(self, settings: Settings) -> ParseCache:
+        return ParseCache(
+            directory=settings.ingestion.parse_cache_dir,
+            max_bytes=settings.ingestion.parse_cache_max_mb * 1024 * 1024,
+            max_age=settings.ingestion.parse_cache_max_age_days * 24 * 60 * 60,
+            enabled=settings.ingestion.parse_cache_enabled,
+        )
+
+    @provide(scope=Scope.APP)
+    def get_dimensions(self) -> DimensionCache:
+        # id названий из справочников живут все время воркера, а не один запрос
+        return DimensionCache()
+
+    @provide(scope=Scope.APP)
+    def get_snapshot_store(self, settings: Settings) -> SnapshotStore:
+        # один на воркер: держит mmap действующей версии снимка между запросами
+        return SnapshotStore(
+            directory=settings.snapshot.directory,
+            keep_versions=settings.snapshot.keep_versions,
+            enabled=settings.snapshot.enabled,
+        )
+
+    @provide
+    async def get_http_session(self, settings: Settings) -> AsyncIterator[aiohttp.ClientSession]:
+        # соединения к spimex переиспользуются всеми запросами обхода (keep-alive)
+        connector = aiohttp.TCPConnector(
+            limit=settings.crawler.pool_limit,
+            limit_per_host=settings.crawler.pool_limit_per_host,
+            keepalive_timeout=settings.crawler.keepalive_timeout,
+        )
+        async with aiohttp.ClientSession(connector=connector) as session:
             yield session
 
 
@@ -59,6 +144,41 @@ class SQLAlchemyProvider(Provider):
 class RedisProvider(Provider):
     scope = Scope.APP
 
+    @provide
+    def get_cache_stats(self) -> CacheStats:
+        # счетчики и L1 живут все время воркера, а не один запрос
+        return CacheStats()
+
+    @provide
+    def get_local_cache(self, settings: Settings, stats: CacheStats) -> LocalCache:
+        return LocalCache(
+            max_bytes=settings.redis.local_cache_max_mb * 1024 * 1024,
+            ttl=settings.redis.local_cache_ttl,
+            stats=stats,
+        )
+
+    @provide
+    async def get_cache_namespace(
+        self,
+        redis: aioredis.Redis,
+        settings: Settings,
+        local_cache: LocalCache,
+    ) -> AsyncIterator[CacheNamespace]:
+        # подписка на новые версии данных живет, пока жив воркер
+        namespace = CacheNamespace()
+        listener = asyncio.create_task(
+            listen_invalidations(
+                redis=redis,
+                channel=settings.redis.invalidation_channel,
+                namespace=namespace,
+                local_cache=local_cache,
+            )
+        )
+        try:
+            yield namespace
+        finally:
+            listener.cancel()
+
     @provide
     async def get_redis(self, settings: Settings) -> AsyncIterator[aioredis.Redis]:
         redis = aioredis.from_url(str(settings.redis.url))
@@ -1,8 +1,6 @@
 import logging
-from asyncio import create_task
 from contextlib import asynccontextmanager
 
-from dishka import AsyncContainer
 from dishka.integrations.fastapi import setup_dishka
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
@@ -10,20 +8,12 @@ from fastapi.responses import ORJSONResponse
 from app.api import router as api_router
 from app.core import Settings
 from app.core.gunicorn import Application, get_app_options
-from app.core.repositories.cache_repository import ICacheRepository
-from app.core.services.service import Service
 from app.ioc.init_container import init_async_container
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    container: AsyncContainer = app.state.dishka_container
-    async with container() as requested_container:
-        service = await requested_container.get(Service)
-        cache = await requested_container.get(ICacheRepository)
-        await service.load_docs_in_db()
-        create_task(cache.schedule_daily_flush())
-
+    # воркеры только отвечают на запросы: загрузку выполняет python -m app.ingest
     logging.info("Application starts successfully!")
     yield
     logging.info("Shutting down application...")
@@ -1,7 +1,9 @@
 __all__ = (
     "camel_case_to_snake_case",
+    "file_sha256",
     "pluralize",
 )
 
 from .case_convector import camel_case_to_snake_case
+from .file_hash import file_sha256
 from .pluralize import pluralize
@@ -0,0 +1,13 @@
+import hashlib
+from pathlib import Path
+
+
+def file_sha256(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Считает sha256 содержимого файла, читая его кусками, чтобы не держать файл в памяти.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,32 @@
+"""
+Сравнение построчного и векторизованного разбора бюллетеня.
+
+    python -m tests.benchmarks.excel_parser_bench
+"""
+
+import timeit
+
+from app.core.services.excel_parser import ExcelParser
+from tests.fixtures.bulletins import legacy_parse, make_bulletin_frame
+
+
+def main(sizes: tuple[int, ...] = (100, 1000, 5000, 20000), repeat: int = 3) -> None:
+    parser = ExcelParser()
+    print(f"{'rows':>8} {'legacy, ms':>12} {'vectorized, ms':>15} {'speedup':>8}")
+
+    for size in sizes:
+        df = make_bulletin_frame(rows=size)
+        assert parser.parse_dataframe(df=df).to_records() == legacy_parse(df)
+
+        legacy = min(timeit.repeat(lambda: legacy_parse(df), number=1, repeat=repeat))
+        vectorized = min(
+            timeit.repeat(
+                lambda: parser.parse_dataframe(df=df).to_records(), number=1, repeat=repeat
+            )
+        )
+        speedup = legacy / vectorized
+        print(f"{size:>8} {legacy * 1000:>12.1f} {vectorized * 1000:>15.1f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
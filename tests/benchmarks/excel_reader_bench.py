@@ -0,0 +1,83 @@
+"""
+Время и пиковый RSS разбора одного бюллетеня для pandas и xlrd режимов ExcelParser.
+Каждый замер идет в отдельном процессе, чтобы пиковая память не копилась между файлами.
+
+    python -m tests.benchmarks.excel_reader_bench [файлы.xls ...]
+
+Без аргументов генерирует синтетические бюллетени (нужен xlwt).
+"""
+
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+from app.core.services.excel_parser import ExcelParser, ExcelReader
+from tests.fixtures.bulletins import make_bulletin_frame, write_bulletin_xls
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def _reset_peak_rss() -> bool:
+    """На Linux пик RSS (VmHWM) можно сбросить, иначе в нем останется пик от импортов"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def measure(path: str, reader: ExcelReader) -> tuple[float, float, float, int]:
+    """Возвращает (время, сек; пиковый RSS, МБ; прирост пика над RSS до разбора, МБ; строки)"""
+    parser = ExcelParser(reader=reader)
+    if _reset_peak_rss():
+        before = _status_kb("VmRSS:")
+    else:
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    rows = parser.parse_excel_file(path)
+    elapsed = time.perf_counter() - start
+
+    try:
+        peak = _status_kb("VmHWM:")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, peak / 1024, (peak - before) / 1024, len(rows)
+
+
+def run_isolated(path: str, reader: ExcelReader) -> tuple[float, float, float, int]:
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(measure, path, reader).result()
+
+
+def main(paths: list[str]) -> None:
+    print(f"{'file':<20} {'reader':>7} {'rows':>6} {'time, ms':>9} {'peak RSS, MB':>13} {'+MB':>6}")
+    for path in paths:
+        for reader in ("pandas", "xlrd"):
+            elapsed, peak, growth, rows = run_isolated(path, reader)
+            ms = elapsed * 1000
+            name = Path(path).name
+            print(f"{name:<20} {reader:>7} {rows:>6} {ms:>9.1f} {peak:>13.1f} {growth:>6.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(sys.argv[1:])
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            files = [
+                str(write_bulletin_xls(make_bulletin_frame(rows=size), Path(tmp) / f"{size}.xls"))
+                for size in (100, 1000, 5000, 20000)
+            ]
+            main(files)
@@ -0,0 +1,98 @@
+"""
+Ссылки на бюллетени со страниц результатов: BeautifulSoup в event loop (как было)
+против extract_docs_links (lxml + XPath) в потоке.
+
+    python -m tests.benchmarks.html_links_bench [страница.html ...]
+
+Без аргументов разбираются 69 сгенерированных страниц в разметке spimex
+(render_results_page), иначе - сохраненные страницы сайта. Кроме времени разбора
+печатается наибольшая задержка event loop за обход: столько ждал бы ответа
+любой запрос API, пришедший в воркер во время разбора.
+"""
+
+import asyncio
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.core.services.http_parser import extract_docs_links
+from tests.fixtures.spimex_site import legacy_docs_links, render_results_page
+
+DOMAIN = "https://spimex.com/"
+PAGES = 69
+
+
+def sample_pages() -> list[str]:
+    return [
+        render_results_page(
+            [
+                (f"/upload/reports/oil_xls/oil_xls_{page}_{i}.xls", date(2025, 8, 1) - timedelta(i))
+                for i in range(10)
+            ],
+            chrome=400,
+        )
+        for page in range(PAGES)
+    ]
+
+
+def measure(func, pages: list[str], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            func(page, DOMAIN)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def max_loop_lag(parse) -> float:
+    """Наибольшая задержка тика event loop (1 мс), пока идет parse()"""
+    lag, running = 0.0, True
+
+    async def ticker() -> None:
+        nonlocal lag
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - start - 0.001)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    await parse()
+    running = False
+    await task
+    return lag
+
+
+async def run(pages: list[str]) -> None:
+    async def on_loop() -> None:
+        for page in pages:
+            legacy_docs_links(page, DOMAIN)
+            await asyncio.sleep(0)
+
+    async def in_thread() -> None:
+        for page in pages:
+            await asyncio.to_thread(extract_docs_links, page, DOMAIN)
+
+    size = sum(len(page) for page in pages) / len(pages) / 1024
+    old, new = measure(legacy_docs_links, pages), measure(extract_docs_links, pages)
+    print(f"{len(pages)} страниц по {size:.0f} КБ")
+    print(
+        f"разбор: BeautifulSoup {old * 1000:.1f} мс, lxml + XPath {new * 1000:.1f} мс, "
+        f"x{old / new:.1f}"
+    )
+    print(
+        f"задержка event loop: BeautifulSoup в loop {await max_loop_lag(on_loop) * 1000:.1f} мс, "
+        f"extract_docs_links в потоке {await max_loop_lag(in_thread) * 1000:.1f} мс"
+    )
+
+
+if __name__ == "__main__":
+    if paths := sys.argv[1:]:
+        pages = [Path(path).read_text(encoding="utf-8") for path in paths]
+    else:
+        pages = sample_pages()
+    for page in pages:
+        assert extract_docs_links(page, DOMAIN) == legacy_docs_links(page, DOMAIN)
+    asyncio.run(run(pages))
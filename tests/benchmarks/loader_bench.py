@@ -0,0 +1,79 @@
+"""
+Скорость загрузки строк в spimex_trading_results: insert() на каждый файл против COPY.
+Нужна тестовая БД из tests/docker-compose.test.yaml (настройки - tests/core/.env).
+
+    python -m tests.benchmarks.loader_bench [число файлов] [строк в файле]
+"""
+
+import asyncio
+import sys
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app.core.database.db_helper import DataBaseHelper
+from app.core.database.models.base import Base
+from app.core.repositories.db_repository import AlchemyRepository
+from app.core.services.excel_parser import ExcelParser
+from tests.core.settings import TestSettings
+from tests.fixtures.bulletins import make_bulletin_frame
+
+
+def make_bulletins(files: int, rows: int) -> list[tuple[dict, list[dict]]]:
+    records = ExcelParser().parse_dataframe(df=make_bulletin_frame(rows=rows)).to_records()
+    bulletins = list()
+    for index in range(files):
+        day = date(2024, 1, 1) + timedelta(days=index)
+        bulletin = {"url": f"bench-{index}", "status": "loaded", "row_count": len(records)}
+        bulletins.append((bulletin, [{**record, "date": day} for record in records]))
+    return bulletins
+
+
+async def run(files: int = 50, rows: int = 1000) -> None:
+    settings = TestSettings()
+    db_helper = DataBaseHelper(
+        url=str(settings.db.url),
+        echo=False,
+        echo_pool=False,
+        pool_size=settings.db.pool_size,
+        max_overflow=settings.db.max_overflow,
+    )
+    async with db_helper.engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    bulletins = make_bulletins(files=files, rows=rows)
+    total = sum(len(records) for _, records in bulletins)
+
+    async def orm(repository: AlchemyRepository) -> None:
+        for bulletin, records in bulletins:
+            await repository.save_bulletin(bulletin=bulletin, data_list=records)
+
+    async def copy(repository: AlchemyRepository) -> None:
+        await repository.copy_bulletins(
+            bulletins=[bulletin for bulletin, _ in bulletins],
+            data_list=[record for _, records in bulletins for record in records],
+        )
+
+    try:
+        for name, load in (("orm", orm), ("copy", copy)):
+            async with db_helper.session_factory() as session:
+                await session.execute(
+                    text("TRUNCATE spimex_trading_results, ingested_bulletins, trading_days")
+                )
+                await session.commit()
+                start = time.perf_counter()
+                await load(AlchemyRepository(session=session))
+                elapsed = time.perf_counter() - start
+            print(
+                f"{name:>5}: {total} строк за {elapsed:.2f} сек, {total / elapsed:,.0f} строк/сек"
+            )
+    finally:
+        async with db_helper.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await db_helper.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    asyncio.run(run(*args))
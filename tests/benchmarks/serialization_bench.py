@@ -0,0 +1,161 @@
+"""
+Сериализация результата get_dynamics / get_trading_results в тело ответа:
+ORM-объекты -> TradingResultResponse.model_validate().model_dump() -> orjson
+против кортежей колонок -> dump_rows().
+
+    python -m tests.benchmarks.serialization_bench [строк] [--db]
+
+С --db замеряется и чтение из тестовой БД (настройки - tests/core/.env): те же строки
+select_results() через модели против кортежей.
+"""
+
+import asyncio
+import sys
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import orjson
+from sqlalchemy import insert, text
+
+from app.core.database.db_helper import DataBaseHelper
+from app.core.database.models import DeliveryBase, Product, SpimexTradingResult
+from app.core.database.models.base import Base
+from app.core.repositories.db_repository import partition_ddl, select_results
+from app.core.schemas import TradingResultResponse
+from app.core.services.serializers import RESULT_FIELDS, dump_rows
+from tests.core.settings import TestSettings
+
+
+def make_records(rows: int) -> list[dict]:
+    return [
+        {
+            "id": i + 1,
+            "exchange_product_id": f"A{i % 1000:03d}ANK060F",
+            "exchange_product_name": f"Бензин (АИ-92-К5) ст. {i % 1000}",
+            "oil_id": f"A{i % 1000:03d}",
+            "delivery_basis_id": "ANK",
+            "delivery_basis_name": "ст. Ангарск-группа станций",
+            "delivery_type_id": "F",
+            "volume": 60 + i,
+            "total": 1_000_000 + i,
+            "count": 1 + i % 7,
+            "date": date(2024, 1, 1) + timedelta(days=i // 1000),
+            "created_on": date(2025, 8, 4),
+            "updated_on": date(2025, 8, 4),
+        }
+        for i in range(rows)
+    ]
+
+
+async def insert_records(connection, records: list[dict]) -> None:
+    """Записывает строки make_records(): названия - в справочники, в таблицу фактов - их id"""
+    for statement in partition_ddl(dates={record["date"] for record in records}):
+        await connection.execute(text(statement))
+    names = {record["exchange_product_name"] for record in records}
+    bases = {record["delivery_basis_name"] for record in records}
+    products = await connection.execute(
+        insert(Product).returning(Product.name, Product.id), [{"name": name} for name in names]
+    )
+    delivery_bases = await connection.execute(
+        insert(DeliveryBase).returning(DeliveryBase.name, DeliveryBase.id),
+        [{"name": name} for name in bases],
+    )
+    product_ids, base_ids = dict(products.tuples().all()), dict(delivery_bases.tuples().all())
+
+    facts = [
+        {
+            **{key: value for key, value in record.items() if not key.endswith("_name")},
+            "product_id": product_ids[record["exchange_product_name"]],
+            "delivery_base_id": base_ids[record["delivery_basis_name"]],
+        }
+        for record in records
+    ]
+    for start in range(0, len(facts), 20_000):
+        stop = start + 20_000
+        await connection.execute(insert(SpimexTradingResult), facts[start:stop])
+
+
+def models_to_json(results: list) -> bytes:
+    """Путь до fast path: pydantic-модель на каждую строку"""
+    return orjson.dumps(
+        [
+            TradingResultResponse.model_validate(result, from_attributes=True).model_dump()
+            for result in results
+        ]
+    )
+
+
+def measure(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, rows: int, old: float, new: float) -> None:
+    print(
+        f"{name}: {rows} строк, модели {old * 1000:.1f} мс, "
+        f"кортежи {new * 1000:.1f} мс, x{old / new:.1f}"
+    )
+
+
+def run_memory(rows: int) -> None:
+    records = make_records(rows)
+    # объекты с атрибутами, как ORM-строки до справочников названий
+    entities = [SimpleNamespace(**record) for record in records]
+    tuples = [tuple(record[field] for field in RESULT_FIELDS) for record in records]
+    assert models_to_json(entities) == dump_rows(tuples)
+
+    report(
+        "сериализация",
+        rows,
+        old=measure(lambda: models_to_json(entities)),
+        new=measure(lambda: dump_rows(tuples)),
+    )
+
+
+async def run_db(rows: int) -> None:
+    settings = TestSettings()
+    db_helper = DataBaseHelper(
+        url=str(settings.db.url),
+        echo=False,
+        echo_pool=False,
+        pool_size=settings.db.pool_size,
+        max_overflow=settings.db.max_overflow,
+    )
+    async with db_helper.engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await insert_records(connection, make_records(rows))
+
+    async def timed(read) -> float:
+        best = float("inf")
+        for _ in range(5):
+            async with db_helper.session_factory() as session:
+                start = time.perf_counter()
+                await read(session)
+                best = min(best, time.perf_counter() - start)
+        return best
+
+    async def entities(session) -> bytes:
+        return models_to_json([row._mapping for row in await session.execute(select_results())])
+
+    async def tuples(session) -> bytes:
+        return dump_rows(await session.execute(select_results()))
+
+    try:
+        report("чтение из БД", rows, old=await timed(entities), new=await timed(tuples))
+    finally:
+        async with db_helper.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await db_helper.dispose()
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--db"]
+    rows = int(args[0]) if args else 10_000
+    run_memory(rows)
+    if "--db" in sys.argv:
+        asyncio.run(run_db(rows))
@@ -0,0 +1,96 @@
+"""
+Чтения get_last_trading_dates, get_dynamics и get_trading_results: Postgres против
+колоночного снимка (SnapshotRepository). Нужна тестовая БД (настройки - tests/core/.env).
+
+    python -m tests.benchmarks.snapshot_bench [строк]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy import insert
+
+from app.core.database.db_helper import DataBaseHelper
+from app.core.database.models import TradingDay
+from app.core.database.models.base import Base
+from app.core.repositories.db_repository import AlchemyRepository
+from app.core.repositories.snapshot import SnapshotStore
+from app.core.repositories.snapshot_repository import SnapshotRepository
+from app.core.schemas import DynamicRequest, TradingResultsRequest
+from tests.benchmarks.serialization_bench import insert_records, make_records
+from tests.core.settings import TestSettings
+
+QUERIES = {
+    "последние даты": lambda repository: repository.get_all_trading_dates(limit=10),
+    "динамика за месяц": lambda repository: repository.get_dynamics(
+        DynamicRequest(start_date=date(2024, 2, 1), end_date=date(2024, 2, 29))
+    ),
+    "динамика oil_id за год": lambda repository: repository.get_dynamics(
+        DynamicRequest(oil_id="A007", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    ),
+    "страница динамики": lambda repository: repository.get_dynamics(
+        DynamicRequest(start_date=date(2024, 1, 1), end_date=date(2024, 12, 31), limit=100)
+    ),
+    "последние торги": lambda repository: repository.get_trading_results(
+        TradingResultsRequest(oil_id="A007", delivery_type_id="F", delivery_basis_id="ANK")
+    ),
+}
+
+
+async def measure(query, repository, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await query(repository)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def run(rows: int) -> None:
+    settings = TestSettings()
+    db_helper = DataBaseHelper(
+        url=str(settings.db.url),
+        echo=False,
+        echo_pool=False,
+        pool_size=settings.db.pool_size,
+        max_overflow=settings.db.max_overflow,
+    )
+    async with db_helper.engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        records = make_records(rows)
+        await insert_records(connection, records)
+        days = sorted({record["date"] for record in records})
+        await connection.execute(insert(TradingDay), [{"date": day} for day in days])
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            async with db_helper.session_factory() as session:
+                database = AlchemyRepository(session=session)
+                store = SnapshotStore(directory=directory, keep_versions=1)
+                start = time.perf_counter()
+                await store.export(
+                    database.stream_dynamics(
+                        DynamicRequest(start_date=date.min, end_date=date.max), batch_size=50_000
+                    )
+                )
+                print(f"выгрузка снимка: {rows} строк, {time.perf_counter() - start:.2f} сек")
+
+                snapshot = SnapshotRepository(db=database, store=store)
+                for name, query in QUERIES.items():
+                    old = await measure(query, database)
+                    new = await measure(query, snapshot)
+                    print(
+                        f"{name}: postgres {old * 1000:.2f} мс, "
+                        f"снимок {new * 1000:.2f} мс, x{old / new:.1f}"
+                    )
+    finally:
+        async with db_helper.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await db_helper.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000))
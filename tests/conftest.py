@@ -1,3 +1,6 @@
 pytest_plugins = [
     "tests.fixtures.infrastructure",
+    "tests.fixtures.bulletins",
+    "tests.fixtures.trading_results",
+    "tests.fixtures.spimex_site",
 ]
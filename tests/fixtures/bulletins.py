@@ -0,0 +1,126 @@
+import random
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from pandas import DataFrame
+
+SECTION_HEADER = "Единица измерения: Метрическая тонна"
+
+
+def make_bulletin_frame(rows: int = 50, seed: int = 0) -> DataFrame:
+    """
+    DataFrame в том виде, в каком pd.read_excel отдает бюллетень SPIMEX:
+    шапка с датой, секция в метрических тоннах, затем секция в других единицах.
+    """
+    rnd = random.Random(seed)
+    width = 15
+
+    def line(**cells) -> list:
+        row = [None] * width
+        for index, value in cells.items():
+            row[int(index[1:])] = value
+        return row
+
+    data = [
+        line(c1="Бюллетень по итогам торгов"),  # станет заголовком колонок
+        line(c1="АО «СПбМТСБ»"),
+        line(),
+        line(c1="Дата торгов: 01.08.2025"),
+        line(),
+        line(c1="Секция Биржи: «Нефтепродукты» АО «СПбМТСБ»"),
+        line(c1=SECTION_HEADER),
+        line(c1="Код Инструмента", c2="Наименование Инструмента", c3="Базис поставки"),
+        line(c1=None, c4="Объем Договоров в единицах измерения", c14="Количество Договоров, шт."),
+    ]
+    for i in range(rows):
+        # код уникален в пределах секции, как в настоящем бюллетене
+        oil_id = f"{chr(ord('A') + i // 1000 % 26)}{i % 1000:03d}"
+        product_id = f"{oil_id}{rnd.choice(['ANK', 'BRK', 'UFM'])}060{rnd.choice('FJW')}"
+        count = rnd.choice(["-", 0, 1, 2, 5, 17])
+        volume, total = (
+            ("-", "-") if count == "-" else (rnd.randint(60, 9000), rnd.randint(1, 10**9))
+        )
+        data.append(
+            line(
+                c1=product_id,
+                c2=f"Бензин (АИ-92-К5) ст. {i}",
+                c3=f"ст. Базис-{i % 37}",
+                c4=volume,
+                c5=total,
+                c14=count,
+            )
+        )
+    data += [
+        line(c1="Итого:", c4=1, c5=1, c14=1),
+        line(c1="Единица измерения: Килограмм"),
+        line(c1="Код Инструмента"),
+        line(),
+        line(c1="B100ANK060F", c2="Газ", c3="ст. Другая", c4=5, c5=5, c14=5),
+        line(c1="Итого:"),
+    ]
+    columns = [f"Unnamed: {i}" for i in range(width)]
+    columns[1] = data[0][1]
+    return DataFrame(data[1:], columns=columns, dtype=object)
+
+
+def legacy_parse(df: DataFrame) -> list[dict[str, str | int]]:
+    """Построчный разбор, которым ExcelParser пользовался до векторизации (эталон)"""
+    date = df.iloc[2, 1][-10:]
+    start_row = 4
+    while SECTION_HEADER != df.iloc[start_row, 1]:
+        start_row += 1
+    else:
+        start_row += 3
+
+    all_data = list()
+    while "Итого:" not in df.iloc[start_row, 1]:
+        row = df.iloc[start_row]
+        start_row += 1
+
+        try:
+            count = int(row.iloc[14])
+        except ValueError:
+            continue
+
+        if count < 1:
+            continue
+
+        exchange_product_id = row.iloc[1]
+        all_data.append(
+            {
+                "exchange_product_id": exchange_product_id,
+                "exchange_product_name": row.iloc[2],
+                "oil_id": exchange_product_id[:4],
+                "delivery_basis_id": exchange_product_id[4:7],
+                "delivery_basis_name": row.iloc[3],
+                "delivery_type_id": exchange_product_id[-1],
+                "volume": int(row.iloc[4]),
+                "total": int(row.iloc[5]),
+                "count": int(count),
+                "date": datetime.strptime(date, "%d.%m.%Y").date(),
+            }
+        )
+    return all_data
+
+
+@pytest.fixture()
+def bulletin_frame() -> DataFrame:
+    return make_bulletin_frame(rows=200)
+
+
+def write_bulletin_xls(df: DataFrame, path: Path) -> Path:
+    """Сохраняет DataFrame из make_bulletin_frame в .xls (нужен xlwt, в зависимостях его нет)"""
+    import xlwt
+
+    book = xlwt.Workbook(encoding="utf-8")
+    sheet = book.add_sheet("TRADE_SUMMARY")
+    for col, title in enumerate(df.columns):
+        if not title.startswith("Unnamed"):
+            sheet.write(0, col, title)
+    for row, values in enumerate(df.itertuples(index=False), start=1):
+        for col, value in enumerate(values):
+            if value is not None:
+                sheet.write(row, col, value)
+    book.save(str(path))
+    return path
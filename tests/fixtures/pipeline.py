@@ -0,0 +1,106 @@
+import asyncio
+import hashlib
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from app.core import settings
+from app.core.services.excel_parser import ParsedBulletin
+from app.core.services.http_parser import Crawl, Download
+from app.core.services.parse_cache import ParseCache
+from app.core.services.pipeline import IngestionPipeline
+
+BULLETIN_ROWS = 5
+
+
+def bulletin_url(index: int) -> str:
+    return f"https://spimex.test/upload/reports/oil_xls/oil_xls_{index:04d}.xls"
+
+
+def parsed_bulletin(index: int) -> ParsedBulletin:
+    """Разбор бюллетеня index: BULLETIN_ROWS инструментов за свой торговый день"""
+    product_ids = [f"A{row:03d}UFM060F" for row in range(BULLETIN_ROWS)]
+    return ParsedBulletin(
+        date=date(2025, 8, 1) + timedelta(days=index),
+        exchange_product_id=product_ids,
+        exchange_product_name=[f"Бензин {row}" for row in range(BULLETIN_ROWS)],
+        delivery_basis_name=["ст. Уфа"] * BULLETIN_ROWS,
+        volume=np.full(BULLETIN_ROWS, 60 + index, dtype=np.int64),
+        total=np.full(BULLETIN_ROWS, 1000 * (index + 1), dtype=np.int64),
+        count=np.ones(BULLETIN_ROWS, dtype=np.int64),
+    )
+
+
+class FakeParser:
+    """
+    Parser без сети: сайт - это bulletins ссылок, скачивание пишет в folder файл
+    с индексом бюллетеня. failing - индексы, которые не скачиваются.
+    """
+
+    def __init__(self, bulletins: int, folder: Path, failing: set[int] | None = None) -> None:
+        self.urls = [bulletin_url(index) for index in range(bulletins)]
+        self.folder = folder
+        self.failing = failing or set()
+        self.downloaded: list[str] = list()
+
+    async def get_docs_urls(
+        self, skip_urls: set[str] | None = None, stop_at_known: bool = False
+    ) -> Crawl:
+        return Crawl(urls=[url for url in self.urls if url not in (skip_urls or set())])
+
+    async def download_file(
+        self,
+        url: str,
+        validators: tuple[str | None, str | None] | None = None,
+        known_hashes: set[str] | None = None,
+    ) -> Download:
+        await asyncio.sleep(0)
+        index = self.urls.index(url)
+        if index in self.failing:
+            raise ConnectionError(url)
+        self.downloaded.append(url)
+        path = self.folder / f"{index}.xls"
+        path.write_text(str(index))
+        file_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+        known_hashes.add(file_hash)
+        return Download(url=url, path=str(path), file_hash=file_hash)
+
+
+class FakeExcelParser:
+    """ExcelParser без пула процессов: файл "<index>.xls" разбирается в parsed_bulletin(index)"""
+
+    def __init__(self, failing: set[int] | None = None, delay: float = 0.0) -> None:
+        self.failing = failing or set()
+        self.delay = delay
+        self.parsed = 0
+
+    async def parse_files(self, paths: list[str]) -> list[ParsedBulletin | BaseException]:
+        results = list()
+        for path in paths:
+            await asyncio.sleep(self.delay)
+            index = int(Path(path).stem)
+            self.parsed += 1
+            if index in self.failing:
+                results.append(ValueError(f"битый бюллетень {index}"))
+            else:
+                results.append(parsed_bulletin(index))
+        return results
+
+
+def make_pipeline(
+    parser: FakeParser,
+    excel_parser: FakeExcelParser,
+    db_repository,
+    tmp_path: Path,
+    **ingestion,
+) -> IngestionPipeline:
+    return IngestionPipeline(
+        settings=settings.model_copy(
+            update={"ingestion": settings.ingestion.model_copy(update=ingestion)}
+        ),
+        parser=parser,
+        excel_parser=excel_parser,
+        parse_cache=ParseCache(directory=tmp_path / "cache", max_bytes=0, max_age=0, enabled=False),
+        db_repository=db_repository,
+    )
@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+from collections import Counter
+from datetime import date, timedelta
+from urllib.parse import urljoin
+
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from bs4 import BeautifulSoup
+
+PAGE_SIZE = 10
+FIRST_DATE = date(2025, 8, 1)
+OLD_DATE = date(2022, 6, 1)  # бюллетени до 2023 года Parser пропускает
+LAST_MODIFIED = "Fri, 01 Aug 2025 10:00:00 GMT"
+
+
+def render_results_page(bulletins: list[tuple[str, date]], chrome: int = 0) -> str:
+    """
+    Страница результатов с блоками бюллетеней (ссылка, дата торгов) в разметке spimex.
+    chrome - сколько пунктов меню и строк скриптов добавить вокруг: настоящая страница
+    в основном состоит из них, а не из блоков бюллетеней.
+    """
+    menu = "".join(
+        f'<li class="menu__item"><a class="menu__link" href="/section/{i}/">Раздел {i}</a></li>'
+        for i in range(chrome)
+    )
+    script = "".join(
+        f"window.dataLayer.push({{event: 'e{i}', value: {i}}});" for i in range(chrome)
+    )
+    items = "".join(
+        '<div class="accordeon-inner__wrap-item">'
+        f'<a class="accordeon-inner__item-title link xls" href="{href}">Бюллетень</a>'
+        '<div class="accordeon-inner__item-inner">'
+        f"<p>Дата торгов: <span>{day:%d.%m.%Y}</span></p></div></div>"
+        for href, day in bulletins
+    )
+    return (
+        f"<html><head><script>{script}</script></head><body>"
+        f'<nav><ul class="menu">{menu}</ul></nav>'
+        f'<div class="accordeon-inner">{items}</div>'
+        f'<footer><ul class="menu">{menu}</ul></footer></body></html>'
+    )
+
+
+def legacy_docs_links(page: str, domain: str) -> list[str]:
+    """Разбор через BeautifulSoup, которым Parser пользовался до extract_docs_links (эталон)"""
+    divs = BeautifulSoup(page, "lxml").find_all("div", class_="accordeon-inner__wrap-item")[:10]
+    links = list()
+
+    for div in divs:
+        date = div.find("span").text
+        if int(date[-4:]) > 2022:
+            links.append(urljoin(domain, div.find("a")["href"]))
+
+    return links
+
+
+class SpimexSite:
+    """
+    Локальный стенд страниц результатов spimex: по PAGE_SIZE бюллетеней на странице,
+    свежие - на первых страницах, после bulletins новых идут только старые (2022 год).
+    Считает запросы по путям, одновременные запросы и соединения клиентов.
+    failures - сколько раз подряд путь отвечает 503 перед нормальным ответом,
+    truncated - сколько раз файл обрывается на середине тела, duplicates - бюллетени
+    с содержимым другого (индекс -> индекс оригинала). Файлы отдаются с ETag
+    и Last-Modified и на условный запрос с совпавшим ETag отвечают 304.
+    """
+
+    def __init__(self, bulletins: int, delay: float = 0.0) -> None:
+        self.bulletins = bulletins
+        self.delay = delay
+        self.base_url = ""
+        self.failures: Counter[str] = Counter()
+        self.truncated: Counter[str] = Counter()
+        self.duplicates: dict[int, int] = dict()
+        self.not_modified = 0
+        self.requests: Counter[str] = Counter()
+        self.peers: set[tuple] = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def bulletin_path(self, index: int) -> str:
+        return f"/upload/reports/oil_xls/oil_xls_{index:04d}.xls"
+
+    def content(self, index: int) -> bytes:
+        # несколько кусков Parser.download_file при download_chunk_kb по умолчанию
+        index = self.duplicates.get(index, index)
+        return f"bulletin {index}\n".encode() * 20_000
+
+    def etag(self, index: int) -> str:
+        return f'"{hashlib.sha256(self.content(index)).hexdigest()[:16]}"'
+
+    def page_path(self, page: int) -> str:
+        return f"/results/?page=page-{page}"
+
+    def pages_requested(self) -> set[int]:
+        return {
+            int(path.rsplit("-", 1)[1]) for path in self.requests if path.startswith("/results/")
+        }
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._track])
+        app.router.add_get("/results/", self._page)
+        app.router.add_get("/upload/reports/oil_xls/{name}", self._file)
+        return app
+
+    @web.middleware
+    async def _track(self, request: web.Request, handler) -> web.StreamResponse:
+        self.requests[request.path_qs] += 1
+        self.peers.add(request.transport.get_extra_info("peername"))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures[request.path_qs] > 0:
+                self.failures[request.path_qs] -= 1
+                raise web.HTTPServiceUnavailable()
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+
+    async def _page(self, request: web.Request) -> web.Response:
+        page = int(request.query["page"].rsplit("-", 1)[1])
+        bulletins = [
+            (
+                self.bulletin_path(index),
+                FIRST_DATE - timedelta(days=index) if index < self.bulletins else OLD_DATE,
+            )
+            for index in range((page - 1) * PAGE_SIZE, page * PAGE_SIZE)
+        ]
+        return web.Response(text=render_results_page(bulletins), content_type="text/html")
+
+    async def _file(self, request: web.Request) -> web.StreamResponse:
+        index = int(request.match_info["name"].removeprefix("oil_xls_").removesuffix(".xls"))
+        if index >= self.bulletins:
+            raise web.HTTPNotFound()
+        headers = {"ETag": self.etag(index), "Last-Modified": LAST_MODIFIED}
+        if request.headers.get("If-None-Match") == headers["ETag"]:
+            self.not_modified += 1
+            raise web.HTTPNotModified(headers=headers)
+
+        body = self.content(index)
+        if self.truncated[request.path_qs] > 0:
+            self.truncated[request.path_qs] -= 1
+            response = web.StreamResponse(headers=headers)
+            response.content_length = len(body)
+            await response.prepare(request)
+            await response.write(body[: len(body) // 2])
+            request.transport.close()
+            return response
+        return web.Response(body=body, headers=headers)
+
+
+@pytest_asyncio.fixture()
+async def spimex_site() -> SpimexSite:
+    """Стенд на 35 свежих бюллетеней (4 страницы), запущенный на свободном порту"""
+    site = SpimexSite(bulletins=35, delay=0.01)
+    server = TestServer(site.app())
+    await server.start_server()
+    site.base_url = str(server.make_url("/"))
+    yield site
+    await server.close()
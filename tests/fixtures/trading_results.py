@@ -0,0 +1,146 @@
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Iterable
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.db_helper import DataBaseHelper
+from app.core.database.models import BulletinStatus
+from app.core.repositories.db_repository import AlchemyRepository, partition_ddl
+from app.core.services.excel_parser import ExcelParser
+from tests.fixtures.bulletins import make_bulletin_frame
+
+# размер таблицы, на котором планировщик уже выбирает индексы, а не seq scan
+SEED_DAYS = 250
+SEED_PRODUCTS = 400
+SEED_START = date(2024, 1, 1)
+
+
+def bulletin_rows(seed: int, trading_date: date) -> list[dict]:
+    """Строки разобранного бюллетеня (200 инструментов) за торговый день trading_date"""
+    rows = ExcelParser().parse_dataframe(make_bulletin_frame(rows=200, seed=seed)).to_records()
+    return [{**row, "date": trading_date} for row in rows]
+
+
+@pytest.fixture(params=["orm", "copy"])
+def loader(request) -> str:
+    """Способ записи бюллетеня, ingestion.loader: save_bulletin (orm) или copy_bulletins"""
+    return request.param
+
+
+@pytest.fixture()
+def load_bulletins(
+    db_session: AsyncSession, loader: str
+) -> Callable[[Iterable[tuple[str, list[dict]]]], Awaitable[None]]:
+    """Записывает бюллетени (ссылка, строки) по одному способом loader, как загрузчик"""
+    repository = AlchemyRepository(session=db_session)
+
+    async def load(bulletins: Iterable[tuple[str, list[dict]]]) -> None:
+        for url, rows in bulletins:
+            bulletin = {"url": url, "status": BulletinStatus.LOADED, "row_count": len(rows)}
+            if loader == "orm":
+                await repository.save_bulletin(bulletin=bulletin, data_list=rows)
+            else:
+                await repository.copy_bulletins(bulletins=[bulletin], data_list=rows)
+
+    return load
+
+
+@pytest_asyncio.fixture()
+async def seeded_trading_results(init_models, db_helper: DataBaseHelper) -> int:
+    """
+    Заполняет spimex_trading_results SEED_DAYS торговыми днями по SEED_PRODUCTS
+    инструментов (200 видов продукта, 5 типов поставки) и собирает статистику.
+    Возвращает число строк.
+    """
+    async with db_helper.engine.begin() as connection:
+        seed_dates = {SEED_START + timedelta(days=d) for d in range(SEED_DAYS)}
+        for statement in partition_ddl(dates=seed_dates):
+            await connection.execute(text(statement))
+        # названия инструментов и базисов - в справочники, в таблицу фактов - их id
+        await connection.execute(
+            text(
+                """
+                INSERT INTO products (name)
+                SELECT 'Продукт ' || 'A' || lpad(p::text, 3, '0') FROM generate_series(0, 199) AS p
+                """
+            )
+        )
+        await connection.execute(
+            text(
+                """
+                INSERT INTO delivery_bases (name)
+                SELECT DISTINCT 'Базис ' || lpad((p / 200 * 10 + p % 40)::text, 3, '0')
+                FROM generate_series(0, :products - 1) AS p
+                """
+            ),
+            {"products": SEED_PRODUCTS},
+        )
+        await connection.execute(
+            text(
+                """
+                INSERT INTO spimex_trading_results (
+                    exchange_product_id, product_id, oil_id, delivery_basis_id,
+                    delivery_base_id, delivery_type_id, volume, total, count,
+                    date, created_on, updated_on
+                )
+                SELECT
+                    oil_id || basis_id || 'A' || type_id,
+                    products.id,
+                    oil_id,
+                    basis_id,
+                    delivery_bases.id,
+                    type_id,
+                    (p * 7 + d) % 1000 + 1,
+                    ((p * 7 + d) % 1000 + 1) * 50000,
+                    p % 10 + 1,
+                    CAST(:start AS date) + d,
+                    now(),
+                    now()
+                FROM generate_series(0, :days - 1) AS d,
+                     generate_series(0, :products - 1) AS p,
+                     LATERAL (
+                         SELECT
+                             'A' || lpad((p % 200)::text, 3, '0') AS oil_id,
+                             lpad((p / 200 * 10 + p % 40)::text, 3, '0') AS basis_id,
+                             chr(ascii('A') + p % 5) AS type_id
+                     ) AS codes
+                JOIN products ON products.name = 'Продукт ' || oil_id
+                JOIN delivery_bases ON delivery_bases.name = 'Базис ' || basis_id
+                """
+            ),
+            {"days": SEED_DAYS, "products": SEED_PRODUCTS, "start": SEED_START},
+        )
+        await connection.execute(
+            text(
+                """
+                INSERT INTO trading_days (date, row_count, updated_on)
+                SELECT date, count(*), now() FROM spimex_trading_results GROUP BY date
+                """
+            )
+        )
+        await connection.execute(
+            text(
+                """
+                INSERT INTO trading_rollups (
+                    date, oil_id, delivery_basis_id, volume, total, count, updated_on
+                )
+                SELECT date, oil_id, delivery_basis_id, sum(volume), sum(total), sum(count), now()
+                FROM spimex_trading_results
+                GROUP BY date, oil_id, delivery_basis_id
+                """
+            )
+        )
+
+    # VACUUM не выполняется в транзакции; карта видимости нужна для index-only scan
+    autocommit = db_helper.engine.execution_options(isolation_level="AUTOCOMMIT")
+    async with autocommit.connect() as connection:
+        await connection.execute(
+            text(
+                "VACUUM ANALYZE spimex_trading_results, trading_days, trading_rollups, "
+                "products, delivery_bases"
+            )
+        )
+    return SEED_DAYS * SEED_PRODUCTS
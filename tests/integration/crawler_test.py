@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import os
+
+import aiohttp
+import pytest
+
+from app.core import settings
+from app.core.database.models import BulletinStatus
+from app.core.repositories.db_repository import AlchemyRepository
+from app.core.services import http_parser
+from app.core.services.http_parser import Parser
+from app.core.settings import Crawler, Links
+from tests.fixtures.spimex_site import LAST_MODIFIED, SpimexSite
+
+
+def make_parser(site: SpimexSite, session: aiohttp.ClientSession, **crawler) -> Parser:
+    crawler = {"concurrency": 3, "backoff_base": 0.01, "backoff_max": 0.05, **crawler}
+    return Parser(
+        settings=settings.model_copy(
+            update={
+                "links": Links(url=f"{site.base_url}results/?page=page-", domain=site.base_url),
+                "crawler": Crawler(**crawler),
+            }
+        ),
+        session=session,
+    )
+
+
+def pooled_session(limit_per_host: int) -> aiohttp.ClientSession:
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit_per_host=limit_per_host))
+
+
+def bulletin_urls(site: SpimexSite, indexes: range) -> list[str]:
+    return [f"{site.base_url.rstrip('/')}{site.bulletin_path(index)}" for index in indexes]
+
+
+@pytest.mark.asyncio
+async def test_full_crawl_stops_after_last_new_page(spimex_site: SpimexSite):
+    async with pooled_session(limit_per_host=8) as session:
+        crawl = await make_parser(spimex_site, session).get_docs_urls()
+
+    assert crawl.urls == bulletin_urls(spimex_site, range(35)) and crawl.complete
+    # страница 5 уже без свежих бюллетеней; 6-я могла успеть уйти в окне page_window
+    assert {1, 2, 3, 4, 5} <= spimex_site.pages_requested() <= {1, 2, 3, 4, 5, 6}
+
+
+@pytest.mark.asyncio
+async def test_daily_crawl_touches_two_pages(spimex_site: SpimexSite):
+    known = set(bulletin_urls(spimex_site, range(3, 35)))
+    async with pooled_session(limit_per_host=8) as session:
+        crawl = await make_parser(spimex_site, session, page_window=1).get_docs_urls(
+            known, stop_at_known=True
+        )
+
+    assert crawl.urls == bulletin_urls(spimex_site, range(3))
+    # на второй странице все бюллетени уже загружены: дальше обход не идет
+    assert spimex_site.pages_requested() == {1, 2}
+
+
+@pytest.mark.asyncio
+async def test_crawl_after_interrupted_first_crawl_reaches_date_bound(spimex_site: SpimexSite):
+    # первый обход прервался: загружены только самые свежие бюллетени
+    known = set(bulletin_urls(spimex_site, range(12)))
+    async with pooled_session(limit_per_host=8) as session:
+        crawl = await make_parser(spimex_site, session, page_window=1).get_docs_urls(known)
+
+    # полного обхода еще не было - страницы без новых бюллетеней его не останавливают
+    assert crawl.urls == bulletin_urls(spimex_site, range(12, 35))
+    assert spimex_site.pages_requested() == {1, 2, 3, 4, 5}
+
+
+@pytest.mark.asyncio
+async def test_downloads_are_bounded_and_reuse_connections(spimex_site: SpimexSite, tmp_path):
+    async with pooled_session(limit_per_host=8) as session:
+        parser = make_parser(spimex_site, session, concurrency=3)
+        urls = (await parser.get_docs_urls()).urls
+        downloads = await asyncio.gather(
+            *(parser.download_file(url=url, folder=str(tmp_path)) for url in urls)
+        )
+
+    assert len({download.path for download in downloads}) == 35
+    # пул разрешает 8 соединений, но одновременно идут не больше concurrency запросов,
+    # и 40 с лишним запросов проходят по тем же keep-alive соединениям
+    assert spimex_site.max_in_flight == 3
+    assert len(spimex_site.peers) <= 3
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_with_jitter(spimex_site: SpimexSite, monkeypatch):
+    bounds = list()
+    uniform = http_parser.random.uniform
+
+    def recording_uniform(low: float, high: float) -> float:
+        bounds.append((low, high))
+        return uniform(low, high)
+
+    monkeypatch.setattr(http_parser.random, "uniform", recording_uniform)
+    spimex_site.failures[spimex_site.page_path(1)] = 2
+    spimex_site.failures[spimex_site.bulletin_path(0)] = 1
+
+    async with pooled_session(limit_per_host=8) as session:
+        parser = make_parser(spimex_site, session, retries=3)
+        urls = (await parser.get_docs_urls()).urls
+        content = await parser._request(url=urls[0], read=aiohttp.ClientResponse.read)
+
+    assert urls == bulletin_urls(spimex_site, range(35))
+    assert content == spimex_site.content(0)
+    assert spimex_site.requests[spimex_site.page_path(1)] == 3
+    assert spimex_site.requests[spimex_site.bulletin_path(0)] == 2
+    # пауза растет экспоненциально до backoff_max, само значение - случайное из [0, предел]
+    assert bounds == [(0, 0.01), (0, 0.02), (0, 0.01)]
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(spimex_site: SpimexSite, tmp_path):
+    missing = bulletin_urls(spimex_site, range(99, 100))[0]
+    async with pooled_session(limit_per_host=8) as session:
+        with pytest.raises(aiohttp.ClientResponseError) as error:
+            await make_parser(spimex_site, session).download_file(url=missing, folder=str(tmp_path))
+
+    assert error.value.status == 404
+    assert spimex_site.requests[spimex_site.bulletin_path(99)] == 1
+
+
+@pytest.mark.asyncio
+async def test_download_is_streamed_to_temp_file_and_renamed(spimex_site: SpimexSite, tmp_path):
+    # первый ответ обрывается на середине тела: повтор начинает файл заново
+    spimex_site.truncated[spimex_site.bulletin_path(3)] = 1
+    (url,) = bulletin_urls(spimex_site, range(3, 4))
+    async with pooled_session(limit_per_host=8) as session:
+        download = await make_parser(spimex_site, session, download_chunk_kb=16).download_file(
+            url=url, folder=str(tmp_path)
+        )
+
+    with open(download.path, "rb") as f:
+        assert f.read() == spimex_site.content(3)
+    assert download.file_hash == hashlib.sha256(spimex_site.content(3)).hexdigest()
+    assert (download.etag, download.last_modified) == (spimex_site.etag(3), LAST_MODIFIED)
+    assert spimex_site.requests[spimex_site.bulletin_path(3)] == 2
+    # ни оборванной, ни удачной загрузки во временных файлах не осталось
+    assert os.listdir(tmp_path) == [os.path.basename(download.path)]
+
+
+@pytest.mark.asyncio
+async def test_known_content_is_not_saved(spimex_site: SpimexSite, tmp_path):
+    spimex_site.duplicates[5] = 4
+    first, second = bulletin_urls(spimex_site, range(4, 6))
+    known_hashes = set()
+    async with pooled_session(limit_per_host=8) as session:
+        parser = make_parser(spimex_site, session)
+        original = await parser.download_file(
+            url=first, folder=str(tmp_path), known_hashes=known_hashes
+        )
+        duplicate = await parser.download_file(
+            url=second, folder=str(tmp_path), known_hashes=known_hashes
+        )
+
+    assert known_hashes == {original.file_hash}
+    assert duplicate.file_hash == original.file_hash
+    assert duplicate.path is None and not duplicate.not_modified
+    assert os.listdir(tmp_path) == [os.path.basename(original.path)]
+
+
+@pytest.mark.asyncio
+async def test_failed_bulletin_is_downloaded_conditionally(
+    init_models, db_session, spimex_site: SpimexSite, tmp_path
+):
+    loaded, failed = bulletin_urls(spimex_site, range(2))
+    repository = AlchemyRepository(session=db_session)
+    async with pooled_session(limit_per_host=8) as session:
+        parser = make_parser(spimex_site, session)
+        for url, status in ((loaded, BulletinStatus.LOADED), (failed, BulletinStatus.FAILED)):
+            download = await parser.download_file(url=url, folder=str(tmp_path))
+            bulletin = {
+                "url": url,
+                "file_hash": download.file_hash,
+                "etag": download.etag,
+                "last_modified": download.last_modified,
+                "status": status,
+            }
+            await repository.save_bulletin(bulletin=bulletin, data_list=[])
+
+        # повторно скачиваются только FAILED: для них и нужны заголовки прошлого раза
+        validators = await repository.get_download_validators()
+        assert validators == {failed: (spimex_site.etag(1), LAST_MODIFIED)}
+        again = await parser.download_file(
+            url=failed, folder=str(tmp_path), validators=validators[failed]
+        )
+
+    # 304: заново разбирается локальная копия
+    assert again.not_modified and again.path == os.path.join(tmp_path, os.path.basename(failed))
+    assert again.file_hash == hashlib.sha256(spimex_site.content(1)).hexdigest()
+    assert spimex_site.not_modified == 1
+
+
+@pytest.mark.asyncio
+async def test_not_modified_without_local_copy_is_downloaded(spimex_site: SpimexSite, tmp_path):
+    (url,) = bulletin_urls(spimex_site, range(1, 2))
+    async with pooled_session(limit_per_host=8) as session:
+        download = await make_parser(spimex_site, session).download_file(
+            url=url, folder=str(tmp_path), validators=(spimex_site.etag(1), LAST_MODIFIED)
+        )
+
+    assert not download.not_modified
+    with open(download.path, "rb") as f:
+        assert f.read() == spimex_site.content(1)
+    assert spimex_site.not_modified == 1
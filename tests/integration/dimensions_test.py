@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.models import DeliveryBase, Product
+from app.core.repositories.db_repository import AlchemyRepository
+from app.core.repositories.dimensions import DimensionCache
+from app.core.schemas import DynamicRequest
+from tests.fixtures.trading_results import bulletin_rows
+
+
+@pytest.mark.asyncio
+async def test_names_roundtrip_through_dimensions(
+    init_models, db_session: AsyncSession, load_bulletins
+):
+    repository = AlchemyRepository(session=db_session)
+    first, second = bulletin_rows(0, date(2025, 8, 1)), bulletin_rows(1, date(2025, 8, 4))
+    await load_bulletins([("https://x/1", first), ("https://x/2", second)])
+
+    request = DynamicRequest(start_date=date(2025, 8, 1), end_date=date(2025, 8, 4))
+    loaded = {
+        (row.exchange_product_id, row.date): (row.exchange_product_name, row.delivery_basis_name)
+        for row in await repository.get_dynamics(request)
+    }
+    assert loaded == {
+        (row["exchange_product_id"], row["date"]): (
+            row["exchange_product_name"],
+            row["delivery_basis_name"],
+        )
+        for row in first + second
+    }
+    # у каждого названия одна строка справочника, сколько бы раз оно ни встретилось
+    names = {row["exchange_product_name"] for row in first + second}
+    assert await db_session.scalar(select(func.count()).select_from(Product)) == len(names)
+    bases = {row["delivery_basis_name"] for row in first + second}
+    assert await db_session.scalar(select(func.count()).select_from(DeliveryBase)) == len(bases)
+
+
+@pytest.mark.asyncio
+async def test_failed_load_keeps_dimension_ids_valid(init_models, db_session: AsyncSession):
+    dimensions = DimensionCache()
+    rows = bulletin_rows(0, date(2025, 8, 1))
+    broken = [{**row, "count": -1} for row in rows]
+
+    with pytest.raises(IntegrityError):
+        await AlchemyRepository(session=db_session, dimensions=dimensions).create_docs_bulk(broken)
+    await db_session.rollback()
+
+    # строки откатились, а id названий из кэша воркера остались настоящими
+    assert dimensions.ids["exchange_product_name"]
+    await AlchemyRepository(session=db_session, dimensions=dimensions).create_docs_bulk(rows)
+    request = DynamicRequest(start_date=date(2025, 8, 1), end_date=date(2025, 8, 1))
+    assert len(await AlchemyRepository(session=db_session).get_dynamics(request)) == len(rows)
@@ -0,0 +1,42 @@
+from datetime import date
+
+import orjson
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import settings
+from app.core.repositories.db_repository import AlchemyRepository
+from app.core.schemas import DynamicRequest
+from app.core.services.service import Service
+
+
+@pytest.mark.asyncio
+async def test_dynamics_pages_cover_period(seeded_trading_results, db_session: AsyncSession):
+    service = Service(
+        settings=settings,
+        parser=None,
+        excel_parser=None,
+        parse_cache=None,
+        db_repository=AlchemyRepository(session=db_session),
+        cache_repository=None,
+        snapshot_store=None,
+    )
+    # мимо @cached: проверяется сама выдача страниц
+    get_dynamics = Service.get_dynamics.__wrapped__
+    filters = {"start_date": date(2024, 3, 1), "end_date": date(2024, 3, 10)}
+
+    items, cursor, pages = [], None, 0
+    while True:
+        page = orjson.loads(
+            await get_dynamics(service, DynamicRequest(**filters, limit=700, cursor=cursor))
+        )
+        items.extend(page["items"])
+        pages += 1
+        if (cursor := page["next_cursor"]) is None:
+            break
+
+    assert pages == 6
+    assert items == orjson.loads(await get_dynamics(service, DynamicRequest(**filters)))
+    keys = [(item["date"], item["id"]) for item in items]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == len(keys) == 4000
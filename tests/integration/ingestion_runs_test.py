@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.models.ingestion_runs import RunStatus, RunTrigger
+from app.core.repositories.run_repository import AlchemyRunRepository
+
+SLOT = datetime(2025, 8, 4, 14, 11)
+
+
+@pytest.mark.asyncio
+async def test_single_running_run(init_models, db_session: AsyncSession):
+    runs = AlchemyRunRepository(session=db_session)
+
+    run_id = await runs.start_run(trigger=RunTrigger.SCHEDULED, scheduled_for=SLOT, stale_after=60)
+    assert run_id is not None
+    # пока первый запуск выполняется, второй не начинается
+    assert (
+        await runs.start_run(trigger=RunTrigger.MANUAL, scheduled_for=None, stale_after=60) is None
+    )
+
+    stages = {"crawl": 1.5, "download": 2.0, "parse": 3.0, "load": 0.5, "cache_refresh": 0.1}
+    await runs.finish_run(
+        run_id=run_id, status=RunStatus.SUCCEEDED, bulletins=2, rows=300, stages=stages
+    )
+    assert await runs.start_run(trigger=RunTrigger.MANUAL, scheduled_for=None, stale_after=60)
+
+    last, first = await runs.get_runs(limit=10)
+    assert last.status == RunStatus.RUNNING and last.duration is None
+    assert first.status == RunStatus.SUCCEEDED
+    assert (first.bulletins, first.rows, first.stages) == (2, 300, stages)
+    assert first.duration >= 0
+    assert (await runs.get_last_success()).id == run_id
+    # running-запуск еще не завершен: последним завершенным остается первый
+    assert (await runs.get_last_finished()).id == run_id
+    assert await runs.get_last_scheduled() == SLOT
+
+
+@pytest.mark.asyncio
+async def test_stale_run_is_failed(init_models, db_session: AsyncSession):
+    runs = AlchemyRunRepository(session=db_session)
+    run_id = await runs.start_run(trigger=RunTrigger.SCHEDULED, scheduled_for=SLOT, stale_after=60)
+    # процесс запуска упал час назад, не записав результат
+    await db_session.execute(
+        text("UPDATE ingestion_runs SET started_at = now() - interval '1 hour' WHERE id = :id"),
+        {"id": run_id},
+    )
+    await db_session.commit()
+
+    # запуск младше stale_after еще может выполняться
+    await runs.fail_stale(stale_after=2 * 60 * 60)
+    assert (await runs.get_runs(limit=1))[0].status == RunStatus.RUNNING
+
+    assert await runs.start_run(trigger=RunTrigger.MANUAL, scheduled_for=None, stale_after=60)
+    stale = next(run for run in await runs.get_runs(limit=10) if run.id == run_id)
+    await db_session.refresh(stale)
+    assert stale.status == RunStatus.FAILED
+    # неудачный запуск не считается выполненным сроком: его догрузят
+    assert await runs.get_last_scheduled() is None
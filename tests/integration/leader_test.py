@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.core.database.db_helper import DataBaseHelper
+from app.core.repositories.advisory_lock import AdvisoryLock
+from app.core.services.leader import run_as_leader
+
+KEY = 0x7E57
+
+
+@pytest.mark.asyncio
+async def test_advisory_lock_has_single_owner(db_helper: DataBaseHelper):
+    first = AdvisoryLock(engine=db_helper.engine, key=KEY)
+    second = AdvisoryLock(engine=db_helper.engine, key=KEY)
+    try:
+        assert await first.acquire()
+        assert not await second.acquire()
+        assert not second.held
+
+        await first.release()
+        assert await second.acquire()
+    finally:
+        await first.release()
+        await second.release()
+        await db_helper.dispose()
+
+
+@pytest.mark.asyncio
+async def test_standby_takes_over_when_leader_loses_connection(db_helper: DataBaseHelper):
+    started: list[str] = []
+    cancelled: list[str] = []
+    leader_lock = AdvisoryLock(engine=db_helper.engine, key=KEY)
+    standby_lock = AdvisoryLock(engine=db_helper.engine, key=KEY)
+
+    def job(name: str):
+        async def work() -> None:
+            started.append(name)
+            try:
+                await asyncio.sleep(0 if name == "standby" else 60)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+
+        return work
+
+    def run(name: str, lock: AdvisoryLock, retry_interval: float) -> asyncio.Task:
+        return asyncio.create_task(
+            run_as_leader(
+                lock=lock, job=job(name), retry_interval=retry_interval, heartbeat_interval=0.05
+            )
+        )
+
+    leader = run("leader", leader_lock, retry_interval=60)
+    while not started:
+        await asyncio.sleep(0.01)
+    standby = run("standby", standby_lock, retry_interval=0.05)
+    try:
+        await asyncio.sleep(0.2)
+        assert started == ["leader"]
+
+        # обрыв соединения лидера: Postgres снимает его блокировку
+        async with db_helper.engine.connect() as connection:
+            await connection.execute(
+                text(
+                    "SELECT pg_terminate_backend(pid) FROM pg_locks "
+                    "WHERE locktype = 'advisory' AND objid = :key AND granted"
+                ),
+                {"key": KEY},
+            )
+
+        await asyncio.wait_for(standby, timeout=5)
+        while not cancelled:
+            await asyncio.sleep(0.01)
+        assert started == ["leader", "standby"]
+        assert cancelled == ["leader"]
+        assert not standby_lock.held
+    finally:
+        leader.cancel()
+        standby.cancel()
+        await asyncio.gather(leader, standby, return_exceptions=True)
+        await db_helper.dispose()
@@ -0,0 +1,29 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tests.fixtures.trading_results import bulletin_rows
+
+ROWS_BY_PARTITION = """
+    SELECT tableoid::regclass::text, count(*)
+    FROM spimex_trading_results
+    GROUP BY tableoid
+"""
+
+
+@pytest.mark.asyncio
+async def test_load_creates_month_partitions(init_models, db_session: AsyncSession, load_bulletins):
+    days = (date(2025, 7, 31), date(2025, 8, 1), date(2025, 8, 4))
+    loaded = {day: bulletin_rows(i, day) for i, day in enumerate(days)}
+
+    # второй проход - повторная загрузка: секции месяцев уже созданы
+    for _ in range(2):
+        await load_bulletins((f"https://x/{day}", rows) for day, rows in loaded.items())
+
+    result = await db_session.execute(text(ROWS_BY_PARTITION))
+    assert dict(result.tuples().all()) == {
+        "spimex_trading_results_y2025m07": len(loaded[days[0]]),
+        "spimex_trading_results_y2025m08": len(loaded[days[1]]) + len(loaded[days[2]]),
+    }
@@ -0,0 +1,243 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import Select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.repositories.db_repository import AlchemyRepository
+from app.core.schemas import (
+    AggregatesRequest,
+    DynamicRequest,
+    TradingResultsRequest,
+    encode_cursor,
+)
+from tests.fixtures.trading_results import SEED_DAYS, SEED_PRODUCTS
+
+TABLE = "spimex_trading_results"
+DIMENSIONS = ("products", "delivery_bases")
+
+
+class ExplainSession:
+    """Обертка над сессией: перед каждым запросом репозитория сохраняет его EXPLAIN"""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.plans: list[dict] = list()
+
+    async def execute(self, query: Select):
+        await self._explain(query)
+        return await self.session.execute(query)
+
+    async def scalars(self, query: Select):
+        await self._explain(query)
+        return await self.session.scalars(query)
+
+    async def _explain(self, query: Select) -> None:
+        sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+        result = await self.session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+        plan = result.scalar()[0]["Plan"]
+        await self._to_parents(plan)
+        self.plans.append(plan)
+
+    async def _to_parents(self, plan: dict) -> None:
+        """
+        Секции и их индексы -> секционированная таблица и ее индексы: проверки плана
+        не зависят от числа секций. Сама секция остается в узле под ключом "Partition".
+        """
+        result = await self.session.execute(
+            text(
+                """
+                SELECT child.relname, parent.relname
+                FROM pg_inherits
+                JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+                JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+                """
+            )
+        )
+        parents = dict(result.tuples().all())
+        for node in plan_nodes(plan):
+            if (relation := node.get("Relation Name")) in parents:
+                node["Partition"] = relation
+                node["Relation Name"] = parents[relation]
+            if (index := node.get("Index Name")) in parents:
+                node["Index Name"] = parents[index]
+
+
+def plan_nodes(plan: dict) -> list[dict]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def seq_scans(plan: dict) -> list[dict]:
+    return [
+        node
+        for node in plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") == TABLE
+    ]
+
+
+def used_indexes(plan: dict) -> set[str]:
+    """Индексы таблицы фактов и сводок; pk справочников названий (products и др.) не в счет"""
+    return {
+        node["Index Name"]
+        for node in plan_nodes(plan)
+        if "Index Name" in node and node.get("Relation Name") not in DIMENSIONS
+    }
+
+
+def scanned_partitions(plan: dict) -> set[str]:
+    return {node["Partition"] for node in plan_nodes(plan) if node.get("Relation Name") == TABLE}
+
+
+def has_sort(plan: dict) -> bool:
+    return any(node["Node Type"] in ("Sort", "Incremental Sort") for node in plan_nodes(plan))
+
+
+@pytest.fixture()
+def explain_session(db_session: AsyncSession) -> ExplainSession:
+    return ExplainSession(session=db_session)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("filters", "index"),
+    [
+        ({"oil_id": "A007"}, "ix_spimex_trading_results_oil_id_date_id"),
+        (
+            {"oil_id": "A007", "delivery_type_id": "C", "delivery_basis_id": "007"},
+            "ix_spimex_trading_results_oil_id_type_basis_date_id",
+        ),
+    ],
+)
+async def test_trading_results_plan(seeded_trading_results, explain_session, filters, index):
+    repository = AlchemyRepository(session=explain_session)
+    results = await repository.get_trading_results(TradingResultsRequest(**filters))
+
+    plan = explain_session.plans[0]
+    assert results
+    assert not seq_scans(plan)
+    # (id, date) последней строки - по индексу фильтров, сама строка - по (id, date)
+    # в одной секции: первичный ключ или (date, id), что выберет планировщик
+    assert index in used_indexes(plan)
+    assert used_indexes(plan) <= {index, "pk_spimex_trading_results", f"ix_{TABLE}_date_id"}
+    # порядок date DESC берется из индекса: без сортировки LIMIT 1 читает одну строку
+    assert not has_sort(plan)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("filters", "index"),
+    [
+        ({}, "ix_spimex_trading_results_date_id"),
+        ({"oil_id": "A007"}, "ix_spimex_trading_results_oil_id_date_id"),
+        (
+            {"oil_id": "A007", "delivery_type_id": "C", "delivery_basis_id": "007"},
+            "ix_spimex_trading_results_oil_id_type_basis_date_id",
+        ),
+    ],
+)
+async def test_dynamics_plan(seeded_trading_results, explain_session, filters, index):
+    repository = AlchemyRepository(session=explain_session)
+    request = DynamicRequest(start_date=date(2024, 3, 1), end_date=date(2024, 3, 7), **filters)
+    results = await repository.get_dynamics(request)
+
+    plan = explain_session.plans[0]
+    assert results
+    assert not seq_scans(plan)
+    assert used_indexes(plan) == {index}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("start_date", "end_date", "partitions"),
+    [
+        (date(2024, 3, 1), date(2024, 3, 7), {f"{TABLE}_y2024m03"}),
+        (
+            date(2024, 2, 15),
+            date(2024, 4, 10),
+            {f"{TABLE}_y2024m{month:02d}" for month in (2, 3, 4)},
+        ),
+    ],
+)
+async def test_dynamics_partition_pruning(
+    seeded_trading_results, explain_session, start_date, end_date, partitions
+):
+    repository = AlchemyRepository(session=explain_session)
+    request = DynamicRequest(start_date=start_date, end_date=end_date, oil_id="A007")
+    results = await repository.get_dynamics(request)
+
+    plan = explain_session.plans[0]
+    assert {result.date.month for result in results} == {int(name[-2:]) for name in partitions}
+    # диапазон дат читает только свои месячные секции из девяти
+    assert scanned_partitions(plan) == partitions
+    assert not seq_scans(plan)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("filters", "index"),
+    [
+        ({}, "ix_spimex_trading_results_date_id"),
+        ({"oil_id": "A007"}, "ix_spimex_trading_results_oil_id_date_id"),
+    ],
+)
+async def test_dynamics_page_plan(seeded_trading_results, explain_session, filters, index):
+    repository = AlchemyRepository(session=explain_session)
+    request = DynamicRequest(
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 12, 31),
+        limit=50,
+        cursor=encode_cursor(last_date=date(2024, 5, 1), last_id=SEED_PRODUCTS * 120),
+        **filters,
+    )
+    results = await repository.get_dynamics(request)
+
+    plan = explain_session.plans[0]
+    assert len(results) == 51
+    assert not seq_scans(plan)
+    assert not has_sort(plan)
+    # секции читаются по порядку дат, и в каждой планировщик выбирает индекс сам
+    assert index in used_indexes(plan)
+    assert used_indexes(plan) <= {index, f"ix_{TABLE}_date_id"}
+    assert plan["Node Type"] == "Limit"
+    # ключ из cursor - условие индекса: скан начинается с него, а не пропускает прошлые страницы
+    scan = next(node for node in plan_nodes(plan) if node.get("Index Name") == index)
+    assert "ROW(date, id) <" in scan["Index Cond"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("filters", "index"),
+    [
+        ({"bucket": "month"}, "pk_trading_rollups"),
+        ({"oil_id": "A007", "bucket": "week"}, "ix_trading_rollups_oil_id_basis_date"),
+    ],
+)
+async def test_aggregates_plan(seeded_trading_results, explain_session, filters, index):
+    repository = AlchemyRepository(session=explain_session)
+    request = AggregatesRequest(start_date=date(2024, 3, 1), end_date=date(2024, 4, 30), **filters)
+    results = await repository.get_aggregates(request)
+
+    plan = explain_session.plans[0]
+    assert results
+    # сводка читает только дневные итоги: таблицы фактов в плане нет вовсе
+    assert TABLE not in {node.get("Relation Name") for node in plan_nodes(plan)}
+    assert not any(node["Node Type"] == "Seq Scan" for node in plan_nodes(plan))
+    assert used_indexes(plan) == {index}
+
+
+@pytest.mark.asyncio
+async def test_trading_dates_plan(seeded_trading_results, explain_session):
+    repository = AlchemyRepository(session=explain_session)
+    dates = await repository.get_all_trading_dates(limit=10)
+
+    plan = explain_session.plans[0]
+    assert dates == [date(2024, 1, 1) + timedelta(days=SEED_DAYS - 1 - i) for i in range(10)]
+    assert not seq_scans(plan)
+    assert not has_sort(plan)
+    # читается N строк справочника trading_days, а не таблица фактов
+    assert used_indexes(plan) == {"pk_trading_days"}
+    assert plan["Node Type"] == "Limit"
@@ -0,0 +1,60 @@
+from collections import Counter
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.models import BulletinStatus, IngestedBulletin, SpimexTradingResult
+from app.core.repositories.db_repository import AlchemyRepository
+from tests.fixtures.pipeline import (
+    BULLETIN_ROWS,
+    FakeExcelParser,
+    FakeParser,
+    bulletin_url,
+    make_pipeline,
+    parsed_bulletin,
+)
+
+
+async def table_state(session: AsyncSession) -> tuple[int, list[tuple]]:
+    rows = await session.scalar(select(func.count()).select_from(SpimexTradingResult))
+    manifest = await session.execute(
+        select(
+            IngestedBulletin.url,
+            IngestedBulletin.status,
+            IngestedBulletin.file_hash,
+            IngestedBulletin.trading_date,
+            IngestedBulletin.row_count,
+        ).order_by(IngestedBulletin.url)
+    )
+    return rows, list(manifest)
+
+
+@pytest.mark.asyncio
+async def test_reingest_is_idempotent(
+    init_models, db_session: AsyncSession, tmp_path, loader, load_bulletins
+):
+    repository = AlchemyRepository(session=db_session)
+    # бюллетень 4 не разбирается, 5 не скачивается
+    parser = FakeParser(bulletins=6, folder=tmp_path, failing={5})
+    excel_parser = FakeExcelParser(failing={4})
+
+    await make_pipeline(parser, excel_parser, repository, tmp_path, loader=loader).run()
+    first = await table_state(db_session)
+    await make_pipeline(parser, excel_parser, repository, tmp_path, loader=loader).run()
+
+    assert await table_state(db_session) == first
+    rows, manifest = first
+    assert rows == 4 * BULLETIN_ROWS
+    assert [status for _, status, *_ in manifest] == [BulletinStatus.LOADED] * 4 + [
+        BulletinStatus.FAILED
+    ] * 2
+    # повторный запуск качает только то, что не загрузилось
+    assert Counter(parser.downloaded) == {
+        **{bulletin_url(index): 1 for index in range(4)},
+        bulletin_url(4): 2,
+    }
+
+    # повторная запись уже загруженного бюллетеня обновляет строки, а не дублирует их
+    await load_bulletins([(bulletin_url(0), parsed_bulletin(0).to_records())])
+    assert (await table_state(db_session))[0] == rows
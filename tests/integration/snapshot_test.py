@@ -0,0 +1,64 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.repositories.db_repository import AlchemyRepository
+from app.core.repositories.snapshot import SnapshotStore
+from app.core.repositories.snapshot_repository import SnapshotRepository
+from app.core.schemas import DynamicRequest, TradingResultsRequest, encode_cursor
+
+FILTERS = [
+    {},
+    {"oil_id": "A007"},
+    {"oil_id": "A007", "delivery_type_id": "C", "delivery_basis_id": "007"},
+    {"delivery_basis_id": "017"},
+    {"oil_id": "A999"},
+]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_matches_database(seeded_trading_results, db_session, tmp_path):
+    database = AlchemyRepository(session=db_session)
+    store = SnapshotStore(directory=tmp_path, keep_versions=1)
+    await store.export(
+        database.stream_dynamics(
+            DynamicRequest(start_date=date.min, end_date=date.max), batch_size=10_000
+        )
+    )
+    snapshot = SnapshotRepository(db=database, store=store)
+
+    assert store.current().rows == seeded_trading_results
+    assert await snapshot.get_all_trading_dates(limit=10) == (
+        await database.get_all_trading_dates(limit=10)
+    )
+
+    for filters in FILTERS:
+        request = DynamicRequest(start_date=date(2024, 3, 1), end_date=date(2024, 3, 7), **filters)
+        assert await snapshot.get_dynamics(request) == await database.get_dynamics(request)
+
+        request = request.model_copy(update={"limit": 50})
+        while True:
+            page = await snapshot.get_dynamics(request)
+            assert page == await database.get_dynamics(request)
+            if len(page) <= 50:
+                break
+            last = page[49]
+            cursor = encode_cursor(last_date=last.date, last_id=last.id)
+            request = request.model_copy(update={"cursor": cursor})
+
+        request = TradingResultsRequest(**filters)
+        # в последний день у oil_id может быть несколько строк: БД вернет любую из них
+        assert [row.date for row in await snapshot.get_trading_results(request)] == [
+            row.date for row in await database.get_trading_results(request)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_without_snapshot_reads_database(seeded_trading_results, db_session: AsyncSession):
+    database = AlchemyRepository(session=db_session)
+    store = SnapshotStore(directory="unused", keep_versions=1, enabled=False)
+    snapshot = SnapshotRepository(db=database, store=store)
+
+    request = DynamicRequest(start_date=date(2024, 3, 1), end_date=date(2024, 3, 2))
+    assert await snapshot.get_dynamics(request) == await database.get_dynamics(request)
@@ -0,0 +1,19 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.repositories.db_repository import AlchemyRepository
+from app.core.schemas import DynamicRequest
+
+
+@pytest.mark.asyncio
+async def test_stream_dynamics_batches(seeded_trading_results, db_session: AsyncSession):
+    repository = AlchemyRepository(session=db_session)
+    request = DynamicRequest(start_date=date(2024, 3, 1), end_date=date(2024, 3, 10))
+
+    batches = [list(rows) async for rows in repository.stream_dynamics(request, batch_size=300)]
+
+    assert len(batches) > 1
+    assert all(len(rows) <= 300 for rows in batches)
+    assert [row for rows in batches for row in rows] == await repository.get_dynamics(request)
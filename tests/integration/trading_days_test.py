@@ -0,0 +1,26 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.models import TradingDay
+from app.core.repositories.db_repository import AlchemyRepository
+from tests.fixtures.trading_results import bulletin_rows
+
+
+@pytest.mark.asyncio
+async def test_ingestion_keeps_trading_days(init_models, db_session: AsyncSession, load_bulletins):
+    repository = AlchemyRepository(session=db_session)
+    first, second = bulletin_rows(0, date(2025, 8, 1)), bulletin_rows(1, date(2025, 8, 4))
+
+    # второй проход - повторная загрузка тех же бюллетеней: row_count не должен вырасти
+    for _ in range(2):
+        await load_bulletins([("https://x/1", first), ("https://x/2", second)])
+
+    days = (await db_session.scalars(select(TradingDay).order_by(TradingDay.date))).all()
+    assert [(day.date, day.row_count) for day in days] == [
+        (date(2025, 8, 1), len(first)),
+        (date(2025, 8, 4), len(second)),
+    ]
+    assert await repository.get_all_trading_dates(limit=1) == [date(2025, 8, 4)]
@@ -0,0 +1,80 @@
+from collections import defaultdict
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.models import SpimexTradingResult, TradingRollup
+from app.core.repositories.db_repository import AlchemyRepository
+from app.core.schemas import AggregatesRequest, DynamicRequest
+from tests.fixtures.trading_results import bulletin_rows
+
+ROLLUP_KEY = (TradingRollup.date, TradingRollup.oil_id, TradingRollup.delivery_basis_id)
+
+
+async def facts_by_day(session: AsyncSession) -> list[tuple]:
+    query = (
+        select(
+            SpimexTradingResult.date,
+            SpimexTradingResult.oil_id,
+            SpimexTradingResult.delivery_basis_id,
+            func.sum(SpimexTradingResult.volume),
+            func.sum(SpimexTradingResult.total),
+            func.sum(SpimexTradingResult.count),
+        )
+        .group_by(
+            SpimexTradingResult.date,
+            SpimexTradingResult.oil_id,
+            SpimexTradingResult.delivery_basis_id,
+        )
+        .order_by(
+            SpimexTradingResult.date,
+            SpimexTradingResult.oil_id,
+            SpimexTradingResult.delivery_basis_id,
+        )
+    )
+    return [tuple(row) for row in await session.execute(query)]
+
+
+@pytest.mark.asyncio
+async def test_ingestion_keeps_rollups(init_models, db_session: AsyncSession, load_bulletins):
+    first, second = bulletin_rows(0, date(2025, 8, 1)), bulletin_rows(1, date(2025, 8, 4))
+    # повторная загрузка с другими объемами: итоги пересчитываются, а не накапливаются
+    changed = [{**row, "volume": row["volume"] + 1} for row in first]
+
+    await load_bulletins(
+        [("https://x/1", first), ("https://x/2", second), ("https://x/1", changed)]
+    )
+
+    rollups = await db_session.execute(
+        select(
+            *ROLLUP_KEY, TradingRollup.volume, TradingRollup.total, TradingRollup.count
+        ).order_by(*ROLLUP_KEY)
+    )
+    assert [tuple(row) for row in rollups] == await facts_by_day(db_session)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bucket", ["day", "week", "month"])
+async def test_aggregates_match_raw_rows(seeded_trading_results, db_session: AsyncSession, bucket):
+    repository = AlchemyRepository(session=db_session)
+    period = {"start_date": date(2024, 2, 20), "end_date": date(2024, 4, 10), "oil_id": "A007"}
+
+    expected = defaultdict(lambda: [0, 0, 0])
+    for row in await repository.get_dynamics(DynamicRequest(**period)):
+        start = {
+            "day": row.date,
+            "week": date.fromordinal(row.date.toordinal() - row.date.weekday()),
+            "month": row.date.replace(day=1),
+        }[bucket]
+        totals = expected[(start, row.oil_id, row.delivery_basis_id)]
+        for i, value in enumerate((row.volume, row.total, row.count)):
+            totals[i] += value
+
+    aggregates = await repository.get_aggregates(AggregatesRequest(**period, bucket=bucket))
+
+    assert {tuple(row[:3]): list(row[3:]) for row in aggregates} == expected
+    assert [row.period for row in aggregates] == sorted(
+        (row.period for row in aggregates), reverse=True
+    )
@@ -0,0 +1,55 @@
+from datetime import date
+
+import pytest
+
+from app.core import settings
+from app.core.services.http_parser import Parser
+from app.core.settings import Links
+from tests.fixtures.spimex_site import OLD_DATE, render_results_page
+
+DOMAIN = "https://spimex.test/"
+PAGES = 3  # дальше только бюллетени до 2023 года - граница обхода
+
+
+def bulletin_url(page: int, item: int) -> str:
+    return f"{DOMAIN}upload/oil_xls_{page}_{item}.xls"
+
+
+def make_parser(unavailable: set[int]) -> Parser:
+    """Parser без сети: страницы results отдаются из памяти, unavailable - не загружаются"""
+    parser = Parser(
+        settings=settings.model_copy(
+            update={"links": Links(url=f"{DOMAIN}results/?page=page-", domain=DOMAIN)}
+        ),
+        session=None,
+    )
+
+    async def parse_page(url: str) -> str | None:
+        page = int(url.rsplit("-", 1)[1])
+        if page in unavailable:
+            return None
+        day = date(2025, 8, PAGES + 1 - page) if page <= PAGES else OLD_DATE
+        return render_results_page(
+            [(f"/upload/oil_xls_{page}_{item}.xls", day) for item in range(2)]
+        )
+
+    parser.parse_page = parse_page
+    return parser
+
+
+@pytest.mark.asyncio
+async def test_crawl_reports_skipped_page():
+    crawl = await make_parser(unavailable={2}).get_docs_urls()
+
+    # бюллетени страницы 2 не найдены - обход не полный, а не просто короче
+    assert crawl.urls == [bulletin_url(page, item) for page in (1, 3) for item in range(2)]
+    assert crawl.skipped_pages == [2]
+    assert not crawl.complete
+
+
+@pytest.mark.asyncio
+async def test_crawl_without_skipped_pages_is_complete():
+    crawl = await make_parser(unavailable=set()).get_docs_urls()
+
+    assert crawl.urls == [bulletin_url(page, item) for page in (1, 2, 3) for item in range(2)]
+    assert crawl.complete
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import pytest
+from pandas import DataFrame
+
+from app.core.services.excel_parser import ExcelParser
+from tests.fixtures.bulletins import legacy_parse, make_bulletin_frame, write_bulletin_xls
+
+
+def test_vectorized_parse_matches_legacy(bulletin_frame: DataFrame):
+    records = ExcelParser().parse_dataframe(df=bulletin_frame).to_records()
+    assert records == legacy_parse(bulletin_frame)
+    assert all(record["count"] >= 1 for record in records)
+
+
+@pytest.mark.parametrize("rows", [0, 1, 3000])
+def test_vectorized_parse_sizes(rows: int):
+    df = make_bulletin_frame(rows=rows, seed=rows)
+    assert ExcelParser().parse_dataframe(df=df).to_records() == legacy_parse(df)
+
+
+def test_missing_section_raises(bulletin_frame: DataFrame):
+    bulletin_frame.iloc[:, 1] = bulletin_frame.iloc[:, 1].replace(
+        "Единица измерения: Метрическая тонна", "Единица измерения: Килограмм"
+    )
+    with pytest.raises(ValueError):
+        ExcelParser().parse_dataframe(df=bulletin_frame)
+
+
+@pytest.mark.parametrize("reader", ["pandas", "xlrd"])
+def test_readers_match_legacy(reader: str, bulletin_frame: DataFrame, tmp_path: Path):
+    pytest.importorskip("xlwt")
+    path = write_bulletin_xls(df=bulletin_frame, path=tmp_path / "bulletin.xls")
+    assert ExcelParser(reader=reader).parse_excel_file(path) == legacy_parse(bulletin_frame)
@@ -0,0 +1,36 @@
+from datetime import date
+
+from app.core.services.http_parser import extract_docs_links
+from tests.fixtures.spimex_site import legacy_docs_links, render_results_page
+
+DOMAIN = "https://spimex.com/"
+
+
+def test_extract_docs_links_matches_legacy_parser():
+    bulletins = [
+        (f"/upload/reports/oil_xls/oil_xls_2025080{i}.xls?r={i}", date(2025, 8, 9 - i))
+        for i in range(6)
+    ]
+    bulletins += [("https://cdn.spimex.com/old.xls", date(2022, 12, 30))]
+    bulletins += [(f"/upload/{i}.xls", date(2024, 1, 1)) for i in range(5)]
+    page = render_results_page(bulletins, chrome=50)
+
+    links = extract_docs_links(page, DOMAIN)
+
+    assert links == legacy_docs_links(page, DOMAIN)
+    # десять первых блоков страницы, бюллетени до 2023 года пропускаются
+    assert links[0] == f"{DOMAIN}upload/reports/oil_xls/oil_xls_20250800.xls?r=0"
+    assert len(links) == 9
+    assert "https://cdn.spimex.com/old.xls" not in links
+
+
+def test_extract_docs_links_matches_class_among_others():
+    page = (
+        '<div class="accordeon-inner__wrap-item active"><a href="/a.xls">a</a>'
+        "<p><span> 01.08.2025 </span></p></div>"
+        '<div class="accordeon-inner__wrap-item-other"><a href="/b.xls">b</a>'
+        "<span>01.08.2025</span></div>"
+    )
+
+    assert extract_docs_links(page, DOMAIN) == [f"{DOMAIN}a.xls"]
+    assert extract_docs_links("<html><body></body></html>", DOMAIN) == []
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from app.core.repositories.cache_repository import TieredCacheRepository
+from app.core.repositories.local_cache import (
+    CacheNamespace,
+    CacheStats,
+    LocalCache,
+    listen_invalidations,
+)
+
+
+class StubRemote:
+    def __init__(self, stats: CacheStats) -> None:
+        self.stats = stats
+        self.version = 1
+        self.data: dict[str, bytes] = dict()
+
+    async def namespaced(self, key: str) -> str:
+        return f"v{self.version}:{key}"
+
+    async def get_cached_data(self, key: str) -> bytes | None:
+        raw = self.data.get(key)
+        if raw is None:
+            self.stats.redis.misses += 1
+        else:
+            self.stats.redis.hits += 1
+        return raw
+
+    async def set_cached_data(self, data: bytes, key: str, ttl: int | None) -> None:
+        self.data[key] = data
+
+
+class StubPubSub:
+    def __init__(self, messages: list[dict]) -> None:
+        self.messages = messages
+        self.channels: list[str] = list()
+
+    async def __aenter__(self) -> "StubPubSub":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    async def subscribe(self, channel: str) -> None:
+        self.channels.append(channel)
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+        await asyncio.Event().wait()
+
+
+def make_local(max_bytes: int = 100, ttl: float = 60) -> LocalCache:
+    return LocalCache(max_bytes=max_bytes, ttl=ttl, stats=CacheStats())
+
+
+def test_lru_respects_memory_budget():
+    cache = make_local(max_bytes=100)
+    cache.put("a", b"a" * 40)
+    cache.put("b", b"b" * 40)
+    assert cache.get("a") == b"a" * 40  # "b" становится самым давним
+    cache.put("c", b"c" * 40)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (b"a" * 40, b"c" * 40)
+    assert cache.size == 80
+    cache.put("huge", b"h" * 101)
+    assert cache.get("huge") is None
+    assert cache.stats.local.hits == 3
+    assert cache.stats.local.misses == 2
+
+
+def test_entries_expire():
+    cache = make_local(ttl=0)
+    cache.put("a", b"1")
+
+    assert cache.get("a") is None
+    assert (len(cache), cache.size) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_tiered_repository_counts_both_tiers():
+    stats = CacheStats()
+    remote = StubRemote(stats=stats)
+    repository = TieredCacheRepository(
+        remote=remote, local=LocalCache(max_bytes=1 << 20, ttl=60, stats=stats)
+    )
+
+    key = await repository.namespaced("k")
+    assert await repository.get_cached_data(key=key) is None
+    await repository.set_cached_data(data=b'[{"a":1}]', key=key, ttl=None)
+    assert await repository.get_cached_data(key=key) == b'[{"a":1}]'
+    assert await repository.get_cached_data(key=key) == b'[{"a":1}]'
+
+    assert stats.report() == {
+        "local": {"hits": 1, "misses": 2},
+        "redis": {"hits": 1, "misses": 1},
+    }
+
+    # новая версия данных: прошлые записи L1 и redis больше не читаются
+    remote.version = 2
+    assert await repository.get_cached_data(key=await repository.namespaced("k")) is None
+
+
+@pytest.mark.asyncio
+async def test_new_version_message_clears_cache():
+    cache, namespace = make_local(), CacheNamespace()
+    pubsub = StubPubSub(messages=[{"type": "subscribe"}, {"type": "message", "data": b"7"}])
+
+    class StubRedis:
+        def pubsub(self) -> StubPubSub:
+            return pubsub
+
+    listener = asyncio.create_task(
+        listen_invalidations(
+            redis=StubRedis(), channel="versions", namespace=namespace, local_cache=cache
+        )
+    )
+    cache.put("a", b"1")
+    await asyncio.sleep(0)
+    listener.cancel()
+
+    assert pubsub.channels == ["versions"]
+    assert namespace.version == 7
+    assert len(cache) == 0
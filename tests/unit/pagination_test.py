@@ -0,0 +1,44 @@
+from datetime import date
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.schemas import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    DynamicRequest,
+    decode_cursor,
+    encode_cursor,
+)
+
+PERIOD = {"start_date": date(2025, 7, 1), "end_date": date(2025, 8, 4)}
+
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor(last_date=date(2025, 8, 4), last_id=123456)
+
+    assert decode_cursor(cursor) == (date(2025, 8, 4), 123456)
+    assert DynamicRequest(**PERIOD, cursor=cursor).after == (date(2025, 8, 4), 123456)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(date(2025, 8, 4), 1)[:-2]])
+def test_broken_cursor_rejected(cursor: str):
+    with pytest.raises(ValidationError):
+        DynamicRequest(**PERIOD, cursor=cursor)
+
+
+@pytest.mark.parametrize(
+    ("params", "page_size"),
+    [
+        ({}, None),
+        ({"limit": 10}, 10),
+        ({"cursor": encode_cursor(date(2025, 8, 4), 1)}, DEFAULT_PAGE_SIZE),
+    ],
+)
+def test_page_size(params: dict, page_size: int | None):
+    assert DynamicRequest(**PERIOD, **params).page_size == page_size
+
+
+def test_page_size_bounded():
+    with pytest.raises(ValidationError):
+        DynamicRequest(**PERIOD, limit=MAX_PAGE_SIZE + 1)
@@ -0,0 +1,58 @@
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.core.services.excel_parser import ExcelParser
+from app.core.services.parse_cache import ParseCache
+from tests.fixtures.bulletins import make_bulletin_frame
+
+
+def make_cache(directory: Path, max_bytes: int = 1 << 30, max_age: float = 3600) -> ParseCache:
+    return ParseCache(directory=directory, max_bytes=max_bytes, max_age=max_age)
+
+
+def test_roundtrip_is_memory_mapped(tmp_path: Path):
+    bulletin = ExcelParser().parse_dataframe(df=make_bulletin_frame(rows=300))
+    cache = make_cache(tmp_path)
+
+    assert cache.get("abc") is None
+    cache.put("abc", bulletin)
+    cached = cache.get("abc")
+
+    assert cached.to_records() == bulletin.to_records()
+    assert isinstance(cached.volume, np.memmap)
+    assert cache.report() == {"hits": 1, "misses": 1, "writes": 1, "evicted": 0}
+
+
+def test_empty_bulletin(tmp_path: Path):
+    bulletin = ExcelParser().parse_dataframe(df=make_bulletin_frame(rows=0))
+    cache = make_cache(tmp_path)
+    cache.put("empty", bulletin)
+    assert cache.get("empty").to_records() == []
+
+
+def test_evict_by_age_and_size(tmp_path: Path):
+    bulletin = ExcelParser().parse_dataframe(df=make_bulletin_frame(rows=100))
+    cache = make_cache(tmp_path, max_age=60)
+    for file_hash in ("old", "a", "b", "c"):
+        cache.put(file_hash, bulletin)
+    entries = {path.name.split("-")[0]: path for path in tmp_path.glob("*.bin")}
+    now = time.time()
+    os.utime(entries["old"], (now - 120, now - 120))
+    for offset, file_hash in enumerate(("a", "b", "c")):
+        os.utime(entries[file_hash], (now - 30 + offset, now - 30 + offset))
+
+    cache.max_bytes = entries["c"].stat().st_size * 2
+    cache.evict()
+
+    assert sorted(path.name.split("-")[0] for path in tmp_path.glob("*.bin")) == ["b", "c"]
+    assert cache.stats.evicted == 2
+
+
+def test_disabled_cache_is_noop(tmp_path: Path):
+    cache = ParseCache(directory=tmp_path / "cache", max_bytes=0, max_age=0, enabled=False)
+    cache.put("abc", ExcelParser().parse_dataframe(df=make_bulletin_frame(rows=10)))
+    assert cache.get("abc") is None
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.core.database.models import BulletinStatus
+from tests.fixtures.pipeline import (
+    BULLETIN_ROWS,
+    FakeExcelParser,
+    FakeParser,
+    bulletin_url,
+    make_pipeline,
+)
+
+
+class FakeRepository:
+    """Писатель пайплайна: запоминает бюллетени и сколько разобранных файлов ждали записи"""
+
+    def __init__(self, excel_parser: FakeExcelParser, delay: float = 0.0, fail_after=None):
+        self.excel_parser = excel_parser
+        self.delay = delay
+        self.fail_after = fail_after
+        self.saved: dict[str, str] = dict()
+        self.max_backlog = 0
+
+    async def get_ingested_bulletins(self) -> list:
+        return list()
+
+    async def get_download_validators(self) -> dict:
+        return dict()
+
+    async def save_bulletin(self, bulletin: dict, data_list: list[dict]) -> None:
+        if len(self.saved) == self.fail_after:
+            raise RuntimeError("БД недоступна")
+        self.max_backlog = max(self.max_backlog, self.excel_parser.parsed - len(self.saved))
+        await asyncio.sleep(self.delay)
+        self.saved[bulletin["url"]] = bulletin["status"]
+
+
+@pytest.mark.asyncio
+async def test_slow_writer_holds_back_parsing(tmp_path):
+    parser, excel_parser = FakeParser(bulletins=20, folder=tmp_path), FakeExcelParser()
+    repository = FakeRepository(excel_parser, delay=0.01)
+    pipeline = make_pipeline(
+        parser,
+        excel_parser,
+        repository,
+        tmp_path,
+        loader="orm",
+        download_workers=4,
+        parse_workers=1,
+        parse_chunk_size=1,
+        parse_queue_size=2,
+        write_queue_size=1,
+    )
+
+    stats = await pipeline.run()
+
+    assert len(repository.saved) == 20
+    assert stats["write"].rows == 20 * BULLETIN_ROWS
+    # разобранные файлы ждут записи только в очереди (1), у парсера (1) и у писателя (1)
+    assert repository.max_backlog <= 3
+    assert stats["parse"].max_queue <= 2 and stats["write"].max_queue <= 1
+
+
+@pytest.mark.asyncio
+async def test_file_errors_do_not_stop_pipeline(tmp_path):
+    parser = FakeParser(bulletins=6, folder=tmp_path, failing={2})
+    excel_parser = FakeExcelParser(failing={3})
+    repository = FakeRepository(excel_parser)
+
+    stats = await make_pipeline(parser, excel_parser, repository, tmp_path, loader="orm").run()
+
+    assert repository.saved == {
+        bulletin_url(index): (BulletinStatus.FAILED if index in (2, 3) else BulletinStatus.LOADED)
+        for index in range(6)
+    }
+    assert (stats["download"].errors, stats["parse"].errors) == (1, 1)
+    assert stats["write"].items == 4
+
+
+@pytest.mark.asyncio
+async def test_writer_failure_stops_all_stages(tmp_path):
+    parser, excel_parser = FakeParser(bulletins=20, folder=tmp_path), FakeExcelParser()
+    repository = FakeRepository(excel_parser, fail_after=2)
+    pipeline = make_pipeline(
+        parser,
+        excel_parser,
+        repository,
+        tmp_path,
+        loader="orm",
+        download_workers=2,
+        parse_workers=1,
+        parse_chunk_size=1,
+        parse_queue_size=2,
+        write_queue_size=1,
+    )
+
+    with pytest.raises(ExceptionGroup) as error:
+        await asyncio.wait_for(pipeline.run(), timeout=5)
+
+    assert error.group_contains(RuntimeError, match="БД недоступна")
+    # воркеры стадий отменены, а не висят на полных очередях
+    assert asyncio.all_tasks() == {asyncio.current_task()}
+    assert len(parser.downloaded) < 20
@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.services import schedule
+from app.core.services.schedule import last_slot, next_run, run_daily
+
+
+@pytest.mark.parametrize(
+    ("now", "expected"),
+    [
+        (datetime(2025, 8, 4, 9, 0), datetime(2025, 8, 4, 14, 11)),
+        (datetime(2025, 8, 4, 14, 11), datetime(2025, 8, 5, 14, 11)),
+        # конец месяца и года: day + 1 здесь падал
+        (datetime(2025, 1, 31, 15, 0), datetime(2025, 2, 1, 14, 11)),
+        (datetime(2024, 2, 29, 23, 59), datetime(2024, 3, 1, 14, 11)),
+        (datetime(2025, 12, 31, 14, 12), datetime(2026, 1, 1, 14, 11)),
+    ],
+)
+def test_next_run(now: datetime, expected: datetime):
+    assert next_run(now=now, hour=14, minute=11) == expected
+
+
+def test_last_slot():
+    assert last_slot(now=datetime(2025, 8, 4, 14, 11), hour=14, minute=11) == datetime(
+        2025, 8, 4, 14, 11
+    )
+    assert last_slot(now=datetime(2025, 3, 1, 9, 0), hour=14, minute=11) == datetime(
+        2025, 2, 28, 14, 11
+    )
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    """Часы run_daily: now сдвигается на время каждого sleep, третий sleep - конец теста"""
+
+    class Clock(datetime):
+        current = datetime(2025, 8, 6, 15, 0)
+        sleeps: list[float] = []
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls.current
+
+    async def sleep(seconds: float) -> None:
+        Clock.sleeps.append(seconds)
+        if len(Clock.sleeps) == 3:
+            raise asyncio.CancelledError
+        Clock.current += timedelta(seconds=seconds)
+
+    monkeypatch.setattr(schedule, "datetime", Clock)
+    monkeypatch.setattr(schedule.asyncio, "sleep", sleep)
+    monkeypatch.setattr(schedule.random, "uniform", lambda a, b: b)
+    return Clock
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("last_run", [None, datetime(2025, 8, 3, 14, 11)])
+async def test_run_daily_catches_up_once(clock, last_run):
+    runs = []
+
+    async def job(target: datetime) -> bool:
+        runs.append(target)
+        return True
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_daily(job=job, hour=14, minute=11, last_run=last_run, jitter=60)
+
+    # пропущенные 4, 5 и 6 августа - один запуск сразу, дальше по расписанию с разбросом
+    assert runs == [datetime(2025, 8, day, 14, 11) for day in (6, 7, 8)]
+    assert clock.sleeps[0] == (23 * 60 + 11) * 60 + 60
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("failure", ["error", "skipped"])
+async def test_run_daily_retries_failed_slot(clock, failure):
+    runs = []
+
+    async def job(target: datetime) -> bool:
+        runs.append(target)
+        if len(runs) > 1:
+            return True
+        if failure == "error":
+            raise RuntimeError("spimex недоступен")
+        # запуск не начат: running-запись держит другой процесс
+        return False
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_daily(
+            job=job, hour=14, minute=11, last_run=datetime(2025, 8, 6, 14, 11), retry_base=60
+        )
+
+    # срок 6 августа уже выполнен - ждем 7-го; неудача не засчитывает срок, а повторяет его
+    assert runs == [datetime(2025, 8, 7, 14, 11), datetime(2025, 8, 7, 14, 11)]
+    assert clock.sleeps[1] == 60
+
+
+@pytest.mark.asyncio
+async def test_run_daily_backoff_is_bounded_and_moves_to_next_slot(clock):
+    runs = []
+
+    async def job(target: datetime) -> bool:
+        runs.append(target)
+        raise RuntimeError("spimex недоступен")
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_daily(
+            job=job,
+            hour=14,
+            minute=11,
+            last_run=None,
+            retry_base=10 * 60 * 60,
+            retry_max=16 * 60 * 60,
+        )
+
+    # 10 ч, затем 16 ч вместо 20; ко второму повтору наступил срок 7 августа
+    assert clock.sleeps == [10 * 60 * 60, 16 * 60 * 60, 16 * 60 * 60]
+    assert runs == [
+        datetime(2025, 8, 6, 14, 11),
+        datetime(2025, 8, 6, 14, 11),
+        datetime(2025, 8, 7, 14, 11),
+    ]
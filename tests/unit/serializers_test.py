@@ -0,0 +1,85 @@
+import csv
+import io
+from datetime import date
+
+import orjson
+import pytest
+
+from app.core.schemas import TradingResultResponse
+from app.core.services.serializers import (
+    CSV,
+    NDJSON,
+    RESULT_FIELDS,
+    csv_header,
+    dump_csv,
+    dump_ndjson,
+    dump_rows,
+    stream_media_type,
+)
+
+
+def make_rows(count: int) -> list[tuple]:
+    day = date(2025, 8, 4)
+    return [
+        (
+            i,
+            f"A{i:03d}ANK060F",
+            'Бензин (АИ-92-К5) "Экто"',
+            f"A{i:03d}",
+            "ANK",
+            "ст. Ангарск-группа станций",
+            "F",
+            60 + i,
+            10**12 + i,
+            i % 7,
+            day,
+            day,
+            day,
+        )
+        for i in range(count)
+    ]
+
+
+def test_fields_follow_response_schema():
+    assert RESULT_FIELDS == tuple(TradingResultResponse.model_fields)
+
+
+def test_dump_rows_matches_response_model():
+    rows = make_rows(50)
+    expected = orjson.dumps(
+        [
+            TradingResultResponse.model_validate(dict(zip(RESULT_FIELDS, row))).model_dump()
+            for row in rows
+        ]
+    )
+
+    assert dump_rows(rows) == expected
+    assert dump_rows([]) == b"[]"
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        (None, None),
+        ("application/json", None),
+        ("*/*", None),
+        ("application/x-ndjson", NDJSON),
+        ("application/ndjson; charset=utf-8", NDJSON),
+        ("text/html, text/csv;q=0.9", CSV),
+    ],
+)
+def test_stream_media_type(accept: str | None, expected: str | None):
+    assert stream_media_type(accept) == expected
+
+
+def test_stream_formats_carry_same_rows():
+    rows = make_rows(3)
+
+    lines = dump_ndjson(rows).splitlines()
+    assert [orjson.loads(line) for line in lines] == orjson.loads(dump_rows(rows))
+
+    table = list(csv.reader(io.StringIO((csv_header() + dump_csv(rows)).decode())))
+    assert table[0] == list(RESULT_FIELDS)
+    assert table[1][RESULT_FIELDS.index("exchange_product_name")] == rows[0][2]
+    assert table[1][RESULT_FIELDS.index("date")] == "2025-08-04"
+    assert len(table) == 4
@@ -0,0 +1,185 @@
+from datetime import date
+
+import orjson
+import pytest
+from pydantic import TypeAdapter
+
+from app.core import settings
+from app.core.schemas import (
+    AggregateResponse,
+    AggregatesRequest,
+    DynamicRequest,
+    TradingResultResponse,
+    TradingResultsRequest,
+)
+from app.core.services.cache import request_cache_key
+from app.core.services.service import Service
+
+LAST_DAY = date(2025, 8, 4)
+
+
+class MemoryCache:
+    def __init__(self) -> None:
+        self.version = 0
+        self.data: dict[str, tuple[bytes, int | None]] = dict()
+
+    async def namespaced(self, key: str) -> str:
+        return f"v{self.version}:{key}"
+
+    async def get_cached_data(self, key: str) -> bytes | None:
+        if key in self.data:
+            return self.data[key][0]
+        return None
+
+    async def set_cached_data(self, data: bytes, key: str, ttl: int | None) -> None:
+        self.data[key] = (data, ttl)
+
+
+class StubRepository:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, object]] = list()
+
+    async def get_all_trading_dates(self, limit: int) -> list[date]:
+        self.calls.append(("dates", limit))
+        return [date(2025, 8, 4 - i) for i in range(limit)]
+
+    async def get_trading_results(self, request: TradingResultsRequest) -> list[tuple]:
+        self.calls.append(("trading_results", request))
+        return [tuple(row(oil_id=request.oil_id).values())]
+
+    async def get_dynamics(self, request: DynamicRequest) -> list[tuple]:
+        self.calls.append(("dynamics", request))
+        return [tuple(row(oil_id=request.oil_id or "A100", day=request.end_date).values())]
+
+    async def get_aggregates(self, request: AggregatesRequest) -> list[tuple]:
+        self.calls.append(("aggregates", request))
+        return [(request.start_date, "A100", "ANK", 10**12, 5 * 10**12, 3)]
+
+
+def row(oil_id: str | None, day: date = LAST_DAY) -> dict:
+    return {
+        "id": 1,
+        "exchange_product_id": f"{oil_id}ANK060F",
+        "exchange_product_name": "Бензин",
+        "oil_id": oil_id,
+        "delivery_basis_id": "ANK",
+        "delivery_basis_name": "ст. Базис",
+        "delivery_type_id": "F",
+        "volume": 60,
+        "total": 100,
+        "count": 1,
+        "date": day,
+        "created_on": day,
+        "updated_on": day,
+    }
+
+
+@pytest.fixture()
+def service() -> Service:
+    return Service(
+        settings=settings,
+        parser=None,
+        excel_parser=None,
+        parse_cache=None,
+        db_repository=StubRepository(),
+        cache_repository=MemoryCache(),
+        snapshot_store=None,
+    )
+
+
+def test_request_cache_key_is_normalized():
+    key = request_cache_key("p", {"request": TradingResultsRequest(oil_id="A100")})
+
+    assert key == request_cache_key(
+        "p", {"request": TradingResultsRequest(delivery_type_id=None, oil_id="A100")}
+    )
+    assert key != request_cache_key("p", {"request": TradingResultsRequest(oil_id="A101")})
+    assert key != request_cache_key("q", {"request": TradingResultsRequest(oil_id="A100")})
+
+
+@pytest.mark.asyncio
+async def test_trading_results_cached_per_filters(service: Service):
+    first = await service.get_trading_results(request=TradingResultsRequest(oil_id="A100"))
+    other = await service.get_trading_results(request=TradingResultsRequest(oil_id="A101"))
+    again = await service.get_trading_results(request=TradingResultsRequest(oil_id="A100"))
+
+    assert first == again != other
+    # тело совпадает с тем, что FastAPI построил бы по response_model
+    adapter = TypeAdapter(list[TradingResultResponse])
+    assert orjson.loads(first) == adapter.dump_python(
+        adapter.validate_python([row(oil_id="A100")]), mode="json"
+    )
+    assert [request.oil_id for _, request in service.db_repository.calls] == ["A100", "A101"]
+    assert {ttl for _, ttl in service.cache_repository.data.values()} == {
+        settings.redis.last_trading_ttl
+    }
+
+
+@pytest.mark.asyncio
+async def test_last_trading_dates_roundtrip(service: Service):
+    assert await service.get_last_trading_dates(limit=3) == await service.get_last_trading_dates(
+        limit=3
+    )
+    assert await service.get_last_trading_dates(limit=2) == b'["2025-08-04","2025-08-03"]'
+    assert service.db_repository.calls == [("dates", 3), ("dates", 2)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("end_date", "ttl"),
+    [
+        (date(2025, 8, 1), settings.redis.closed_dynamics_ttl),
+        (LAST_DAY, settings.redis.dynamics_ttl),
+    ],
+)
+async def test_dynamics_ttl_depends_on_range(service: Service, end_date: date, ttl):
+    request = DynamicRequest(start_date=date(2025, 7, 1), end_date=end_date)
+    result = await service.get_dynamics(request=request)
+
+    assert await service.get_dynamics(request=request) == result
+    assert [ttl for _, ttl in service.cache_repository.data.values()] == [ttl]
+
+
+@pytest.mark.asyncio
+async def test_aggregates_body_and_ttl(service: Service):
+    request = AggregatesRequest(start_date=date(2025, 7, 1), end_date=date(2025, 7, 31))
+    body = await service.get_aggregates(request=request)
+
+    assert await service.get_aggregates(request=request) == body
+    adapter = TypeAdapter(list[AggregateResponse])
+    assert orjson.loads(body) == adapter.dump_python(
+        adapter.validate_python(
+            [
+                {
+                    "period": date(2025, 7, 1),
+                    "oil_id": "A100",
+                    "delivery_basis_id": "ANK",
+                    "volume": 10**12,
+                    "total": 5 * 10**12,
+                    "count": 3,
+                }
+            ]
+        ),
+        mode="json",
+    )
+    assert [ttl for _, ttl in service.cache_repository.data.values()] == [
+        settings.redis.closed_dynamics_ttl
+    ]
+
+
+@pytest.mark.asyncio
+async def test_body_read_before_new_version_stays_in_old_namespace(service: Service):
+    cache, fetch = service.cache_repository, service.db_repository.get_all_trading_dates
+
+    async def ingest_during_read(limit: int) -> list[date]:
+        # загрузка закончилась, пока запрос читал старые данные
+        cache.version += 1
+        return await fetch(limit)
+
+    service.db_repository.get_all_trading_dates = ingest_during_read
+    await service.get_last_trading_dates(limit=1)
+
+    assert [key.split(":")[0] for key in cache.data] == ["v0"]
+    service.db_repository.get_all_trading_dates = fetch
+    await service.get_last_trading_dates(limit=1)
+    assert sorted(key.split(":")[0] for key in cache.data) == ["v0", "v1"]
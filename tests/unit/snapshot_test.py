@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.repositories.snapshot import SnapshotStore
+from app.core.schemas import DynamicRequest, TradingResultsRequest, encode_cursor
+
+FIRST_DAY = date(2025, 7, 1)
+
+
+def make_rows(days: int, products: int = 3, volume: int = 0) -> list[tuple]:
+    """Строки в порядке stream_dynamics: (date DESC, id DESC)"""
+    rows = [
+        (
+            day * products + product + 1,
+            f"A{product:03d}ANK060F",
+            f"Продукт {product}",
+            f"A{product:03d}",
+            "ANK",
+            "ст. Базис",
+            "F",
+            volume + product,
+            100,
+            1,
+            FIRST_DAY + timedelta(days=day),
+            FIRST_DAY,
+            FIRST_DAY,
+        )
+        for day in range(days)
+        for product in range(products)
+    ]
+    return rows[::-1]
+
+
+async def batches(rows: list[tuple], size: int = 4):
+    for start in range(0, len(rows), size):
+        stop = start + size
+        yield rows[start:stop]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_queries(tmp_path):
+    store = SnapshotStore(directory=tmp_path, keep_versions=2)
+    rows = make_rows(days=5)
+    await store.export(batches(rows))
+    snapshot = store.current()
+
+    assert snapshot.rows == len(rows)
+    assert snapshot.trading_dates(limit=2) == [FIRST_DAY + timedelta(days=4 - i) for i in range(2)]
+
+    period = {"start_date": FIRST_DAY + timedelta(days=1), "end_date": FIRST_DAY + timedelta(3)}
+    assert snapshot.dynamics(DynamicRequest(**period)) == rows[3:12]
+    assert snapshot.dynamics(DynamicRequest(**period, oil_id="A001")) == rows[4:12:3]
+    assert snapshot.dynamics(DynamicRequest(**period, oil_id="A999")) == []
+
+    # страница после строки rows[4] (id 10): ключ из cursor - не включительно
+    cursor = encode_cursor(last_date=rows[4][10], last_id=rows[4][0])
+    assert snapshot.dynamics(DynamicRequest(**period, limit=2, cursor=cursor)) == rows[5:8]
+
+    latest = snapshot.trading_results(TradingResultsRequest(oil_id="A002"))
+    assert latest == rows[:1] and latest[0].date == FIRST_DAY + timedelta(days=4)
+    assert snapshot.trading_results(TradingResultsRequest()) == []
+
+
+@pytest.mark.asyncio
+async def test_snapshot_swap(tmp_path):
+    store = SnapshotStore(directory=tmp_path, keep_versions=1)
+    assert store.is_missing() and store.current() is None
+
+    await store.export(batches(make_rows(days=2)))
+    old = store.current()
+    await store.export(batches(make_rows(days=3, volume=10)))
+    new = store.current()
+
+    assert new.version > old.version and new.rows == 9
+    assert store.current() is new
+    # старая версия удалена с диска, но начатые на ней чтения дочитывают свой mmap
+    assert not old.path.exists()
+    assert old.dynamics(DynamicRequest(start_date=FIRST_DAY, end_date=FIRST_DAY))[0].volume == 2
+    assert len(list(tmp_path.glob("snapshot-*.bin"))) == 1
+
+
+def test_disabled_store(tmp_path):
+    store = SnapshotStore(directory=tmp_path / "off", keep_versions=1, enabled=False)
+
+    assert not store.is_missing()
+    assert store.current() is None
+    assert not (tmp_path / "off").exists()
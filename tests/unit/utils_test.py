@@ -1,4 +1,6 @@
-from app.utils import case_convector, pluralize
+import hashlib
+
+from app.utils import case_convector, file_sha256, pluralize
 
 
 def test_case_convector():
@@ -21,3 +23,10 @@ def test_pluralize():
     assert pluralize("category") == "categories"
     assert pluralize("city") == "cities"
     assert pluralize("bus") == "buses"
+
+
+def test_file_sha256(tmp_path):
+    path = tmp_path / "bulletin.xls"
+    path.write_bytes(b"spimex" * 1000)
+    assert file_sha256(path) == hashlib.sha256(b"spimex" * 1000).hexdigest()
+    assert file_sha256(path, chunk_size=7) == file_sha256(path)